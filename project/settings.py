@@ -40,6 +40,7 @@ BACKEND_APPS = [
     "source.apps.orders.apps.OrdersConfig",
     "source.apps.products.apps.ProductsConfig",
     "source.apps.sales_analytics.apps.SalesAnalyticsConfig",
+    "source.layer.apps.LayerConfig",
 ]
 
 INSTALLED_APPS = [
@@ -64,14 +65,15 @@ REST_FRAMEWORK = {
         "rest_framework.renderers.JSONRenderer",
         "rest_framework.renderers.BrowsableAPIRenderer",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
-    # 'PAGE_SIZE': 100,
+    "DEFAULT_PAGINATION_CLASS": "source.layer.helpers.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.TokenAuthentication",
     ],
 }
 
 MIDDLEWARE = [
+    "source.layer.helpers.middleware.QueryProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -79,8 +81,18 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "source.apps.inventory.middleware.InventoryEventMiddleware",
 ]
 
+# Per-request query and latency profiling; see source/layer/helpers/profiling.py.
+# Budgets are checked against each request of a route ("*" for all others).
+REQUEST_PROFILING = {
+    "ENABLED": DEBUG,
+    "BUDGETS": {
+        "*": {"queries": 50, "duplicates": 10},
+    },
+}
+
 ROOT_URLCONF = "project.urls"
 
 TEMPLATES = [
@@ -14,14 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from source.layer.helpers.views import request_profiles_view
+
 urlpatterns = [
+    path(
+        "admin/request-profiles/",
+        admin.site.admin_view(request_profiles_view),
+        name="request-profiles",
+    ),
     path("admin/", admin.site.urls),
-    path("api/", include("source.apps.products.urls")),
+    path("api/", include("source.apps.inventory.urls")),
     path("orders/", include("source.apps.orders.urls")),
 ]
 
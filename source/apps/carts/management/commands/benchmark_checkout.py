@@ -0,0 +1,101 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from source.apps.carts.models import Cart, CartItem
+from source.apps.customers.models import Customer
+from source.apps.inventory.ledger import StockLedger
+from source.apps.inventory.models import Warehouse
+from source.apps.products.models import Category, Product
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Cart.checkout query count and time for several cart sizes. "
+        "All benchmark data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1, 10, 100, 1000],
+            help="Cart sizes (number of lines) to benchmark.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'lines':>8} {'queries':>8} {'ms':>10}")
+        for size in options["sizes"]:
+            queries, elapsed = self.run_checkout(size)
+            self.stdout.write(f"{size:>8} {queries:>8} {elapsed * 1000:>10.1f}")
+
+    def run_checkout(self, size):
+        try:
+            with transaction.atomic():
+                cart = self.build_cart(size)
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    cart.checkout("Benchmark Street 1")
+                    elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        return len(context.captured_queries), elapsed
+
+    def build_cart(self, size):
+        user = User.objects.create(username="checkout-benchmark")
+        customer = Customer.objects.create(
+            user=user,
+            first_name="Checkout",
+            last_name="Benchmark",
+            email="checkout-benchmark@example.com",
+            phone_number="000-benchmark",
+        )
+        category = Category.objects.create(name="Benchmark", slug="benchmark")
+        warehouse = Warehouse.objects.create(name="Benchmark", location="Benchmark")
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"Benchmark product {index}",
+                    subtitle="Benchmark",
+                    category=category,
+                    base_price=10,
+                    flag="New",
+                    slug=f"checkout-benchmark-{index}",
+                    sku=f"BENCH{index:06d}",
+                )
+                for index in range(size)
+            ]
+        )
+        StockLedger.apply_many(
+            {
+                item: 100
+                for item in StockLedger.lock_items(
+                    [(product.pk, warehouse.pk) for product in products],
+                    create=[(product.pk, warehouse.pk) for product in products],
+                ).values()
+            }
+        )
+        cart = Cart.objects.create(customer=customer)
+        CartItem.objects.bulk_create(
+            [
+                CartItem(
+                    cart=cart,
+                    product=product,
+                    quantity=1,
+                    price_per_item=10,
+                    total_price=10,
+                )
+                for product in products
+            ]
+        )
+        cart.calculate_totals()
+        return cart
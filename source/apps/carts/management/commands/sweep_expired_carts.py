@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from source.apps.carts.services import CartSweepService
+
+
+class Command(BaseCommand):
+    help = "Expire idle carts in primary-key batches; resumable with --after-pk."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Expire carts not updated for this many days.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Carts expired per transaction.",
+        )
+        parser.add_argument(
+            "--after-pk",
+            type=int,
+            default=0,
+            help="Resume after this cart primary key (printed with each batch).",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = 0
+        for expired, last_pk in CartSweepService.sweep_expired_carts(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            after_pk=options["after_pk"],
+        ):
+            total += expired
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"Expired {total} carts up to pk {last_pk} "
+                f"({total / elapsed:.0f} carts/s)"
+            )
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Expired {total} carts in {elapsed:.1f}s ({rate:.0f} carts/s)."
+            )
+        )
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0003_alter_cartitem_product"),
+        ("customers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="cart",
+            index=models.Index(
+                condition=models.Q(("is_active", True)),
+                fields=["updated_at"],
+                name="cart_active_updated_idx",
+            ),
+        ),
+    ]
@@ -1,9 +1,9 @@
 import uuid
-from datetime import timedelta
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from django.urls import reverse
 from django.utils import timezone
 
@@ -34,6 +34,14 @@ class Cart(models.Model):
                 check=models.Q(total_quantity__gte=0), name="cart_quantity_non_negative"
             )
         ]
+        indexes = [
+            # CartQuerySet.abandoned() and the expired-cart sweep.
+            models.Index(
+                fields=["updated_at"],
+                condition=models.Q(is_active=True),
+                name="cart_active_updated_idx",
+            )
+        ]
 
     def clean(self):
         # Ensure either session_key or customer is present, but not both
@@ -48,37 +56,69 @@ class Cart(models.Model):
         return self.customer is None
 
     def checkout(self, shipping_address, payment_method=None):
-        from source.apps.orders.models import Order, OrderItem
-
-        if not self.items.exists():
-            raise ValueError("Cannot checkout an empty cart")
-
-        # Create the order
-        order = Order.objects.create(
-            customer=self.customer,
-            total_amount=self.total_price,
-            shipping_address=shipping_address,
-            payment_method=payment_method,
-            status="pending",
-            payment_status="unpaid",
-        )
+        """
+        Turn the cart into an order in one transaction with a fixed number of
+        queries: the order and all its items are written with bulk inserts,
+        the total is computed once and the cart's stock holds are converted.
+        :return: The created Order.
+        """
+        from source.apps.inventory.services import ReservationService
+        from source.apps.orders.models import Order, OrderItem, Payment
+
+        if self.customer_id is None:
+            raise ValueError("A guest cart must be assigned to a customer to checkout")
+
+        with transaction.atomic():
+            # Lock the cart so a double submit cannot create two orders.
+            locked = (
+                Cart.objects.select_for_update().filter(pk=self.pk, is_active=True)
+            ).first()
+            if locked is None:
+                raise ValueError("Cart has already been checked out")
+            items = list(self.items.all())
+            if not items:
+                raise ValueError("Cannot checkout an empty cart")
+
+            # Turn the cart's stock holds into deductions.
+            ReservationService.commit(
+                {item.product_id: item.quantity for item in items}, cart=self
+            )
 
-        # Move cart items to order items
-        for item in self.items.all():
-            OrderItem.objects.create(
-                order=order,
-                product=item.product,
-                quantity=item.quantity,
-                price_per_item=item.price_per_item,
-                total_price=item.total_price,
+            order = Order.objects.create(
+                customer_id=self.customer_id,
+                total_amount=sum(
+                    (item.quantity * item.price_per_item for item in items),
+                    Decimal("0.00"),
+                ),
+                shipping_address=shipping_address,
+                status="pending",
+                payment_status="unpaid",
+            )
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order=order,
+                        product_id=item.product_id,
+                        quantity=item.quantity,
+                        price_per_item=item.price_per_item,
+                        total_price=item.quantity * item.price_per_item,
+                    )
+                    for item in items
+                ],
+                batch_size=500,
             )
+            if payment_method:
+                Payment.objects.create(order=order, payment_method=payment_method)
 
-        # Update inventory, handle fulfillment, etc.
-        self.clear_cart()
-        CartHistory.objects.create(cart=self, status="checked_out")
+            self.clear_cart()
+            CartHistory.objects.create(cart=self, status="checked_out")
+        return order
 
     def clear_cart(self):
         """Clear the cart items after checkout."""
+        from source.apps.inventory.services import ReservationService
+
+        ReservationService.release(cart=self)
         self.items.all().delete()
         self.total_price = 0
         self.total_quantity = 0
@@ -86,43 +126,60 @@ class Cart(models.Model):
         self.save(update_fields=["total_price", "total_quantity", "is_active"])
 
     @staticmethod
-    def clear_expired_carts():
-        expiration_date = timezone.now() - timedelta(days=30)
-        expired_carts = Cart.objects.filter(
-            updated_at__lt=expiration_date, is_active=True
+    def clear_expired_carts(days=30):
+        """Expire idle carts in bulk batches; see CartSweepService."""
+        from .services import CartSweepService
+
+        return sum(
+            expired for expired, _ in CartSweepService.sweep_expired_carts(days=days)
         )
-        for cart in expired_carts:
-            cart.clear_cart()
-            CartHistory.objects.create(cart=cart, status="abandoned")
 
     def calculate_totals(self):
-        """Calculates and updates the cart's total price and quantity."""
-        total = Decimal("0.00")
-        quantity = 0
-        for item in self.items.all():
-            total += item.total_price
-            quantity += item.quantity
-        self.total_price = total
-        self.total_quantity = quantity
+        """Recalculates the cart's total price and quantity from its items."""
+        totals = self.items.aggregate(
+            total=Sum("total_price"), quantity=Sum("quantity")
+        )
+        self.total_price = totals["total"] or Decimal("0.00")
+        self.total_quantity = totals["quantity"] or 0
         self.save(update_fields=["total_price", "total_quantity"])
 
+    def apply_item_delta(self, price_delta, quantity_delta):
+        """Shifts the stored totals by one line's change without reading the items."""
+        if not price_delta and not quantity_delta:
+            return
+        Cart.objects.filter(pk=self.pk).update(
+            total_price=F("total_price") + price_delta,
+            total_quantity=F("total_quantity") + quantity_delta,
+            updated_at=timezone.now(),
+        )
+        self.total_price += price_delta
+        self.total_quantity += quantity_delta
+
     def add_item(self, product, quantity=1):
-        """Adds an item to the cart or updates its quantity."""
-        cart_item, created = self.items.get_or_create(product=product)
-        if not created:
-            cart_item.quantity += quantity
+        """Adds an item to the cart or updates its quantity and holds the stock."""
+        from source.apps.inventory.services import ReservationService
+
+        cart_item = self.items.filter(product=product).first()
+        if cart_item is None:
+            cart_item = CartItem(cart=self, product=product, quantity=quantity)
         else:
-            cart_item.quantity = quantity
-            cart_item.price_per_item = product.price
-        cart_item.save()
-        self.calculate_totals()
+            cart_item.cart = self
+            cart_item.quantity += quantity
+        # Hold the stock first: without it the line must not change.
+        with transaction.atomic():
+            ReservationService.reserve({product.pk: cart_item.quantity}, cart=self)
+            cart_item.save()
+        return cart_item
 
     def remove_item(self, product):
-        """Removes an item from the cart."""
+        """Removes an item from the cart and releases its stock hold."""
+        from source.apps.inventory.services import ReservationService
+
         try:
             cart_item = self.items.get(product=product)
+            cart_item.cart = self
             cart_item.delete()
-            self.calculate_totals()
+            ReservationService.release(cart=self, product_ids=[product.pk])
         except CartItem.DoesNotExist:
             pass
 
@@ -164,11 +221,40 @@ class CartItem(models.Model):
             )
         ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored line so saves can update the cart by delta.
+        loaded = dict(zip(field_names, values))
+        instance._loaded_line = (loaded.get("total_price"), loaded.get("quantity"))
+        return instance
+
     def save(self, *args, **kwargs):
-        self.price_per_item = self.product.price
+        self.price_per_item = self.product.base_price
         self.total_price = self.quantity * self.price_per_item
-        super().save(*args, **kwargs)
-        self.cart.calculate_totals()
+        old_total, old_quantity = (
+            (0, 0)
+            if self._state.adding
+            else getattr(self, "_loaded_line", (None, None))
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_total is None or old_quantity is None:
+                self.cart.calculate_totals()
+            else:
+                self.cart.apply_item_delta(
+                    self.total_price - old_total, self.quantity - old_quantity
+                )
+        self._loaded_line = (self.total_price, self.quantity)
+
+    def delete(self, *args, **kwargs):
+        total, quantity = getattr(
+            self, "_loaded_line", (self.total_price, self.quantity)
+        )
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.cart.apply_item_delta(-total, -quantity)
+        return result
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name} in Cart {self.cart.id}"
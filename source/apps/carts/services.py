@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from source.apps.inventory.models import StockReservation
+
+from .models import Cart, CartHistory, CartItem
+
+
+class CartSweepService:
+    @staticmethod
+    def sweep_expired_carts(days=30, batch_size=1000, after_pk=0):
+        """
+        Expire carts idle for more than `days`, walking the cart table in
+        primary-key order. Each batch is one transaction of set-based
+        statements, so an interrupted sweep can be resumed from the last
+        reported primary key (already expired carts are skipped anyway).
+        :return: Generator of (carts expired, last primary key) per batch.
+        """
+        cutoff = timezone.now() - timedelta(days=days)
+        while True:
+            expired, after_pk = CartSweepService.expire_batch(
+                cutoff, after_pk, batch_size
+            )
+            if after_pk is None:
+                return
+            yield expired, after_pk
+
+    @staticmethod
+    def expire_batch(cutoff, after_pk, batch_size):
+        """
+        Expire the next batch of carts not updated since `cutoff`.
+        :return: (carts expired, last primary key) or (0, None) when done.
+        """
+        with transaction.atomic():
+            cart_ids = list(
+                Cart.objects.select_for_update()
+                .filter(pk__gt=after_pk, is_active=True, updated_at__lt=cutoff)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not cart_ids:
+                return 0, None
+            StockReservation.objects.filter(cart_id__in=cart_ids).delete()
+            CartItem.objects.filter(cart_id__in=cart_ids).delete()
+            Cart.objects.filter(pk__in=cart_ids).update(
+                total_price=0, total_quantity=0, is_active=False
+            )
+            CartHistory.objects.bulk_create(
+                [
+                    CartHistory(cart_id=cart_id, status="abandoned")
+                    for cart_id in cart_ids
+                ]
+            )
+        return len(cart_ids), cart_ids[-1]
@@ -1,16 +1,15 @@
-from .models import Product, Warehouse
-from .services import InventoryService, StockAdjustmentService, TransferService
+from .models import InventoryItem, Product, Warehouse
+from .services import StockAdjustmentService, TransferService
 
 
 class LogisticsController:
     def adjust_stock(self, product_id, warehouse_id, adjustment_type, quantity, user):
         product = Product.objects.get(id=product_id)
         warehouse = Warehouse.objects.get(id=warehouse_id)
-        inventory_item = (
-            InventoryService.add_stock(product, warehouse, quantity)
-            if adjustment_type == "add"
-            else InventoryService.remove_stock(product, warehouse, quantity)
+        inventory_item, _ = InventoryItem.objects.get_or_create(
+            product=product, location=warehouse, defaults={"status": "in_stock"}
         )
+        # The adjustment applies the delta through the stock ledger.
         return StockAdjustmentService.create_adjustment(
             inventory_item, adjustment_type, quantity, "Manual Adjustment", user
         )
@@ -0,0 +1,100 @@
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+ADJUSTMENT_APPLIED = "adjustment_applied"
+TRANSFER_COMPLETED = "transfer_completed"
+STATUS_CHANGED = "status_changed"
+
+
+class InventoryEvent:
+    """
+    A logical change to one inventory item, identified by (product, warehouse).
+    Events with the same kind and key describe the same change and are
+    delivered once.
+    """
+
+    def __init__(self, kind, product_id, warehouse_id, key=None, **data):
+        self.kind = kind
+        self.product_id = product_id
+        self.warehouse_id = warehouse_id
+        self.key = key
+        self.data = data
+
+    @property
+    def item_key(self):
+        return self.product_id, self.warehouse_id
+
+    def __repr__(self):
+        return f"<InventoryEvent {self.kind} {self.item_key} {self.data}>"
+
+
+class InventoryEventPipeline:
+    """
+    Defers inventory side effects until the surrounding transaction commits.
+    Events raised inside a collect() scope (e.g. one request) are grouped per
+    item, deduplicated, and handed to each subscriber once per item when the
+    outermost scope exits. Events from rolled-back transactions are dropped.
+    """
+
+    def __init__(self):
+        self._handlers = []
+        self._local = threading.local()
+
+    def subscribe(self, handler):
+        """Register handler(product_id, warehouse_id, events); usable as decorator."""
+        self._handlers.append(handler)
+        return handler
+
+    def publish(self, kind, product_id, warehouse_id, key=None, **data):
+        event = InventoryEvent(kind, product_id, warehouse_id, key=key, **data)
+        transaction.on_commit(lambda: self._committed(event))
+
+    @contextmanager
+    def collect(self):
+        """Batch events committed inside this scope into one dispatch per item."""
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        if self._local.depth == 1:
+            self._local.events = []
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                events, self._local.events = self._local.events, None
+                self._dispatch(events)
+
+    def _committed(self, event):
+        if getattr(self._local, "depth", 0):
+            self._local.events.append(event)
+        else:
+            self._dispatch([event])
+
+    def _dispatch(self, events):
+        grouped = {}
+        seen = set()
+        for event in events:
+            if event.key is not None:
+                if (event.kind, event.key, event.item_key) in seen:
+                    continue
+                seen.add((event.kind, event.key, event.item_key))
+            grouped.setdefault(event.item_key, []).append(event)
+
+        for (product_id, warehouse_id), item_events in grouped.items():
+            for handler in self._handlers:
+                try:
+                    handler(product_id, warehouse_id, item_events)
+                except Exception:
+                    logger.exception(
+                        "Inventory event handler %r failed for product %s in warehouse %s",
+                        handler,
+                        product_id,
+                        warehouse_id,
+                    )
+
+
+inventory_events = InventoryEventPipeline()
@@ -0,0 +1,232 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.db.models.lookups import Exact, GreaterThanOrEqual
+from django.utils import timezone
+
+from .events import STATUS_CHANGED, inventory_events
+from .models import InventoryItem
+from .summary import StockSummary, delta_case
+
+# Items per UPDATE statement; keeps CASE parameters under backend limits.
+BULK_BATCH_SIZE = 400
+
+
+class StockLedger:
+    """
+    Single entry point for every change to InventoryItem.quantity.
+    Deltas are applied with conditional UPDATE statements instead of a
+    read-modify-write in Python, so concurrent writers never lose updates
+    and a removal can never drive a row below zero. The same deltas are
+    folded into the stock summary roll-ups.
+    """
+
+    @staticmethod
+    def add(product, warehouse, quantity):
+        """
+        Add stock for a product in a warehouse, creating the row if needed.
+        :return: The new stock level.
+        """
+        return StockLedger.apply(product, warehouse, quantity)
+
+    @staticmethod
+    def remove(product, warehouse, quantity):
+        """
+        Remove stock for a product in a warehouse.
+        :raise: ValidationError if the warehouse does not hold enough stock.
+        :return: The new stock level.
+        """
+        return StockLedger.apply(product, warehouse, -quantity)
+
+    @staticmethod
+    def adjust(inventory_item, adjustment_type, quantity):
+        """
+        Apply an 'add' or 'remove' adjustment to an existing inventory item and
+        refresh the in-memory instance with the stored values.
+        :return: The new stock level.
+        """
+        if adjustment_type not in ("add", "remove"):
+            raise ValidationError(f"Invalid adjustment type: {adjustment_type}")
+        delta = quantity if adjustment_type == "add" else -quantity
+        row = InventoryItem.objects.filter(pk=inventory_item.pk)
+        with inventory_events.collect(), transaction.atomic():
+            if not StockLedger._update(row, delta):
+                raise ValidationError("Insufficient stock")
+            StockSummary.apply(
+                {(inventory_item.product_id, inventory_item.location_id): delta}
+            )
+            inventory_item.quantity, inventory_item.status = row.values_list(
+                "quantity", "status"
+            ).get()
+            # The ledger already folded the delta in; later saves of this
+            # instance must not count it again.
+            inventory_item._loaded_quantity = inventory_item.quantity
+            inventory_item._loaded_status = inventory_item.status
+            StockLedger._publish_status_change(
+                inventory_item.product_id,
+                inventory_item.location_id,
+                inventory_item.quantity - delta,
+                inventory_item.quantity,
+            )
+        return inventory_item.quantity
+
+    @staticmethod
+    def apply(product, warehouse, delta):
+        """
+        Apply a signed delta to the (product, warehouse) inventory row.
+        :return: The new stock level.
+        """
+        row = InventoryItem.objects.filter(product=product, location=warehouse)
+        with inventory_events.collect(), transaction.atomic():
+            if not StockLedger._update(row, delta):
+                if delta < 0:
+                    raise ValidationError("Insufficient stock")
+                InventoryItem.objects.get_or_create(
+                    product=product,
+                    location=warehouse,
+                    defaults={"quantity": 0, "status": "in_stock"},
+                )
+                StockLedger._update(row, delta)
+            StockSummary.apply({(product.pk, warehouse.pk): delta})
+            level = row.values_list("quantity", flat=True).get()
+            StockLedger._publish_status_change(
+                product.pk, warehouse.pk, level - delta, level
+            )
+        return level
+
+    @staticmethod
+    def _update(row, delta):
+        """
+        Run the guarded UPDATE against a single-row queryset.
+        :return: Number of rows changed (0 when the row is missing or short).
+        """
+        now = timezone.now()
+        if delta >= 0:
+            return row.update(
+                quantity=F("quantity") + delta,
+                status=Value("in_stock"),
+                low_stock_since=StockLedger._low_stock_since(delta, now),
+                last_updated=now,
+            )
+        # Conditions inside an UPDATE see the pre-update quantity.
+        return row.filter(quantity__gte=-delta).update(
+            quantity=F("quantity") + delta,
+            status=Case(When(quantity=-delta, then=Value("sold")), default=F("status")),
+            low_stock_since=StockLedger._low_stock_since(delta, now),
+            last_updated=now,
+        )
+
+    @staticmethod
+    def _low_stock_since(delta, now):
+        """
+        Expression keeping InventoryItem.low_stock_since in step with a delta:
+        set when the new level first drops below threshold, cleared once it
+        is back at or above it, left alone otherwise (edge-triggered).
+        """
+        return Case(
+            When(
+                GreaterThanOrEqual(F("quantity") + delta, F("threshold")),
+                then=Value(None),
+            ),
+            When(low_stock_since__isnull=True, then=Value(now)),
+            default=F("low_stock_since"),
+            output_field=DateTimeField(),
+        )
+
+    @staticmethod
+    def lock_items(keys, create=()):
+        """
+        Lock the inventory rows for a set of (product_id, warehouse_id) keys.
+        Rows are locked in primary-key order so concurrent batches touching
+        the same items always acquire locks in the same order and cannot
+        deadlock. Must be called inside a transaction.
+        :param create: Keys whose rows should be created (empty) when missing,
+            typically the ones that only receive stock.
+        :return: Mapping of (product_id, warehouse_id) to locked InventoryItem.
+        """
+        keys = set(keys)
+
+        def fetch():
+            queryset = (
+                InventoryItem.objects.select_for_update()
+                .filter(
+                    product_id__in={product_id for product_id, _ in keys},
+                    location_id__in={warehouse_id for _, warehouse_id in keys},
+                )
+                .order_by("pk")
+            )
+            return {
+                (item.product_id, item.location_id): item
+                for item in queryset
+                if (item.product_id, item.location_id) in keys
+            }
+
+        items = fetch()
+        missing = set(create) - items.keys()
+        if missing:
+            InventoryItem.objects.bulk_create(
+                [
+                    InventoryItem(
+                        product_id=product_id,
+                        location_id=warehouse_id,
+                        quantity=0,
+                        status="in_stock",
+                    )
+                    for product_id, warehouse_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+            items = fetch()
+        return items
+
+    @staticmethod
+    def apply_many(deltas):
+        """
+        Apply net deltas to many inventory items with one UPDATE per batch.
+        Callers must hold row locks (select_for_update) on the affected items
+        and have checked that no level goes negative.
+        :param deltas: Mapping of locked InventoryItem instances to signed delta.
+        """
+        for item, delta in deltas.items():
+            StockLedger._publish_status_change(
+                item.product_id, item.location_id, item.quantity, item.quantity + delta
+            )
+        pending = [(item.pk, delta) for item, delta in deltas.items()]
+        now = timezone.now()
+        while pending:
+            batch, pending = dict(pending[:BULK_BATCH_SIZE]), pending[BULK_BATCH_SIZE:]
+            delta = delta_case(batch)
+            restocked = [pk for pk, value in batch.items() if value > 0]
+            InventoryItem.objects.filter(pk__in=batch).update(
+                quantity=F("quantity") + delta,
+                status=Case(
+                    When(pk__in=restocked, then=Value("in_stock")),
+                    When(Exact(F("quantity") + delta, 0), then=Value("sold")),
+                    default=F("status"),
+                ),
+                low_stock_since=StockLedger._low_stock_since(delta, now),
+                last_updated=now,
+            )
+        StockSummary.apply(
+            {
+                (item.product_id, item.location_id): delta
+                for item, delta in deltas.items()
+            }
+        )
+
+    @staticmethod
+    def _publish_status_change(product_id, warehouse_id, old_level, new_level):
+        """Report the status flips the ledger causes: selling out and restocking."""
+        if old_level > 0 and new_level == 0:
+            status = "sold"
+        elif old_level == 0 and new_level > 0:
+            status = "in_stock"
+        else:
+            return
+        inventory_events.publish(
+            STATUS_CHANGED,
+            product_id,
+            warehouse_id,
+            status=status,
+            quantity=new_level,
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.inventory.services import ReservationService
+
+
+class Command(BaseCommand):
+    help = "Release expired stock reservations held by carts and orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of reservations deleted per statement.",
+        )
+
+    def handle(self, *args, **options):
+        released = ReservationService.sweep_expired(options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Released {released} expired stock reservations.")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from source.apps.inventory.summary import StockSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-product and per-warehouse stock summaries, or verify them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only report drift between the summaries and inventory; exit 1 on drift.",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = StockSummary.drift()
+        for scope, key, stored, actual in mismatches:
+            self.stdout.write(
+                f"{scope} {key}: summary={stored} inventory={actual} "
+                f"(drift {stored - actual:+d})"
+            )
+
+        if options["verify"]:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} stock summaries have drifted.")
+            self.stdout.write(self.style.SUCCESS("Stock summaries are consistent."))
+            return
+
+        products, warehouses = StockSummary.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {products} product and {warehouses} warehouse stock summaries "
+                f"({len(mismatches)} corrected)."
+            )
+        )
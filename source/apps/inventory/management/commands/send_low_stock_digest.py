@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.inventory.services import LowStockService
+
+
+class Command(BaseCommand):
+    help = "Email one digest of inventory items that newly dropped below threshold."
+
+    def handle(self, *args, **options):
+        count = LowStockService.send_digest()
+        self.stdout.write(
+            self.style.SUCCESS(f"Low-stock digest sent for {count} items.")
+            if count
+            else "No new low-stock items."
+        )
@@ -1,6 +1,10 @@
 from django.db import models
 
-from .querysets import InventoryItemQuerySet, WarehouseQuerySet
+from .querysets import (
+    InventoryItemQuerySet,
+    StockReservationQuerySet,
+    WarehouseQuerySet,
+)
 
 
 class InventoryItemManager(models.Manager):
@@ -19,6 +23,15 @@ class InventoryItemManager(models.Manager):
     def in_warehouse(self, warehouse_id):
         return self.get_queryset().in_warehouse(warehouse_id)
 
+    def with_available(self):
+        return self.get_queryset().with_available()
+
+    def low_stock(self):
+        return self.get_queryset().low_stock()
+
+    def pending_low_stock_alerts(self):
+        return self.get_queryset().pending_low_stock_alerts()
+
 
 class WarehouseManager(models.Manager):
     def get_queryset(self):
@@ -26,3 +39,17 @@ class WarehouseManager(models.Manager):
 
     def with_manager(self, user_id):
         return self.get_queryset().with_manager(user_id)
+
+    def with_total_stock(self):
+        return self.get_queryset().with_total_stock()
+
+
+class StockReservationManager(models.Manager):
+    def get_queryset(self):
+        return StockReservationQuerySet(self.model, using=self._db)
+
+    def active(self):
+        return self.get_queryset().active()
+
+    def expired(self):
+        return self.get_queryset().expired()
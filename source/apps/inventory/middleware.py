@@ -0,0 +1,15 @@
+from .events import inventory_events
+
+
+class InventoryEventMiddleware:
+    """
+    Collect inventory events for the whole request so each touched item
+    triggers its side effects once, after the request's writes commit.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with inventory_events.collect():
+            return self.get_response(request)
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_stock_summaries(apps, schema_editor):
+    InventoryItem = apps.get_model("inventory", "InventoryItem")
+    ProductStockSummary = apps.get_model("inventory", "ProductStockSummary")
+    WarehouseStockSummary = apps.get_model("inventory", "WarehouseStockSummary")
+    ProductStockSummary.objects.bulk_create(
+        [
+            ProductStockSummary(product_id=row["product_id"], quantity=row["total"])
+            for row in InventoryItem.objects.values("product_id").annotate(
+                total=Sum("quantity")
+            )
+        ],
+        batch_size=1000,
+    )
+    WarehouseStockSummary.objects.bulk_create(
+        [
+            WarehouseStockSummary(
+                warehouse_id=row["location_id"], quantity=row["total"]
+            )
+            for row in InventoryItem.objects.values("location_id").annotate(
+                total=Sum("quantity")
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0003_inventoryitem_is_active_inventoryitem_threshold_and_more"),
+        ("products", "0006_alter_product_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductStockSummary",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_summary",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("quantity", models.IntegerField(default=0)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Product Stock Summary",
+                "verbose_name_plural": "Product Stock Summaries",
+            },
+        ),
+        migrations.CreateModel(
+            name="WarehouseStockSummary",
+            fields=[
+                (
+                    "warehouse",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_summary",
+                        serialize=False,
+                        to="inventory.warehouse",
+                    ),
+                ),
+                ("quantity", models.IntegerField(default=0)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Warehouse Stock Summary",
+                "verbose_name_plural": "Warehouse Stock Summaries",
+            },
+        ),
+        migrations.RunPython(populate_stock_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:57
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def mark_low_stock_items(apps, schema_editor):
+    InventoryItem = apps.get_model("inventory", "InventoryItem")
+    InventoryItem.objects.filter(quantity__lt=F("threshold")).update(
+        low_stock_since=timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_stock_summary"),
+        ("products", "0006_alter_product_description"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inventoryitem",
+            name="low_stock_alerted_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="inventoryitem",
+            name="low_stock_since",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="inventoryitem",
+            index=models.Index(
+                condition=models.Q(("low_stock_since__isnull", False)),
+                fields=["low_stock_since"],
+                name="inventory_item_low_stock_idx",
+            ),
+        ),
+        migrations.RunPython(mark_low_stock_items, migrations.RunPython.noop),
+    ]
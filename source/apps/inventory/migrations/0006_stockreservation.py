@@ -0,0 +1,75 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("carts", "0003_alter_cartitem_product"),
+        ("inventory", "0005_inventoryitem_low_stock"),
+        ("orders", "0006_alter_order_total_amount_alter_orderitem_quantity_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                ("expires_at", models.DateTimeField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "cart",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="carts.cart",
+                    ),
+                ),
+                (
+                    "inventory_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="inventory.inventoryitem",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="orders.order",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock Reservation",
+                "verbose_name_plural": "Stock Reservations",
+                "ordering": ["expires_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["inventory_item", "expires_at"],
+                        name="stock_reservation_item_idx",
+                    ),
+                    models.Index(
+                        fields=["expires_at"], name="stock_reservation_expiry_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_stockreservation"),
+        ("products", "0007_skusequence"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventoryitem",
+            index=models.Index(
+                fields=["last_updated", "id"], name="inventory_item_sync_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventorytransfer",
+            index=models.Index(
+                fields=["created_at", "id"], name="inventory_transfer_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockadjustment",
+            index=models.Index(
+                fields=["created_at", "id"], name="stock_adjustment_created_idx"
+            ),
+        ),
+    ]
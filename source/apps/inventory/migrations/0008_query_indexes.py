@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_keyset_indexes"),
+        ("products", "0007_skusequence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventoryitem",
+            index=models.Index(
+                condition=models.Q(("low_stock_since__isnull", False)),
+                fields=["last_updated"],
+                name="inventory_item_low_list_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventoryitem",
+            index=models.Index(
+                fields=["location", "status"], name="inventory_item_loc_status_idx"
+            ),
+        ),
+    ]
@@ -1,9 +1,17 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.forms import ValidationError
+from django.utils import timezone
 
 from source.apps.products.models import Product
 
+from .events import ADJUSTMENT_APPLIED, TRANSFER_COMPLETED, inventory_events
+from .managers import (
+    InventoryItemManager,
+    StockReservationManager,
+    WarehouseManager,
+)
+
 
 class Warehouse(models.Model):
     name = models.CharField(max_length=255)
@@ -12,6 +20,7 @@ class Warehouse(models.Model):
         User, on_delete=models.SET_NULL, null=True, related_name="warehouses_manager"
     )
     capacity = models.PositiveIntegerField(default=10000)
+    objects = WarehouseManager()
 
     class Meta:
         ordering = ["name"]
@@ -23,9 +32,10 @@ class Warehouse(models.Model):
 
     def total_stock(self):
         """Returns total quantity of products in the warehouse."""
-        return (
-            self.stocked_products.aggregate(total=models.Sum("quantity"))["total"] or 0
-        )
+        try:
+            return self.stock_summary.quantity
+        except WarehouseStockSummary.DoesNotExist:
+            return 0
 
     def generate_report(self):
         """Generate a warehouse-specific stock report."""
@@ -48,11 +58,32 @@ class InventoryItem(models.Model):
     )
     status = models.CharField(max_length=50, choices=STATUS_CHOICES)
     threshold = models.PositiveIntegerField(default=10)
+    # Set when quantity drops below threshold, cleared when it recovers.
+    low_stock_since = models.DateTimeField(null=True, blank=True, editable=False)
+    low_stock_alerted_at = models.DateTimeField(null=True, blank=True, editable=False)
     last_updated = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    objects = InventoryItemManager()
 
     class Meta:
         unique_together = ("product", "location")
+        indexes = [
+            models.Index(
+                fields=["low_stock_since"],
+                condition=models.Q(low_stock_since__isnull=False),
+                name="inventory_item_low_stock_idx",
+            ),
+            # InventoryItemQuerySet.low_stock() in its default -last_updated order.
+            models.Index(
+                fields=["last_updated"],
+                condition=models.Q(low_stock_since__isnull=False),
+                name="inventory_item_low_list_idx",
+            ),
+            models.Index(fields=["last_updated", "id"], name="inventory_item_sync_idx"),
+            models.Index(
+                fields=["location", "status"], name="inventory_item_loc_status_idx"
+            ),
+        ]
         ordering = ["-last_updated"]
         verbose_name = "Inventory Item"
         verbose_name_plural = "Inventory Items"
@@ -60,9 +91,18 @@ class InventoryItem(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.location.name} ({self.status})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so saves can tell when it really changed.
+        loaded = dict(zip(field_names, values))
+        instance._loaded_status = loaded.get("status")
+        instance._loaded_quantity = loaded.get("quantity")
+        return instance
+
     def is_low_stock(self):
-        """Checks if the inventory is low on stock based on a threshold."""
-        return self.quantity < self.threshold
+        """Checks if the item is in the low-stock set (quantity below threshold)."""
+        return self.low_stock_since is not None
 
     def clean(self):
         """Ensure the status is valid."""
@@ -76,6 +116,10 @@ class InventoryItem(models.Model):
         if self.quantity < 0:
             raise ValidationError("Quantity cannot be negative.")
         self.last_updated = models.DateTimeField(auto_now=True)
+        if self.quantity < self.threshold:
+            self.low_stock_since = self.low_stock_since or timezone.now()
+        else:
+            self.low_stock_since = None
         super().save(*args, **kwargs)
 
     def delete(self):
@@ -101,6 +145,11 @@ class StockAdjustment(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Stock Adjustment"
         verbose_name_plural = "Stock Adjustments"
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="stock_adjustment_created_idx"
+            )
+        ]
 
     def __str__(self):
         return f"{self.adjustment_type.capitalize()} {self.quantity} of {self.inventory_item.product.name}"
@@ -116,15 +165,30 @@ class StockAdjustment(models.Model):
             raise ValidationError("Adjustment quantity must be positive.")
 
     def save(self, *args, **kwargs):
-        """Adjust inventory item quantity based on adjustment type."""
-        if self.adjustment_type == "add":
-            self.inventory_item.quantity += self.quantity
-        elif self.adjustment_type == "remove":
-            if self.inventory_item.quantity < self.quantity:
-                raise ValidationError("Not enough stock to remove.")
-            self.inventory_item.quantity -= self.quantity
-        self.inventory_item.save()
-        super().save(*args, **kwargs)
+        """Apply the adjustment to the inventory item when it is first recorded."""
+        from .ledger import StockLedger
+
+        if self._state.adding:
+            with inventory_events.collect(), transaction.atomic():
+                StockLedger.adjust(
+                    self.inventory_item, self.adjustment_type, self.quantity
+                )
+                super().save(*args, **kwargs)
+                self.publish_applied()
+        else:
+            super().save(*args, **kwargs)
+
+    def publish_applied(self):
+        """Announce this adjustment to the inventory event pipeline."""
+        inventory_events.publish(
+            ADJUSTMENT_APPLIED,
+            self.inventory_item.product_id,
+            self.inventory_item.location_id,
+            key=self.pk,
+            adjustment_type=self.adjustment_type,
+            quantity=self.quantity,
+            reason=self.reason,
+        )
 
 
 class InventoryTransfer(models.Model):
@@ -133,6 +197,12 @@ class InventoryTransfer(models.Model):
         ("completed", "Completed"),
         ("failed", "Failed"),
     ]
+    # Allowed status changes; see TransferService.transition.
+    TRANSITIONS = {
+        "pending": {"completed", "failed"},
+        "completed": {"failed"},
+        "failed": set(),
+    }
     product = models.ForeignKey(
         Product, on_delete=models.CASCADE, related_name="transfers_handled"
     )
@@ -155,6 +225,11 @@ class InventoryTransfer(models.Model):
         ordering = ["-created_at"]
         verbose_name = "Inventory Transfer"
         verbose_name_plural = "Inventory Transfers"
+        indexes = [
+            models.Index(
+                fields=["created_at", "id"], name="inventory_transfer_created_idx"
+            )
+        ]
 
     def __str__(self):
         return f"Transfer {self.product.name} from {self.from_location.name} to {self.to_location.name}"
@@ -180,67 +255,124 @@ class InventoryTransfer(models.Model):
             )
 
     def save(self, *args, **kwargs):
-        """Handle the transfer logic based on status."""
-        if not self.pk:
-            # New transfer
-            if self.status == "completed":
-                # Deduct from source
-                source_inventory = InventoryItem.objects.filter(
-                    product=self.product, location=self.from_location
-                ).first()
-                if source_inventory and source_inventory.quantity >= self.quantity:
-                    source_inventory.quantity -= self.quantity
-                    source_inventory.save()
-                else:
-                    raise ValidationError("Insufficient stock in source warehouse.")
-
-                # Add to destination
-                dest_inventory, created = InventoryItem.objects.get_or_create(
-                    product=self.product,
-                    location=self.to_location,
-                    defaults={"quantity": 0, "status": "in_stock"},
+        """
+        Persist the transfer; status changes are applied by
+        TransferService.transition so stock moves exactly once.
+        """
+        from .services import TransferService
+
+        with inventory_events.collect(), transaction.atomic():
+            target = self.status or "pending"
+            if self.pk:
+                self.status = (
+                    InventoryTransfer.objects.filter(pk=self.pk)
+                    .values_list("status", flat=True)
+                    .get()
                 )
-                dest_inventory.quantity += self.quantity
-                dest_inventory.save()
-            super().save(*args, **kwargs)
-        else:
-            # Existing transfer
-            previous = InventoryTransfer.objects.get(pk=self.pk)
-            if previous.status != self.status:
-                if self.status == "completed" and previous.status != "completed":
-                    # Handle completion
-                    if self.is_transfer_possible():
-                        source_inventory = InventoryItem.objects.filter(
-                            product=self.product, location=self.from_location
-                        ).first()
-                        dest_inventory, created = InventoryItem.objects.get_or_create(
-                            product=self.product,
-                            location=self.to_location,
-                            defaults={"quantity": 0, "status": "in_stock"},
-                        )
-                        source_inventory.quantity -= self.quantity
-                        source_inventory.save()
-                        dest_inventory.quantity += self.quantity
-                        dest_inventory.save()
-                    else:
-                        raise ValidationError(
-                            "Not enough stock in source warehouse to complete transfer."
-                        )
-                elif self.status == "failed" and previous.status == "completed":
-                    # Reverse the transfer
-                    source_inventory = InventoryItem.objects.filter(
-                        product=self.product, location=self.from_location
-                    ).first()
-                    dest_inventory = InventoryItem.objects.filter(
-                        product=self.product, location=self.to_location
-                    ).first()
-                    if dest_inventory and dest_inventory.quantity >= self.quantity:
-                        dest_inventory.quantity -= self.quantity
-                        dest_inventory.save()
-                        source_inventory.quantity += self.quantity
-                        source_inventory.save()
-                    else:
-                        raise ValidationError(
-                            "Cannot reverse transfer due to insufficient stock in destination warehouse."
-                        )
+            elif target != "pending":
+                self.status = "pending"
             super().save(*args, **kwargs)
+            if target != self.status:
+                TransferService.transition([self], target)
+
+    def publish_completed(self):
+        """Announce the completed transfer for both affected inventory items."""
+        for warehouse_id in (self.from_location_id, self.to_location_id):
+            inventory_events.publish(
+                TRANSFER_COMPLETED,
+                self.product_id,
+                warehouse_id,
+                key=self.pk,
+                transfer_id=self.pk,
+                from_location_id=self.from_location_id,
+                to_location_id=self.to_location_id,
+                quantity=self.quantity,
+            )
+
+
+class ProductStockSummary(models.Model):
+    """Total quantity of a product across all warehouses, kept by StockSummary."""
+
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stock_summary",
+    )
+    quantity = models.IntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Product Stock Summary"
+        verbose_name_plural = "Product Stock Summaries"
+
+    def __str__(self):
+        return f"{self.product.name}: {self.quantity}"
+
+
+class WarehouseStockSummary(models.Model):
+    """Total quantity of all products in a warehouse, kept by StockSummary."""
+
+    warehouse = models.OneToOneField(
+        Warehouse,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stock_summary",
+    )
+    quantity = models.IntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Warehouse Stock Summary"
+        verbose_name_plural = "Warehouse Stock Summaries"
+
+    def __str__(self):
+        return f"{self.warehouse.name}: {self.quantity}"
+
+
+class StockReservation(models.Model):
+    """
+    A time-limited hold on stock of an inventory item for a cart or order.
+    Held stock stays on hand but is excluded from available-to-promise until
+    the hold is converted into a deduction or expires.
+    """
+
+    inventory_item = models.ForeignKey(
+        InventoryItem, on_delete=models.CASCADE, related_name="reservations"
+    )
+    quantity = models.PositiveIntegerField()
+    cart = models.ForeignKey(
+        "carts.Cart",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="stock_reservations",
+    )
+    order = models.ForeignKey(
+        "orders.Order",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="stock_reservations",
+    )
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    objects = StockReservationManager()
+
+    class Meta:
+        ordering = ["expires_at"]
+        verbose_name = "Stock Reservation"
+        verbose_name_plural = "Stock Reservations"
+        indexes = [
+            models.Index(
+                fields=["inventory_item", "expires_at"],
+                name="stock_reservation_item_idx",
+            ),
+            models.Index(fields=["expires_at"], name="stock_reservation_expiry_idx"),
+        ]
+
+    def __str__(self):
+        return f"Hold {self.quantity} of {self.inventory_item} until {self.expires_at}"
+
+    def is_active(self):
+        return self.expires_at > timezone.now()
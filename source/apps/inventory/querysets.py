@@ -1,5 +1,7 @@
 from django.db import models
-from django.db.models import Sum
+from django.db.models import F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
 class InventoryItemQuerySet(models.QuerySet):
@@ -27,7 +29,50 @@ class InventoryItemQuerySet(models.QuerySet):
     def sold(self):
         return self.filter(status="sold")
 
+    def with_available(self):
+        """Annotate available-to-promise: on-hand minus active reservations."""
+        from .models import StockReservation
+
+        held = (
+            StockReservation.objects.active()
+            .filter(inventory_item=OuterRef("pk"))
+            .values("inventory_item")
+            .annotate(total=Sum("quantity"))
+            .values("total")
+        )
+        return self.annotate(
+            reserved_quantity=Coalesce(Subquery(held), 0),
+            available_quantity=F("quantity") - Coalesce(Subquery(held), 0),
+        )
+
+    def low_stock(self):
+        return self.filter(low_stock_since__isnull=False)
+
+    def pending_low_stock_alerts(self):
+        """Low-stock items whose current low-stock episode has not been alerted."""
+        return self.low_stock().filter(
+            Q(low_stock_alerted_at__isnull=True)
+            | Q(low_stock_alerted_at__lt=F("low_stock_since"))
+        )
+
 
 class WarehouseQuerySet(models.QuerySet):
     def with_manager(self, user_id):
         return self.filter(manager_id=user_id)
+
+    def with_total_stock(self):
+        return self.annotate(total_quantity=Coalesce("stock_summary__quantity", 0))
+
+
+class StockReservationQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def for_cart(self, cart):
+        return self.filter(cart=cart)
+
+    def for_order(self, order):
+        return self.filter(order=order)
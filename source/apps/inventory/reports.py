@@ -1,17 +1,20 @@
-from django.db.models import Count, Sum
+from django.db.models import Count, F, Sum
 
-from .models import InventoryItem, InventoryTransfer, StockAdjustment
+from .models import (
+    InventoryItem,
+    InventoryTransfer,
+    StockAdjustment,
+    WarehouseStockSummary,
+)
 
 
 def inventory_report():
-    total_stock = InventoryItem.objects.aggregate(total_stock=Sum("quantity"))[
+    # One row per warehouse instead of one per inventory item.
+    total_stock = WarehouseStockSummary.objects.aggregate(total_stock=Sum("quantity"))[
         "total_stock"
     ]
-    low_stock_items = (
-        InventoryItem.objects.annotate(total_quantity=Sum("quantity"))
-        .filter(total_quantity__lt=10)
-        .count()
-    )
+    # Per-item thresholds, tracked by low_stock_since (indexed).
+    low_stock_items = InventoryItem.objects.low_stock().count()
 
     return {
         "total_stock": total_stock,
@@ -33,16 +36,15 @@ def transfer_report():
 
 
 def stock_summary():
-    return InventoryItem.objects.values("product__name", "location__name").annotate(
-        total_quantity=Sum("quantity")
+    # InventoryItem is unique per (product, location): no grouping needed.
+    return InventoryItem.objects.values(
+        "product__name", "location__name", total_quantity=F("quantity")
     )
 
 
 def warehouse_stock(warehouse_id):
-    return (
-        InventoryItem.objects.filter(location_id=warehouse_id)
-        .values("product__name")
-        .annotate(total_quantity=Sum("quantity"))
+    return InventoryItem.objects.filter(location_id=warehouse_id).values(
+        "product__name", total_quantity=F("quantity")
     )
 
 
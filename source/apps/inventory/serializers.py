@@ -68,3 +68,23 @@ class InventoryTransferSerializer(serializers.ModelSerializer):
             "created_at",
             "status",
         ]
+
+
+class StockAdjustmentRowSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    warehouse = serializers.IntegerField()
+    adjustment_type = serializers.CharField(max_length=50)
+    quantity = serializers.IntegerField()
+    reason = serializers.CharField(
+        max_length=255, required=False, allow_blank=True, allow_null=True
+    )
+
+    def to_internal_value(self, data):
+        row = super().to_internal_value(data)
+        row["product_id"] = row.pop("product")
+        row["warehouse_id"] = row.pop("warehouse")
+        return row
+
+
+class StockAdjustmentBulkSerializer(serializers.Serializer):
+    adjustments = StockAdjustmentRowSerializer(many=True, allow_empty=False)
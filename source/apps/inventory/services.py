@@ -1,63 +1,146 @@
-from .models import InventoryItem, InventoryTransfer, StockAdjustment
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .events import inventory_events
+from .ledger import StockLedger
+from .models import (
+    InventoryItem,
+    InventoryTransfer,
+    Product,
+    StockAdjustment,
+    StockReservation,
+    Warehouse,
+)
+
+logger = logging.getLogger(__name__)
+
+# How long a cart or order may hold stock before the sweeper releases it.
+DEFAULT_HOLD_TTL = timedelta(minutes=15)
 
 
 class InventoryService:
     @staticmethod
     def add_stock(product, warehouse, quantity):
-        item, created = InventoryItem.objects.get_or_create(
-            product=product, location=warehouse
-        )
-        item.quantity += quantity
-        item.status = "in_stock"
-        item.save()
-        return item
+        StockLedger.add(product, warehouse, quantity)
+        return InventoryItem.objects.get(product=product, location=warehouse)
 
     @staticmethod
     def remove_stock(product, warehouse, quantity):
-        item = InventoryItem.objects.get(product=product, location=warehouse)
-        if item.quantity >= quantity:
-            item.quantity -= quantity
-            if item.quantity == 0:
-                item.status = "sold"
-            item.save()
-        else:
+        try:
+            StockLedger.remove(product, warehouse, quantity)
+        except ValidationError:
             raise ValueError("Insufficient stock")
-        return item
+        return InventoryItem.objects.get(product=product, location=warehouse)
 
 
 class StockAdjustmentService:
     @staticmethod
     def create_adjustment(inventory_item, adjustment_type, quantity, reason, user):
-        adjustment = StockAdjustment.objects.create(
+        # StockAdjustment.save() applies the delta through the ledger.
+        return StockAdjustment.objects.create(
             inventory_item=inventory_item,
             adjustment_type=adjustment_type,
             quantity=quantity,
             reason=reason,
             performed_by=user,
         )
-        if adjustment_type == "add":
-            inventory_item.quantity += quantity
-        elif adjustment_type == "remove" and inventory_item.quantity >= quantity:
-            inventory_item.quantity -= quantity
-        inventory_item.save()
-        return adjustment
 
     @staticmethod
     def adjust_stock(inventory_item, adjustment_type, quantity, reason, user):
-        if adjustment_type == "add":
-            inventory_item.quantity += quantity
-        elif adjustment_type == "remove" and inventory_item.quantity >= quantity:
-            inventory_item.quantity -= quantity
-        inventory_item.save()
-
-        StockAdjustment.objects.create(
-            inventory_item=inventory_item,
-            adjustment_type=adjustment_type,
-            quantity=quantity,
-            reason=reason,
-            performed_by=user,
+        return StockAdjustmentService.create_adjustment(
+            inventory_item, adjustment_type, quantity, reason, user
         )
 
+    @staticmethod
+    def bulk_adjust(rows, user=None):
+        """
+        Apply many stock adjustments in a single transaction.
+        Current levels are read in one locking query, the adjustments are written
+        with bulk_create and the quantities with one bulk UPDATE per batch.
+        :param rows: Iterable of dicts with product_id, warehouse_id,
+            adjustment_type, quantity and an optional reason.
+        :param user: User recorded as performer of every adjustment.
+        :return: Tuple of (created adjustments, per-row errors).
+        """
+        rows = list(rows)
+        errors = []
+        candidates = []
+        for index, row in enumerate(rows):
+            if row.get("adjustment_type") not in ("add", "remove"):
+                errors.append({"row": index, "error": "Invalid adjustment type."})
+            elif not row.get("quantity") or row["quantity"] <= 0:
+                errors.append(
+                    {"row": index, "error": "Adjustment quantity must be positive."}
+                )
+            else:
+                candidates.append((index, row))
+
+        product_ids = {row["product_id"] for _, row in candidates}
+        warehouse_ids = {row["warehouse_id"] for _, row in candidates}
+
+        with inventory_events.collect(), transaction.atomic():
+            known_products = set(
+                Product.objects.filter(pk__in=product_ids).values_list("pk", flat=True)
+            )
+            known_warehouses = set(
+                Warehouse.objects.filter(pk__in=warehouse_ids).values_list(
+                    "pk", flat=True
+                )
+            )
+            valid = []
+            for index, row in candidates:
+                if row["product_id"] not in known_products:
+                    errors.append({"row": index, "error": "Unknown product."})
+                elif row["warehouse_id"] not in known_warehouses:
+                    errors.append({"row": index, "error": "Unknown warehouse."})
+                else:
+                    valid.append((index, row))
+
+            items = StockLedger.lock_items(
+                {(row["product_id"], row["warehouse_id"]) for _, row in valid},
+                create={
+                    (row["product_id"], row["warehouse_id"])
+                    for _, row in valid
+                    if row["adjustment_type"] == "add"
+                },
+            )
+            levels = {key: item.quantity for key, item in items.items()}
+            deltas = defaultdict(int)
+            adjustments = []
+            for index, row in valid:
+                key = (row["product_id"], row["warehouse_id"])
+                quantity = row["quantity"]
+                signed = quantity if row["adjustment_type"] == "add" else -quantity
+                if key not in items or levels[key] + signed < 0:
+                    errors.append({"row": index, "error": "Insufficient stock."})
+                    continue
+                levels[key] += signed
+                deltas[items[key]] += signed
+                adjustments.append(
+                    StockAdjustment(
+                        inventory_item=items[key],
+                        adjustment_type=row["adjustment_type"],
+                        quantity=quantity,
+                        reason=row.get("reason"),
+                        performed_by=user,
+                    )
+                )
+
+            StockAdjustment.objects.bulk_create(adjustments, batch_size=1000)
+            StockLedger.apply_many(deltas)
+            for adjustment in adjustments:
+                adjustment.publish_applied()
+
+        errors.sort(key=lambda error: error["row"])
+        return adjustments, errors
+
 
 class TransferService:
     @staticmethod
@@ -74,38 +157,321 @@ class TransferService:
 
     @staticmethod
     def complete_transfer(transfer):
-        transfer.status = "completed"
-        transfer.save()
+        TransferService.transition([transfer], "completed")
+        return transfer
+
+    @staticmethod
+    def fail_transfer(transfer):
+        TransferService.transition([transfer], "failed")
         return transfer
 
     @staticmethod
     def transfer_stock(product, from_warehouse, to_warehouse, quantity, user):
-        if InventoryItem.objects.filter(
-            product=product, location=from_warehouse, quantity__gte=quantity
-        ).exists():
-            inventory_item = InventoryItem.objects.get(
-                product=product, location=from_warehouse
-            )
-            StockAdjustmentService.adjust_stock(
-                inventory_item,
-                "remove",
-                quantity,
-                "Transfer to another warehouse",
-                user,
-            )
+        return TransferService.transfer_batch(
+            from_warehouse, to_warehouse, [(product, quantity)], user
+        )[0]
 
-            to_inventory_item, _ = InventoryItem.objects.get_or_create(
-                product=product, location=to_warehouse
-            )
-            StockAdjustmentService.adjust_stock(
-                to_inventory_item, "add", quantity, "Received from transfer", user
+    @staticmethod
+    def transfer_batch(from_warehouse, to_warehouse, lines, user=None, reason=None):
+        """
+        Move many products between one pair of warehouses in one transaction.
+        :param lines: Iterable of (product, quantity) pairs.
+        :return: The completed InventoryTransfer records.
+        :raise: ValidationError if any line cannot be covered; nothing is moved.
+        """
+        if from_warehouse.pk == to_warehouse.pk:
+            raise ValidationError(
+                "Source and destination warehouses cannot be the same."
             )
-
-            InventoryTransfer.objects.create(
+        transfers = [
+            InventoryTransfer(
                 product=product,
                 from_location=from_warehouse,
                 to_location=to_warehouse,
                 quantity=quantity,
+                reason=reason,
                 initiated_by=user,
-                status="completed",
+                status="pending",
+            )
+            for product, quantity in lines
+        ]
+        with inventory_events.collect(), transaction.atomic():
+            transfers = InventoryTransfer.objects.bulk_create(transfers)
+            TransferService.transition(transfers, "completed")
+        return transfers
+
+    @staticmethod
+    def transition(transfers, status):
+        """
+        Move transfers to a new status and apply the resulting stock movements
+        in one transaction. Transfer rows and then inventory rows are locked in
+        primary-key order, so concurrent calls serialise instead of
+        deadlocking, and a transfer can only be applied once.
+        Completing moves stock from source to destination; failing a
+        completed transfer moves it back.
+        :raise: ValidationError on an illegal transition or insufficient stock.
+        """
+        transfers = list({transfer.pk: transfer for transfer in transfers}.values())
+        with inventory_events.collect(), transaction.atomic():
+            current = dict(
+                InventoryTransfer.objects.select_for_update()
+                .filter(pk__in=[transfer.pk for transfer in transfers])
+                .order_by("pk")
+                .values_list("pk", "status")
+            )
+            deltas = defaultdict(int)
+            for transfer in transfers:
+                previous = current[transfer.pk]
+                if status not in InventoryTransfer.TRANSITIONS[previous]:
+                    raise ValidationError(
+                        f"Transfer {transfer.pk} cannot move from {previous} to {status}."
+                    )
+                if transfer.quantity <= 0:
+                    raise ValidationError("Transfer quantity must be positive.")
+                if transfer.from_location_id == transfer.to_location_id:
+                    raise ValidationError(
+                        "Source and destination warehouses cannot be the same."
+                    )
+                if status == "completed":
+                    moved = transfer.quantity
+                elif previous == "completed":
+                    moved = -transfer.quantity
+                else:
+                    continue
+                deltas[(transfer.product_id, transfer.from_location_id)] -= moved
+                deltas[(transfer.product_id, transfer.to_location_id)] += moved
+
+            items = StockLedger.lock_items(
+                deltas, create=[key for key, delta in deltas.items() if delta > 0]
+            )
+            for key, delta in deltas.items():
+                if key not in items or items[key].quantity + delta < 0:
+                    raise ValidationError(
+                        "Not enough stock available in the source warehouse for transfer."
+                    )
+            StockLedger.apply_many({items[key]: delta for key, delta in deltas.items()})
+            InventoryTransfer.objects.filter(pk__in=current).update(status=status)
+            for transfer in transfers:
+                transfer.status = status
+                if status == "completed":
+                    transfer.publish_completed()
+        return transfers
+
+
+class InventoryNotificationService:
+    @staticmethod
+    def notify_item_events(product_id, warehouse_id, events):
+        """
+        Send one notification summarising everything that happened to an
+        inventory item within a single request or transaction.
+        :param events: Deduplicated InventoryEvent list for the item.
+        """
+        item = (
+            InventoryItem.objects.select_related("product", "location")
+            .filter(product_id=product_id, location_id=warehouse_id)
+            .first()
+        )
+        if item is None:
+            return
+        lines = [f"- {event.kind}: {event.data}" for event in events]
+        send_mail(
+            "Inventory Update",
+            f"Inventory for {item.product.name} in {item.location.name} changed "
+            f"(now {item.quantity}, {item.status}):\n" + "\n".join(lines),
+            "from@example.com",
+            ["admin@example.com"],
+        )
+
+    @staticmethod
+    def notify_new_product(product):
+        logger.info("New product created: %s (%s)", product.name, product.sku)
+
+    @staticmethod
+    def notify_product_update(product):
+        logger.info("Product updated: %s (%s)", product.name, product.sku)
+
+
+class LowStockService:
+    @staticmethod
+    def send_digest():
+        """
+        Send one email listing every item that dropped below its threshold
+        since it was last alerted, then mark those items as alerted.
+        Meant to run periodically (see the send_low_stock_digest command).
+        :return: Number of items included in the digest.
+        """
+        now = timezone.now()
+        items = list(
+            InventoryItem.objects.pending_low_stock_alerts()
+            .filter(low_stock_since__lte=now)
+            .select_related("product", "location")
+            .order_by("location__name", "product__name")
+        )
+        if not items:
+            return 0
+        lines = [
+            f"- {item.product.name} in {item.location.name}: "
+            f"{item.quantity} left (threshold {item.threshold})"
+            for item in items
+        ]
+        send_mail(
+            "Low Stock Digest",
+            f"{len(items)} inventory items are low in stock:\n" + "\n".join(lines),
+            "from@example.com",
+            ["admin@example.com"],
+        )
+        InventoryItem.objects.filter(pk__in=[item.pk for item in items]).update(
+            low_stock_alerted_at=now
+        )
+        return len(items)
+
+
+class ReservationService:
+    @staticmethod
+    def available_to_promise(product_ids):
+        """
+        On-hand stock minus active holds, summed over warehouses.
+        :return: Mapping of product id to available quantity.
+        """
+        available = dict.fromkeys(product_ids, 0)
+        for product_id, quantity in (
+            InventoryItem.objects.filter(product_id__in=product_ids)
+            .with_available()
+            .values_list("product_id", "available_quantity")
+        ):
+            available[product_id] += max(quantity, 0)
+        return available
+
+    @staticmethod
+    def reserve(lines, cart=None, order=None, ttl=DEFAULT_HOLD_TTL):
+        """
+        Place holds for the given quantities, replacing the holder's existing
+        holds on those products. Stock is taken from the warehouses with the
+        most available stock first.
+        :param lines: Mapping of product id to quantity to hold.
+        :return: The created StockReservation records.
+        :raise: ValidationError if a product lacks available stock.
+        :raise: ValueError unless exactly one of cart and order is given.
+        """
+        ReservationService._holder(cart, order)
+        expires_at = timezone.now() + ttl
+        with transaction.atomic():
+            allocations = ReservationService._allocate(lines, cart, order)
+            return StockReservation.objects.bulk_create(
+                [
+                    StockReservation(
+                        inventory_item=item,
+                        quantity=quantity,
+                        cart=cart,
+                        order=order,
+                        expires_at=expires_at,
+                    )
+                    for item, quantity in allocations
+                ]
             )
+
+    @staticmethod
+    def release(cart=None, order=None, product_ids=None):
+        """Drop the holder's holds, optionally only for some products."""
+        holds = StockReservation.objects.filter(
+            **ReservationService._holder(cart, order)
+        )
+        if product_ids is not None:
+            holds = holds.filter(inventory_item__product_id__in=product_ids)
+        holds.delete()
+
+    @staticmethod
+    def commit(lines, cart=None, order=None):
+        """
+        Turn the holder's holds into stock deductions for the given lines and
+        drop any remaining holds, in one transaction.
+        :param lines: Mapping of product id to quantity to deduct.
+        :raise: ValidationError if a product lacks available stock.
+        """
+        holder = ReservationService._holder(cart, order)
+        with inventory_events.collect(), transaction.atomic():
+            allocations = ReservationService._allocate(lines, cart, order)
+            StockReservation.objects.filter(**holder).delete()
+            deltas = defaultdict(int)
+            for item, quantity in allocations:
+                deltas[item] -= quantity
+            StockLedger.apply_many(deltas)
+        return allocations
+
+    @staticmethod
+    def convert(cart=None, order=None):
+        """Deduct exactly what the holder currently holds (see commit)."""
+        lines = dict(
+            StockReservation.objects.filter(**ReservationService._holder(cart, order))
+            .values("inventory_item__product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("inventory_item__product_id", "total")
+        )
+        return ReservationService.commit(lines, cart=cart, order=order)
+
+    @staticmethod
+    def sweep_expired(batch_size=1000):
+        """
+        Delete expired holds in primary-key batches.
+        :return: Number of holds released.
+        """
+        released = 0
+        while True:
+            batch = list(
+                StockReservation.objects.expired()
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not batch:
+                return released
+            released += StockReservation.objects.filter(pk__in=batch).delete()[0]
+
+    @staticmethod
+    def _holder(cart, order):
+        if (cart is None) == (order is None):
+            raise ValueError("Exactly one of cart and order is required.")
+        return {"cart": cart} if cart is not None else {"order": order}
+
+    @staticmethod
+    def _allocate(lines, cart, order):
+        """
+        Lock the products' inventory rows, drop the holder's own holds on
+        them and split each line across warehouses by available stock.
+        Must run inside a transaction.
+        :return: List of (locked InventoryItem, quantity).
+        """
+        lines = {product_id: quantity for product_id, quantity in lines.items()}
+        items = list(
+            InventoryItem.objects.select_for_update()
+            .filter(product_id__in=lines)
+            .order_by("pk")
+        )
+        StockReservation.objects.filter(
+            inventory_item__in=items, **ReservationService._holder(cart, order)
+        ).delete()
+        held = dict(
+            StockReservation.objects.active()
+            .filter(inventory_item__in=items)
+            .values("inventory_item")
+            .annotate(total=Sum("quantity"))
+            .values_list("inventory_item", "total")
+        )
+        by_product = defaultdict(list)
+        for item in items:
+            by_product[item.product_id].append(
+                (item.quantity - held.get(item.pk, 0), item)
+            )
+
+        allocations = []
+        for product_id, quantity in lines.items():
+            remaining = quantity
+            candidates = sorted(by_product[product_id], key=lambda pair: -pair[0])
+            for available, item in candidates:
+                if remaining <= 0 or available <= 0:
+                    break
+                taken = min(available, remaining)
+                allocations.append((item, taken))
+                remaining -= taken
+            if remaining > 0:
+                raise ValidationError(f"Insufficient stock for product {product_id}.")
+        return allocations
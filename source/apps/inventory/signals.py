@@ -1,77 +1,62 @@
-from django.core.exceptions import ValidationError
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from ..orders.services import NotificationService
-from ..products.services import StockService
-from .models import (
-    InventoryItem,
-    InventoryTransfer,
-    Product,
-    StockAdjustment,
-    Warehouse,
-)
-from .services import StockAdjustmentService
+from .events import STATUS_CHANGED, inventory_events
+from .models import InventoryItem, Product
+from .services import InventoryNotificationService
+from .summary import StockSummary
 
-
-@receiver(post_save, sender=StockAdjustment)
-def handle_stock_adjustment(sender, instance, created, **kwargs):
-    if created:
-        StockAdjustmentService.adjust_stock(
-            instance.inventory_item,
-            instance.adjustment_type,
-            instance.quantity,
-            instance.reason,
-            instance.performed_by,
-        )
-        NotificationService.notify_stock_change(instance)
+# Stock movements are applied by StockLedger inside the save() of
+# StockAdjustment / InventoryTransfer and announced through inventory_events;
+# receivers here must not re-apply them.
 
 
-@receiver(post_save, sender=InventoryTransfer)
-def handle_inventory_transfer(sender, instance, created, **kwargs):
-    if created and instance.status == "completed":
-        StockAdjustmentService.adjust_stock(
-            instance.product.inventory_records.get(location=instance.from_location),
-            "remove",
-            instance.quantity,
-            "Transfer completed",
-            instance.initiated_by,
-        )
-        StockAdjustmentService.adjust_stock(
-            instance.product.inventory_records.get(location=instance.to_location),
-            "add",
-            instance.quantity,
-            "Transfer completed",
-            instance.initiated_by,
-        )
-        NotificationService.notify_transfer_completion(instance)
+@inventory_events.subscribe
+def notify_inventory_item_events(product_id, warehouse_id, events):
+    InventoryNotificationService.notify_item_events(product_id, warehouse_id, events)
 
 
 @receiver(post_save, sender=Product)
 def notify_product_change(sender, instance, created, **kwargs):
     if created:
-        NotificationService.notify_new_product(instance)
+        transaction.on_commit(
+            lambda: InventoryNotificationService.notify_new_product(instance)
+        )
     else:
-        NotificationService.notify_product_update(instance)
-
-
-@receiver(post_save, sender=Warehouse)
-def handle_warehouse_stock_level(sender, instance, **kwargs):
-    total_stock = StockService.calculate_total_stock(instance)
-    if total_stock < instance.low_stock_threshold:
-        NotificationService.notify_low_stock(instance)
+        transaction.on_commit(
+            lambda: InventoryNotificationService.notify_product_update(instance)
+        )
 
 
 @receiver(post_save, sender=InventoryItem)
-def notify_inventory_status_change(sender, instance, **kwargs):
-    if instance.status in ["reserved", "sold"]:
-        NotificationService.notify_status_change(instance)
+def publish_inventory_status_change(sender, instance, created, **kwargs):
+    previous = getattr(instance, "_loaded_status", None)
+    if created or previous != instance.status:
+        inventory_events.publish(
+            STATUS_CHANGED,
+            instance.product_id,
+            instance.location_id,
+            status=instance.status,
+            quantity=instance.quantity,
+        )
+    instance._loaded_status = instance.status
 
 
-@receiver(pre_save, sender=StockAdjustment)
-def validate_stock_adjustment(sender, instance, **kwargs):
-    if (
-        instance.adjustment_type == "remove"
-        and instance.inventory_item.quantity < instance.quantity
-    ):
-        raise ValidationError("Cannot remove more items than available in stock.")
+@receiver(post_save, sender=InventoryItem)
+def update_stock_summary_on_save(sender, instance, created, **kwargs):
+    # Direct saves (admin, fixtures) bypass StockLedger; fold their delta in.
+    previous = 0 if created else getattr(instance, "_loaded_quantity", None)
+    if previous is None:
+        return
+    StockSummary.apply(
+        {(instance.product_id, instance.location_id): instance.quantity - previous}
+    )
+    instance._loaded_quantity = instance.quantity
+
+
+@receiver(post_delete, sender=InventoryItem)
+def update_stock_summary_on_delete(sender, instance, **kwargs):
+    StockSummary.apply(
+        {(instance.product_id, instance.location_id): -instance.quantity}
+    )
@@ -0,0 +1,136 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+
+from .models import InventoryItem, ProductStockSummary, WarehouseStockSummary
+
+# Summary rows per UPDATE statement; keeps CASE parameters under backend limits.
+BULK_BATCH_SIZE = 400
+
+
+def delta_case(deltas):
+    """
+    CASE expression mapping primary keys to their delta. Keys sharing a delta
+    share one WHEN, so uniform batches (e.g. checkouts of quantity 1) compile
+    to a single condition.
+    """
+    by_value = defaultdict(list)
+    for key, value in deltas.items():
+        by_value[value].append(key)
+    return Case(
+        *[When(pk__in=keys, then=Value(value)) for value, keys in by_value.items()],
+        default=Value(0),
+    )
+
+
+class StockSummary:
+    """
+    Maintains the per-product and per-warehouse stock totals.
+    The product x warehouse grain is InventoryItem itself (one row per pair);
+    the roll-ups are adjusted by the same deltas StockLedger applies, so
+    reading a total is a primary-key lookup instead of a SUM over inventory.
+    """
+
+    @staticmethod
+    def apply(deltas):
+        """
+        Fold quantity deltas into the roll-ups.
+        :param deltas: Mapping of (product_id, warehouse_id) to signed delta.
+        """
+        by_product = defaultdict(int)
+        by_warehouse = defaultdict(int)
+        for (product_id, warehouse_id), delta in deltas.items():
+            by_product[product_id] += delta
+            by_warehouse[warehouse_id] += delta
+        StockSummary._apply(ProductStockSummary, "product_id", by_product)
+        StockSummary._apply(WarehouseStockSummary, "warehouse_id", by_warehouse)
+
+    @staticmethod
+    def _apply(model, field, deltas):
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        now = timezone.now()
+        if len(deltas) == 1:
+            # Common single-item path: one UPDATE when the row already exists.
+            ((key, delta),) = deltas.items()
+            if model.objects.filter(pk=key).update(
+                quantity=F("quantity") + delta, last_updated=now
+            ):
+                return
+        model.objects.bulk_create(
+            [model(**{field: key}) for key in deltas], ignore_conflicts=True
+        )
+        pending = list(deltas.items())
+        while pending:
+            batch, pending = dict(pending[:BULK_BATCH_SIZE]), pending[BULK_BATCH_SIZE:]
+            model.objects.filter(pk__in=batch).update(
+                quantity=F("quantity") + delta_case(batch),
+                last_updated=now,
+            )
+
+    @staticmethod
+    def computed_totals():
+        """
+        Recompute the roll-ups from inventory.
+        :return: (product totals, warehouse totals) as id -> quantity dicts.
+        """
+        products = dict(
+            InventoryItem.objects.values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("product_id", "total")
+        )
+        warehouses = dict(
+            InventoryItem.objects.values("location_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("location_id", "total")
+        )
+        return products, warehouses
+
+    @staticmethod
+    def drift():
+        """
+        Compare stored roll-ups with freshly computed ones.
+        :return: List of (scope, id, stored, actual) for every mismatch.
+        """
+        products, warehouses = StockSummary.computed_totals()
+        mismatches = []
+        for scope, model, actual in (
+            ("product", ProductStockSummary, products),
+            ("warehouse", WarehouseStockSummary, warehouses),
+        ):
+            stored = dict(model.objects.values_list("pk", "quantity"))
+            for key in sorted(stored.keys() | actual.keys()):
+                if stored.get(key, 0) != actual.get(key, 0):
+                    mismatches.append(
+                        (scope, key, stored.get(key, 0), actual.get(key, 0))
+                    )
+        return mismatches
+
+    @staticmethod
+    def rebuild():
+        """
+        Replace all roll-ups with values recomputed from inventory.
+        :return: (product rows, warehouse rows) written.
+        """
+        products, warehouses = StockSummary.computed_totals()
+        with transaction.atomic():
+            ProductStockSummary.objects.all().delete()
+            WarehouseStockSummary.objects.all().delete()
+            ProductStockSummary.objects.bulk_create(
+                [
+                    ProductStockSummary(product_id=key, quantity=total)
+                    for key, total in products.items()
+                ],
+                batch_size=1000,
+            )
+            WarehouseStockSummary.objects.bulk_create(
+                [
+                    WarehouseStockSummary(warehouse_id=key, quantity=total)
+                    for key, total in warehouses.items()
+                ],
+                batch_size=1000,
+            )
+        return len(products), len(warehouses)
@@ -1,4 +1,7 @@
-from .models import InventoryItem, InventoryTransfer, Product
+from django.core.exceptions import ValidationError
+
+from .ledger import StockLedger
+from .models import InventoryTransfer, Product
 
 
 def calculate_stock_value(inventory_items):
@@ -10,68 +13,49 @@ def check_inventory_level(item):
 
 
 def add_stock(product, warehouse, quantity):
-    inventory_item, created = InventoryItem.objects.get_or_create(
-        product=product, location=warehouse, defaults={"quantity": 0}
-    )
-    inventory_item.quantity += quantity
-    inventory_item.save()
+    return StockLedger.add(product, warehouse, quantity)
 
 
 def remove_stock(product, warehouse, quantity):
-    inventory_item = InventoryItem.objects.get(product=product, location=warehouse)
-    if inventory_item.quantity >= quantity:
-        inventory_item.quantity -= quantity
-        inventory_item.save()
+    return StockLedger.remove(product, warehouse, quantity)
 
 
 def transfer_stock(product, from_warehouse, to_warehouse, quantity):
-    if InventoryItem.objects.filter(
-        product=product, location=from_warehouse, quantity__gte=quantity
-    ).exists():
-        # Remove stock from the source
-        remove_stock(product, from_warehouse, quantity)
-        # Add stock to the destination
-        add_stock(product, to_warehouse, quantity)
-        # Create a transfer record
-        InventoryTransfer.objects.create(
-            product=product,
-            from_location=from_warehouse,
-            to_location=to_warehouse,
-            quantity=quantity,
-            status="completed",
-        )
+    # InventoryTransfer.save() moves the stock for completed transfers.
+    InventoryTransfer.objects.create(
+        product=product,
+        from_location=from_warehouse,
+        to_location=to_warehouse,
+        quantity=quantity,
+        status="completed",
+    )
 
 
 def bulk_import_products(product_data):
-    # Assume product_data is a list of dictionaries
-    products = []
-    for data in product_data:
-        product = Product(
-            name=data["name"],
-            description=data.get("description", ""),
-            sku=data["sku"],
-            category_id=data["category_id"],
-            price=data["price"],
+    """
+    Create or update products from a list of dicts (name, sku, category or
+    category_id, base_price or price, ...) with the bulk catalog importer.
+    :return: The imported products.
+    """
+    from source.apps.products.importer import CatalogImporter
+
+    rows = list(enumerate(product_data, start=1))
+    importer = CatalogImporter()
+    for _ in importer.run(rows):
+        pass
+    if importer.result.error_count:
+        raise ValidationError(
+            [f"row {line_no}: {message}" for line_no, message in importer.result.errors]
+        )
+    return list(
+        Product.objects.filter(
+            sku__in=[row["sku"] for _, row in rows if row.get("sku")]
+            + list(importer.name_skus.values())
         )
-        product.save()
-        products.append(product)
-    return products
+    )
 
 
 def export_products_to_csv(queryset):
-    import csv
-
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="products.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(["Name", "SKU", "Category", "Price"])
-
-    for product in queryset:
-        writer.writerow(
-            [product.name, product.sku, product.category.name, product.price]
-        )
+    from source.apps.products.services import CSVExportService
 
-    return response
+    return CSVExportService.export_products_to_csv(queryset)
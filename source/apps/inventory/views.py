@@ -1,13 +1,18 @@
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from source.layer.helpers.views import EagerLoadingMixin
 
 from .models import InventoryItem, InventoryTransfer, StockAdjustment, Warehouse
 from .serializers import (
     InventoryItemSerializer,
     InventoryTransferSerializer,
+    StockAdjustmentBulkSerializer,
     StockAdjustmentSerializer,
     WarehouseSerializer,
 )
-from .services import InventoryTransferService, StockAdjustmentService
+from .services import StockAdjustmentService
 
 
 class WarehouseViewSet(viewsets.ModelViewSet):
@@ -15,26 +20,36 @@ class WarehouseViewSet(viewsets.ModelViewSet):
     serializer_class = WarehouseSerializer
 
 
-class InventoryItemViewSet(viewsets.ModelViewSet):
+class InventoryItemViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = InventoryItem.objects.all()
     serializer_class = InventoryItemSerializer
+    select_related = ("product", "location")
+    # Sync jobs page through changes oldest first (inventory_item_sync_idx).
+    cursor_ordering = ("last_updated", "id")
 
 
-class StockAdjustmentViewSet(viewsets.ModelViewSet):
+class StockAdjustmentViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = StockAdjustment.objects.all()
     serializer_class = StockAdjustmentSerializer
-
-    def perform_create(self, serializer):
-        # Integrating StockAdjustmentService for managing adjustments
-        adjustment = serializer.save()
-        StockAdjustmentService.adjust_stock(adjustment)
-
-
-class InventoryTransferViewSet(viewsets.ModelViewSet):
+    select_related = ("inventory_item__product", "inventory_item__location")
+    cursor_ordering = ("-created_at", "-id")
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request):
+        serializer = StockAdjustmentBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = request.user if request.user.is_authenticated else None
+        adjustments, errors = StockAdjustmentService.bulk_adjust(
+            serializer.validated_data["adjustments"], user
+        )
+        return Response(
+            {"applied": len(adjustments), "failed": len(errors), "errors": errors},
+            status=status.HTTP_200_OK if adjustments else status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class InventoryTransferViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = InventoryTransfer.objects.all()
     serializer_class = InventoryTransferSerializer
-
-    def perform_create(self, serializer):
-        # Use InventoryTransferService for managing inventory transfers
-        transfer = serializer.save()
-        InventoryTransferService.initiate_transfer(transfer)
+    select_related = ("product", "from_location", "to_location")
+    cursor_ordering = ("-created_at", "-id")
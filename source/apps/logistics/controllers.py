@@ -1,20 +1,23 @@
+from django.db import transaction
+
+from source.apps.inventory.ledger import StockLedger
+
 from .services import ReturnService, ShipmentService
-from .utils import adjust_stock_level
 
 
 class ShipmentController:
     def create_shipment(self, product, quantity, origin, destination):
-        shipment = ShipmentService().create_shipment(
-            product, quantity, origin, destination
-        )
-        adjust_stock_level(product.inventory_records.first(), quantity, "remove")
+        with transaction.atomic():
+            StockLedger.remove(product, origin, quantity)
+            shipment = ShipmentService().create_shipment(
+                product, quantity, origin, destination
+            )
         return shipment
 
 
 class ReturnController:
     def handle_return(self, shipment, reason):
-        return_shipment = ReturnService().initiate_return(shipment, reason)
-        adjust_stock_level(
-            shipment.product.inventory_records.first(), shipment.quantity, "add"
-        )
+        with transaction.atomic():
+            return_shipment = ReturnService().initiate_return(shipment, reason)
+            StockLedger.add(shipment.product, shipment.origin, shipment.quantity)
         return return_shipment
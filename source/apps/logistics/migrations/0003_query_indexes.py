@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0008_query_indexes"),
+        ("logistics", "0002_alter_shipment_product"),
+        ("products", "0007_skusequence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="shipment",
+            index=models.Index(fields=["status"], name="shipment_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="shipment",
+            index=models.Index(
+                fields=["shipping_company"], name="shipment_company_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="shipment",
+            index=models.Index(fields=["created_at"], name="shipment_created_idx"),
+        ),
+    ]
@@ -35,6 +35,11 @@ class Shipment(models.Model):
         ordering = ["-shipped_date"]
         verbose_name = "Shipment"
         verbose_name_plural = "Shipments"
+        indexes = [
+            models.Index(fields=["status"], name="shipment_status_idx"),
+            models.Index(fields=["shipping_company"], name="shipment_company_idx"),
+            models.Index(fields=["created_at"], name="shipment_created_idx"),
+        ]
 
     def __str__(self):
         return f"Shipment {self.tracking_number} - Status: {self.status}"
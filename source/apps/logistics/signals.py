@@ -1,18 +1,15 @@
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from source.apps.inventory.models import InventoryItem
+from source.apps.inventory.ledger import StockLedger
 
 from .models import LogisticsInteraction, ReturnShipment, Shipment
-from .utils import adjust_stock_level
 
 
 @receiver(post_save, sender=Shipment)
 def handle_shipment_delivered(sender, instance, **kwargs):
     if instance.status == "delivered":
-        adjust_stock_level(
-            instance.product.inventory_records.first(), instance.quantity, "remove"
-        )
+        StockLedger.remove(instance.product, instance.origin, instance.quantity)
 
 
 @receiver(post_save, sender=ReturnShipment)
@@ -38,8 +35,4 @@ def handle_shipment_status_change(sender, instance, created, **kwargs):
 def adjust_stock_on_shipment(sender, instance, created, **kwargs):
     if created and instance.status == "pending":
         # Deduct stock from warehouse upon shipment creation
-        inventory_item = InventoryItem.objects.get(
-            product=instance.product, location=instance.origin
-        )
-        inventory_item.quantity -= instance.quantity
-        inventory_item.save()
+        StockLedger.remove(instance.product, instance.origin, instance.quantity)
@@ -5,6 +5,25 @@ from datetime import timedelta
 import requests
 from django.core.cache import cache
 
+from source.apps.inventory.ledger import StockLedger
+from source.layer.helpers.exports import CSVExport
+
+SHIPMENT_EXPORT = CSVExport(
+    "shipments.csv",
+    [
+        ("Tracking Number", "tracking_number"),
+        ("Product", "product__name"),
+        ("SKU", "product__sku"),
+        ("Quantity", "quantity"),
+        ("Origin", "origin__name"),
+        ("Destination", "destination"),
+        ("Shipping Company", "shipping_company"),
+        ("Status", "status"),
+        ("Shipped", "shipped_date"),
+        ("Estimated Arrival", "estimated_arrival"),
+    ],
+)
+
 
 def generate_tracking_number():
     return "".join(random.choices(string.ascii_uppercase + string.digits, k=10))
@@ -30,11 +49,7 @@ def get_shipment_status(tracking_number):
 
 
 def adjust_stock_level(inventory_item, quantity, adjustment_type):
-    if adjustment_type == "add":
-        inventory_item.quantity += quantity
-    elif adjustment_type == "remove":
-        inventory_item.quantity -= quantity
-    inventory_item.save()
+    return StockLedger.adjust(inventory_item, adjustment_type, quantity)
 
 
 def get_cached_shipment_status(tracking_number):
@@ -45,3 +60,8 @@ def get_cached_shipment_status(tracking_number):
             f"shipment_status_{tracking_number}", status, timeout=3600
         )  # Cache for 1 hour
     return status
+
+
+def export_shipments_to_csv(queryset):
+    """Stream shipments as a CSV download."""
+    return SHIPMENT_EXPORT.response(queryset)
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from django.template.response import TemplateResponse
 from django.urls import path, reverse
+from django.utils.dateparse import parse_date
 from django.utils.html import format_html
 
 from .filters import CompletedFilter, SentToOtherShopFilter, UnpaidFilter
-from .models import Order, OrderItem, Payment, RepairOrder
-from .services import RepairCalculationService
+from .models import Order, OrderItem, Payment, RepairDailyRollup, RepairOrder
+from .services import RepairCalculationService, RepairRollupService
 
 
 @admin.register(RepairOrder)
@@ -88,7 +89,13 @@ class RepairOrderAdmin(admin.ModelAdmin):
         return custom_urls + urls
 
     def daily_report_view(self, request):
-        daily_totals = RepairCalculationService.calculate_daily_totals()
+        # ?start=YYYY-MM-DD&end=YYYY-MM-DD reports a range from the daily rollups.
+        start = parse_date(request.GET.get("start") or "")
+        end = parse_date(request.GET.get("end") or "") or start
+        if start:
+            daily_totals = RepairRollupService.report(start, end)
+        else:
+            daily_totals = RepairCalculationService.calculate_daily_totals()
 
         context = dict(
             self.admin_site.each_context(request),
@@ -126,6 +133,29 @@ class RepairOrderAdmin(admin.ModelAdmin):
     mark_as_paid.short_description = "Mark selected orders as Paid"
 
 
+@admin.register(RepairDailyRollup)
+class RepairDailyRollupAdmin(admin.ModelAdmin):
+    list_display = [
+        "day",
+        "shop",
+        "orders_count",
+        "total_price",
+        "total_expenses",
+        "total_profit",
+        "unpaid_count",
+        "unpaid_total",
+    ]
+    list_filter = ["shop"]
+    date_hierarchy = "day"
+    ordering = ["-day", "shop"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
@@ -153,7 +183,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_filter = ["status", "order_date", "payment_status"]
     search_fields = ["customer__name", "id", "shipping_address"]
     inlines = [OrderItemInline, PaymentInline]
-    readonly_fields = ["total_amount"]
+    readonly_fields = ["total_amount", "discount_amount"]
     ordering = ["-order_date"]
 
     actions = ["mark_as_processed", "mark_as_shipped", "cancel_orders"]
@@ -0,0 +1,90 @@
+import threading
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import RepairCodeSequence, RepairOrder
+
+# Codes reserved per round trip to the sequence table.
+CODE_BLOCK_SIZE = 50
+
+
+def format_code(shop_id, value):
+    """
+    Repair order code: shop id and zero-padded per-shop number, e.g. 3-000042.
+    :raise ValueError: If the code does not fit RepairOrder.code.
+    """
+    code = f"{shop_id}-{value:06d}"
+    max_length = RepairOrder._meta.get_field("code").max_length
+    if len(code) > max_length:
+        raise ValueError(
+            f"Repair code {code} for shop {shop_id} exceeds {max_length} characters."
+        )
+    return code
+
+
+class RepairCodeAllocator:
+    """
+    Hands out unique RepairOrder codes before the first insert.
+    Each shop has a counter row in RepairCodeSequence; a process reserves a
+    block of numbers with one UPDATE and serves codes from memory until the
+    block is used up. The UPDATE row lock serialises reservations, so two
+    processes never receive overlapping blocks and no insert has to retry.
+    Numbers left in a block when a process exits are skipped, never reused.
+    """
+
+    def __init__(self, block_size=CODE_BLOCK_SIZE):
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, shop_id, count=1):
+        """
+        Allocate codes for new repair orders of a shop.
+        :return: List of `count` codes.
+        :raise ValueError: If a code would not fit RepairOrder.code.
+        """
+        with self._lock:
+            start, end = self._blocks.pop(shop_id, (0, 0))
+            if end - start >= count:
+                if end - start > count:
+                    self._blocks[shop_id] = (start + count, end)
+                return [
+                    format_code(shop_id, value) for value in range(start, start + count)
+                ]
+            # Discard a short leftover rather than mixing it with a new block.
+        start, end = self._reserve(shop_id, max(count, self.block_size))
+        if end - start > count:
+            rest = (start + count, end)
+            # A block reserved inside a transaction that later rolls back is
+            # handed out again by the database, so only cache it once committed.
+            transaction.on_commit(lambda: self._keep(shop_id, rest))
+        return [format_code(shop_id, value) for value in range(start, start + count)]
+
+    def _keep(self, shop_id, block):
+        with self._lock:
+            self._blocks.setdefault(shop_id, block)
+
+    def reset(self):
+        """Forget cached blocks (their numbers are skipped)."""
+        with self._lock:
+            self._blocks.clear()
+
+    @staticmethod
+    def _reserve(shop_id, size):
+        """
+        Advance the shop's counter by `size`.
+        :return: (first, end) of the reserved half-open range.
+        """
+        sequence = RepairCodeSequence.objects.filter(pk=shop_id)
+        with transaction.atomic():
+            if not sequence.update(next_value=F("next_value") + size):
+                RepairCodeSequence.objects.bulk_create(
+                    [RepairCodeSequence(shop_id=shop_id)], ignore_conflicts=True
+                )
+                sequence.update(next_value=F("next_value") + size)
+            end = sequence.values_list("next_value", flat=True).get()
+        return end - size, end
+
+
+repair_codes = RepairCodeAllocator()
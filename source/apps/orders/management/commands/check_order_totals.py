@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from source.apps.orders.models import Order, OrderItem
+
+CENT = Decimal("0.01")
+
+
+def items_total():
+    return Coalesce(
+        Sum("items__total_price"),
+        Value(Decimal("0.00")),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare every order's total_amount with the sum of its items less "
+        "its recorded discount."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Overwrite mismatched totals with the sum of their items less "
+            "their discount.",
+        )
+
+    def handle(self, *args, **options):
+        # Compared to the cent: some backends (SQLite) sum decimals as floats.
+        mismatches = list(
+            Order.objects.annotate(expected_total=items_total() - F("discount_amount"))
+            .annotate(difference=F("total_amount") - F("expected_total"))
+            .filter(Q(difference__gte=CENT / 2) | Q(difference__lte=-CENT / 2))
+            .order_by("pk")
+            .values_list("pk", "total_amount", "expected_total", "discount_amount")
+        )
+        for pk, stored, expected, discount in mismatches:
+            self.stdout.write(
+                f"Order {pk}: total_amount={stored} "
+                f"expected={Decimal(expected).quantize(CENT)} "
+                f"(discount {discount})"
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("All order totals are consistent."))
+            return
+        if not options["fix"]:
+            raise CommandError(f"{len(mismatches)} orders have inconsistent totals.")
+
+        item_sums = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(total=Sum("total_price"))
+            .values("total")
+        )
+        # The discount stays applied: only the items' part is recomputed.
+        fixed = Order.objects.filter(pk__in=[pk for pk, *_ in mismatches]).update(
+            total_amount=Coalesce(
+                Subquery(item_sums),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+            - F("discount_amount")
+        )
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} order totals."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from source.apps.orders.services import RepairRollupService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-shop daily repair rollups from all repair orders."
+
+    def handle(self, *args, **options):
+        rows = RepairRollupService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} repair daily rollups."))
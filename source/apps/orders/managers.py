@@ -27,6 +27,9 @@ class RepairOrderManager(models.Manager):
     def daily_report(self):
         return self.get_queryset().created_today().total_calculations()
 
+    def daily_totals(self, day, shop=None):
+        return self.get_queryset().daily_totals(day, shop)
+
     def unpaid_orders(self):
         return self.filter(payment_received=False)
 
@@ -0,0 +1,106 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:07
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def populate_repair_rollups(apps, schema_editor):
+    RepairOrder = apps.get_model("orders", "RepairOrder")
+    RepairDailyRollup = apps.get_model("orders", "RepairDailyRollup")
+    unpaid = Q(payment_received=False)
+    zero = Value(Decimal("0.00"))
+    rows = (
+        RepairOrder.objects.annotate(day=TruncDate("created_at"))
+        .values("shop_id", "day")
+        .annotate(
+            orders=Count("pk"),
+            price=Coalesce(Sum("total_price"), zero),
+            costs=Coalesce(Sum("expenses"), zero),
+            unpaid=Count("pk", filter=unpaid),
+            unpaid_price=Coalesce(Sum("total_price", filter=unpaid), zero),
+        )
+        .order_by()
+    )
+    RepairDailyRollup.objects.bulk_create(
+        [
+            RepairDailyRollup(
+                shop_id=row["shop_id"],
+                day=row["day"],
+                orders_count=row["orders"],
+                total_price=row["price"],
+                total_expenses=row["costs"],
+                total_profit=row["price"] - row["costs"],
+                unpaid_count=row["unpaid"],
+                unpaid_total=row["unpaid_price"],
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_stockreservation"),
+        ("orders", "0006_alter_order_total_amount_alter_orderitem_quantity_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepairDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("orders_count", models.PositiveIntegerField(default=0)),
+                (
+                    "total_price",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "total_expenses",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "total_profit",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("unpaid_count", models.PositiveIntegerField(default=0)),
+                (
+                    "unpaid_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "shop",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="repair_rollups",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Repair Daily Rollup",
+                "verbose_name_plural": "Repair Daily Rollups",
+                "ordering": ["-day", "shop"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("shop", "day"), name="unique_repair_rollup_shop_day"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_repair_rollups, migrations.RunPython.noop),
+    ]
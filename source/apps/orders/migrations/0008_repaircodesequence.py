@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_stockreservation"),
+        ("orders", "0007_repairdailyrollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepairCodeSequence",
+            fields=[
+                (
+                    "shop",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="repair_code_sequence",
+                        serialize=False,
+                        to="inventory.warehouse",
+                    ),
+                ),
+                ("next_value", models.PositiveBigIntegerField(default=1)),
+            ],
+            options={
+                "verbose_name": "Repair Code Sequence",
+                "verbose_name_plural": "Repair Code Sequences",
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("orders", "0008_repaircodesequence"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "order_date"], name="order_customer_date_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("inventory", "0008_query_indexes"),
+        ("orders", "0009_order_customer_date_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["order_date"], name="order_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["status"], name="order_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["payment_status"], name="order_payment_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repairorder",
+            index=models.Index(fields=["created_at"], name="repair_order_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="repairorder",
+            index=models.Index(
+                fields=["shop", "created_at"], name="repair_order_shop_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repairorder",
+            index=models.Index(fields=["status"], name="repair_order_status_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="repairorder",
+            index=models.Index(
+                condition=models.Q(("payment_received", False)),
+                fields=["payment_pending_reason", "created_at"],
+                name="repair_order_unpaid_idx",
+            ),
+        ),
+    ]
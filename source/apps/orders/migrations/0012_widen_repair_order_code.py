@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0011_order_discount_amount"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="repairorder",
+            name="code",
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True),
+        ),
+    ]
@@ -1,7 +1,9 @@
+from contextlib import contextmanager
 from decimal import Decimal
 
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from django.utils import timezone
 
 from source.apps.customers.models import Customer
@@ -9,6 +11,8 @@ from source.apps.inventory.models import Warehouse
 from source.apps.products.models import Product
 
 from .managers import OrderManager, RepairOrderManager
+from .querysets import SALE_FIELDS
+from .utils import invalidate_daily_totals
 
 
 class RepairOrder(models.Model):
@@ -28,7 +32,8 @@ class RepairOrder(models.Model):
         ("sent_to_other_shop", "Sent to Other Shop"),
     ]
 
-    code = models.CharField(max_length=12, unique=True, blank=True, null=True)
+    # "<shop id>-<number>": room for 64-bit shop ids and 12-digit counters.
+    code = models.CharField(max_length=32, unique=True, blank=True, null=True)
     shop = models.ForeignKey(
         Warehouse, on_delete=models.CASCADE, related_name="repair_orders"
     )
@@ -58,6 +63,21 @@ class RepairOrder(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at"], name="repair_order_created_idx"),
+            models.Index(
+                fields=["shop", "created_at"], name="repair_order_shop_created_idx"
+            ),
+            models.Index(fields=["status"], name="repair_order_status_idx"),
+            # Unpaid orders are the small working set; SQLite renders the
+            # boolean filter as a bare column, so it can only match a
+            # partial index condition, not a leading index column.
+            models.Index(
+                fields=["payment_pending_reason", "created_at"],
+                condition=models.Q(payment_received=False),
+                name="repair_order_unpaid_idx",
+            ),
+        ]
 
     def calculate_profit(self):
         """Calculate profit as total price minus expenses."""
@@ -90,15 +110,116 @@ class RepairOrder(models.Model):
         self.payment_pending_reason = None
         self.save()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored figures so saves can update the daily rollup by delta.
+        instance._loaded_rollup = instance.rollup_values()
+        return instance
+
+    def rollup_values(self):
+        """The fields RepairDailyRollup aggregates, or None if any is deferred."""
+        values = self.__dict__
+        fields = ("shop_id", "created_at", "total_price", "expenses")
+        if any(field not in values for field in fields + ("payment_received",)):
+            return None
+        return tuple(values[field] for field in fields) + (values["payment_received"],)
+
     def save(self, *args, **kwargs):
-        """Override the save method to ensure profit is calculated before saving."""
+        """
+        Calculate profit, assign a code to new orders before the insert and
+        keep the daily rollup in step.
+        """
+        from .codes import repair_codes
+        from .services import RepairRollupService
+
         self.calculate_profit()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        previous = getattr(self, "_loaded_rollup", None)
+        with transaction.atomic():
+            if adding and not self.code:
+                self.code = repair_codes.allocate(self.shop_id)[0]
+            super().save(*args, **kwargs)
+            if adding or previous is not None:
+                RepairRollupService.record_change(previous, self.rollup_values())
+            else:
+                # Loaded without the rolled-up fields: recount the order's day.
+                RepairRollupService.refresh(
+                    [(self.shop_id, timezone.localdate(self.created_at))]
+                )
+        self._loaded_rollup = self.rollup_values()
+        invalidate_daily_totals([self.shop_id], [timezone.localdate(self.created_at)])
+
+    def delete(self, *args, **kwargs):
+        from .services import RepairRollupService
+
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            RepairRollupService.record_change(
+                getattr(self, "_loaded_rollup", None) or self.rollup_values(), None
+            )
+        invalidate_daily_totals([self.shop_id], [timezone.localdate(self.created_at)])
+        return result
 
     def __str__(self):
         return f"{self.device_name} - {self.issue} ({self.status}) - {self.code}"
 
 
+class RepairCodeSequence(models.Model):
+    """Next unreserved repair order number of a shop; see orders.codes."""
+
+    shop = models.OneToOneField(
+        Warehouse,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="repair_code_sequence",
+    )
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    class Meta:
+        verbose_name = "Repair Code Sequence"
+        verbose_name_plural = "Repair Code Sequences"
+
+    def __str__(self):
+        return f"{self.shop} - next {self.next_value}"
+
+
+class RepairDailyRollup(models.Model):
+    """Per-shop, per-day repair figures maintained by RepairRollupService."""
+
+    shop = models.ForeignKey(
+        Warehouse, on_delete=models.CASCADE, related_name="repair_rollups"
+    )
+    day = models.DateField()
+    orders_count = models.PositiveIntegerField(default=0)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_expenses = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    total_profit = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    unpaid_count = models.PositiveIntegerField(default=0)
+    unpaid_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-day", "shop"]
+        verbose_name = "Repair Daily Rollup"
+        verbose_name_plural = "Repair Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shop", "day"], name="unique_repair_rollup_shop_day"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.shop.name} {self.day}: {self.orders_count} repairs"
+
+    @property
+    def profit_owner(self):
+        return self.total_profit / 2
+
+    @property
+    def profit_worker(self):
+        return self.total_profit / 2
+
+
 class Order(models.Model):
     customer = models.ForeignKey(
         Customer, on_delete=models.CASCADE, related_name="orders"
@@ -121,6 +242,14 @@ class Order(models.Model):
         validators=[MinValueValidator(Decimal("0.00"))],
         default=Decimal("0.00"),
     )
+    # Taken off the items' sum by apply_payment_discount; kept so totals can
+    # be recomputed (and checked) without losing it.
+    discount_amount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        editable=False,
+    )
     shipping_address = models.CharField(max_length=255)
     payment_status = models.CharField(
         max_length=50,
@@ -131,12 +260,21 @@ class Order(models.Model):
         ],
         default="unpaid",
     )
-    objects = OrderManager
+    objects = OrderManager()
 
     class Meta:
         ordering = ["-order_date"]
         verbose_name = "Order"
         verbose_name_plural = "Orders"
+        indexes = [
+            # Order history: a customer's orders newest first.
+            models.Index(
+                fields=["customer", "order_date"], name="order_customer_date_idx"
+            ),
+            models.Index(fields=["order_date"], name="order_date_idx"),
+            models.Index(fields=["status"], name="order_status_idx"),
+            models.Index(fields=["payment_status"], name="order_payment_status_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(total_amount__gte=0), name="total_amount_non_negative"
@@ -152,6 +290,53 @@ class Order(models.Model):
     #         self.total_amount = self.calculate_total()
     #     super().save(*args, **kwargs)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember whether the stored order is a sale, so saves only touch the
+        # sales fact stream when that changes.
+        instance._loaded_sale = instance.is_sale()
+        return instance
+
+    def is_sale(self):
+        """Whether the order counts towards sales: paid and not canceled."""
+        values = self.__dict__
+        return values.get("payment_status") == "paid" and (
+            values.get("status") != "canceled"
+        )
+
+    def save(self, *args, **kwargs):
+        """Save the order and append sales facts if its sale figures changed."""
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        update_fields = kwargs.get("update_fields")
+        changed = self.is_sale() != getattr(self, "_loaded_sale", False) or (
+            self.is_sale()
+            and (update_fields is None or SALE_FIELDS.intersection(update_fields))
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if changed:
+                OrderFactStream.sync([self.pk])
+        self._loaded_sale = self.is_sale()
+
+    def delete(self, *args, **kwargs):
+        """Delete the order and append the facts reversing its sales."""
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        pk = self.pk
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            OrderFactStream.sync([pk])
+        return result
+
+    def sync_sales_facts(self):
+        """Append sales facts after an item change, if the order is a sale."""
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        if self.is_sale() or getattr(self, "_loaded_sale", False):
+            OrderFactStream.sync([self.pk])
+
     def update_status(self, new_status):
         """Update the order status."""
         if new_status not in dict(self._meta.get_field("status").choices):
@@ -170,8 +355,59 @@ class Order(models.Model):
 
     def calculate_total(self):
         """Calculate the total amount for the order based on its items."""
-        total = sum(item.total_price for item in self.items.all())
-        return total
+        return self.items.aggregate(total=Sum("total_price"))["total"] or Decimal(
+            "0.00"
+        )
+
+    def recalculate_total(self):
+        """
+        Recompute total_amount from the items, less the recorded discount,
+        with one aggregate and store it.
+        """
+        if getattr(self, "_deferring_totals", False):
+            return
+        self.total_amount = self.calculate_total() - self.discount_amount
+        Order.objects.filter(pk=self.pk).update(total_amount=self.total_amount)
+
+    def apply_total_delta(self, delta):
+        """Shift the stored total by one item's change without reading the items."""
+        if not delta or getattr(self, "_deferring_totals", False):
+            return
+        Order.objects.filter(pk=self.pk).update(total_amount=F("total_amount") + delta)
+        self.total_amount += delta
+
+    @contextmanager
+    def deferred_totals(self):
+        """
+        Write many items without per-item total updates; the total is
+        recomputed once when the block exits. Items must be saved through
+        this Order instance (item.order is self).
+        """
+        self._deferring_totals = True
+        try:
+            with transaction.atomic():
+                yield self
+                self._deferring_totals = False
+                self.recalculate_total()
+        finally:
+            self._deferring_totals = False
+
+    def add_items(self, items):
+        """
+        Bulk-insert OrderItems for this order and add their sum to the total
+        with a single UPDATE.
+        :param items: Unsaved OrderItem instances.
+        """
+        for item in items:
+            item.order = self
+            item.total_price = item.quantity * item.price_per_item
+        with transaction.atomic():
+            created = OrderItem.objects.bulk_create(items, batch_size=500)
+            self.apply_total_delta(
+                sum((item.total_price for item in created), Decimal("0.00"))
+            )
+            self.sync_sales_facts()
+        return created
 
     def refund(self):
         """Mark the order as refunded if it's paid."""
@@ -205,9 +441,36 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.quantity} of {self.product.name} for Order {self.order.id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored line total so saves can update the order by delta.
+        instance._loaded_total = dict(zip(field_names, values)).get("total_price")
+        return instance
+
     def save(self, *args, **kwargs):
         self.total_price = self.quantity * self.price_per_item
-        super().save(*args, **kwargs)
+        previous = (
+            Decimal("0.00")
+            if self._state.adding
+            else getattr(self, "_loaded_total", None)
+        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if previous is None:
+                self.order.recalculate_total()
+            else:
+                self.order.apply_total_delta(self.total_price - previous)
+            self.order.sync_sales_facts()
+        self._loaded_total = self.total_price
+
+    def delete(self, *args, **kwargs):
+        total = getattr(self, "_loaded_total", self.total_price)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            self.order.apply_total_delta(-total)
+            self.order.sync_sales_facts()
+        return result
 
     def calculate_total_price(self):
         """Calculate the total price for this item."""
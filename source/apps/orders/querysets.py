@@ -1,8 +1,33 @@
-from datetime import timedelta
+from datetime import datetime, time, timedelta
+from decimal import Decimal
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 
+ZERO = models.Value(Decimal("0.00"))
+
+# RepairOrder fields that feed RepairDailyRollup.
+ROLLUP_FIELDS = {
+    "shop",
+    "shop_id",
+    "created_at",
+    "total_price",
+    "expenses",
+    "payment_received",
+}
+
+# Order fields that decide what an order contributes to the sales facts.
+SALE_FIELDS = {
+    "status",
+    "payment_status",
+    "order_date",
+    "customer",
+    "customer_id",
+    "discount_amount",
+}
+
 
 class OrderQuerySet(models.QuerySet):
     def pending(self):
@@ -21,6 +46,27 @@ class OrderQuerySet(models.QuerySet):
         recent_date = timezone.now() - timedelta(days=days)
         return self.filter(order_date__gte=recent_date)
 
+    def update(self, **kwargs):
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        if not SALE_FIELDS.intersection(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            order_ids = list(self.values_list("pk", flat=True).order_by())
+            rows = super().update(**kwargs)
+            OrderFactStream.sync(order_ids)
+        return rows
+
+    def delete(self):
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        with transaction.atomic(using=self.db):
+            order_ids = list(self.values_list("pk", flat=True).order_by())
+            result = super().delete()
+            # The orders are gone, so their facts are netted out to zero.
+            OrderFactStream.sync(order_ids)
+        return result
+
 
 class RepairOrderQuerySet(models.QuerySet):
     def completed(self):
@@ -36,34 +82,91 @@ class RepairOrderQuerySet(models.QuerySet):
         return self.filter(status="sent_to_other_shop")
 
     def created_today(self):
-        return self.filter(created_at__date=timezone.now().date())
+        # A range on the raw column (not created_at__date) can use the indexes.
+        start = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        return self.filter(
+            created_at__gte=start, created_at__lt=start + timedelta(days=1)
+        )
 
     def paid(self):
         return self.filter(status="paid")
 
-    def total_calculations(self):
-        """Perform the daily calculations."""
-        total_price = (
-            self.aggregate(total_price=models.Sum("total_price"))["total_price"] or 0
+    def update(self, **kwargs):
+        from .services import RepairRollupService
+        from .utils import invalidate_daily_totals
+
+        keys = set(
+            self.annotate(day=TruncDate("created_at"))
+            .values_list("shop_id", "day")
+            .order_by()
+            .distinct()
         )
-        total_expenses = (
-            self.aggregate(total_expenses=models.Sum("expenses"))["total_expenses"] or 0
+        rows = super().update(**kwargs)
+        invalidate_daily_totals(
+            {shop_id for shop_id, _ in keys}, {day for _, day in keys}
         )
-        total_profit = total_price - total_expenses
+        if ROLLUP_FIELDS.intersection(kwargs):
+            new_shop = kwargs.get("shop_id", getattr(kwargs.get("shop"), "pk", None))
+            if new_shop is not None:
+                keys |= {(new_shop, day) for _, day in keys}
+            RepairRollupService.refresh(keys)
+        return rows
 
-        unpaid_orders = self.unpaid().count()
-        sent_to_other_shop = self.sent_to_other_shop().count()
+    def total_calculations(self):
+        """Perform the daily calculations in one aggregate query."""
+        totals = self.aggregate(
+            price=Coalesce(Sum("total_price"), ZERO),
+            expenses=Coalesce(Sum("expenses"), ZERO),
+            unpaid_orders=Count("pk", filter=Q(status="customer_pickup")),
+            sent_to_other_shop=Count("pk", filter=Q(status="sent_to_other_shop")),
+        )
+        total_profit = totals["price"] - totals["expenses"]
 
         # Profit division
         profit_owner = total_profit / 2
         profit_worker = total_profit / 2
 
         return {
-            "total_price": total_price,
-            "total_expenses": total_expenses,
+            "total_price": totals["price"],
+            "total_expenses": totals["expenses"],
+            "total_profit": total_profit,
+            "unpaid_orders": totals["unpaid_orders"],
+            "sent_to_other_shop": totals["sent_to_other_shop"],
+            "profit_owner": profit_owner,
+            "profit_worker": profit_worker,
+        }
+
+    def daily_totals(self, day, shop=None):
+        """
+        All figures of the repair daily report in one conditional-aggregation
+        query: the day's orders plus the (all-time) unpaid orders.
+        """
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        on_day = Q(created_at__gte=start, created_at__lt=start + timedelta(days=1))
+        unpaid = Q(payment_received=False)
+        orders = self.filter(on_day | unpaid)
+        if shop:
+            orders = orders.filter(shop=shop)
+        totals = orders.aggregate(
+            orders=Count("pk", filter=on_day),
+            price=Coalesce(Sum("total_price", filter=on_day), ZERO),
+            expenses=Coalesce(Sum("expenses", filter=on_day), ZERO),
+            unpaid_count=Count("pk", filter=unpaid),
+            unpaid_price=Coalesce(Sum("total_price", filter=unpaid), ZERO),
+        )
+        total_profit = totals["price"] - totals["expenses"]
+
+        # Calculate profit splitting
+        profit_owner = total_profit / 2
+        profit_worker = total_profit / 2
+
+        return {
+            "total_orders": totals["orders"],
+            "total_price": totals["price"],
+            "total_expenses": totals["expenses"],
             "total_profit": total_profit,
-            "unpaid_orders": unpaid_orders,
-            "sent_to_other_shop": sent_to_other_shop,
             "profit_owner": profit_owner,
             "profit_worker": profit_worker,
+            "unpaid_orders_count": totals["unpaid_count"],
+            "unpaid_total": totals["unpaid_price"],
         }
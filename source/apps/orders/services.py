@@ -1,18 +1,24 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
 from django.core.cache import cache
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 
 from source.apps.inventory.services import InventoryService
 from source.apps.logistics.models import Shipment
 
-from .models import Order, Payment, RepairOrder
+from .models import Order, Payment, RepairDailyRollup, RepairOrder
 from .utils import (
+    DAILY_TOTALS_CACHE_TIMEOUT,
     allocate_inventory,
     apply_payment_discount,
     calculate_shipping_cost,
     check_inventory_availability,
+    daily_totals_cache_key,
     format_order_summary,
     generate_order_report,
     is_order_cancelable,
@@ -25,43 +31,19 @@ from .utils import (
 
 class RepairCalculationService:
     @staticmethod
-    def calculate_daily_totals(shop=None):
-        """Calculate daily totals for the given shop or for all shops."""
-        orders = RepairOrder.objects.filter(created_at__date=timezone.now().date())
-
-        if shop:
-            orders = orders.filter(shop=shop)
-
-        # Calculate total prices, expenses, profits
-        total_price = orders.aggregate(total_price=Sum("total_price"))[
-            "total_price"
-        ] or Decimal("0.00")
-        total_expenses = orders.aggregate(total_expenses=Sum("expenses"))[
-            "total_expenses"
-        ] or Decimal("0.00")
-        total_profit = total_price - total_expenses
-
-        # Filter out unpaid orders using the manager's method
-        unpaid_orders = RepairOrder.objects.unpaid_orders()  # Use the manager method
-        unpaid_orders_count = unpaid_orders.count()
-        unpaid_total = unpaid_orders.aggregate(unpaid_total=Sum("total_price"))[
-            "unpaid_total"
-        ] or Decimal("0.00")
-
-        # Calculate profit splitting
-        profit_owner = total_profit / 2
-        profit_worker = total_profit / 2
-
-        return {
-            "total_orders": orders.count(),
-            "total_price": total_price,
-            "total_expenses": total_expenses,
-            "total_profit": total_profit,
-            "profit_owner": profit_owner,
-            "profit_worker": profit_worker,
-            "unpaid_orders_count": unpaid_orders_count,
-            "unpaid_total": unpaid_total,
-        }
+    def calculate_daily_totals(shop=None, day=None):
+        """
+        Calculate daily totals for the given shop or for all shops with one
+        conditional-aggregation query. Results are cached briefly per shop and
+        day; RepairOrder writes invalidate them.
+        """
+        day = day or timezone.localdate()
+        cache_key = daily_totals_cache_key(getattr(shop, "pk", shop), day)
+        totals = cache.get(cache_key)
+        if totals is None:
+            totals = RepairOrder.objects.daily_totals(day, shop)
+            cache.set(cache_key, totals, timeout=DAILY_TOTALS_CACHE_TIMEOUT)
+        return totals
 
     @staticmethod
     def verify_calculations():
@@ -74,6 +56,153 @@ class RepairCalculationService:
         return (total_price - total_expenses) == total_profit
 
 
+class RepairRollupService:
+    FIELDS = (
+        "orders_count",
+        "total_price",
+        "total_expenses",
+        "total_profit",
+        "unpaid_count",
+        "unpaid_total",
+    )
+
+    @staticmethod
+    def record_change(previous, current):
+        """
+        Move one repair order's contribution between daily rollups.
+        :param previous: RepairOrder.rollup_values() before the write, or None.
+        :param current: RepairOrder.rollup_values() after the write, or None.
+        """
+        deltas = defaultdict(lambda: dict.fromkeys(RepairRollupService.FIELDS, 0))
+        for values, sign in ((previous, -1), (current, 1)):
+            if values is None:
+                continue
+            shop_id, created_at, total_price, expenses, paid = values
+            delta = deltas[(shop_id, timezone.localdate(created_at))]
+            delta["orders_count"] += sign
+            delta["total_price"] += sign * total_price
+            delta["total_expenses"] += sign * expenses
+            delta["total_profit"] += sign * (total_price - expenses)
+            if not paid:
+                delta["unpaid_count"] += sign
+                delta["unpaid_total"] += sign * total_price
+
+        for (shop_id, day), delta in deltas.items():
+            changes = {
+                field: F(field) + value for field, value in delta.items() if value
+            }
+            if not changes:
+                continue
+            rollup = RepairDailyRollup.objects.filter(shop_id=shop_id, day=day)
+            if not rollup.update(**changes):
+                RepairDailyRollup.objects.bulk_create(
+                    [RepairDailyRollup(shop_id=shop_id, day=day)],
+                    ignore_conflicts=True,
+                )
+                rollup.update(**changes)
+
+    @staticmethod
+    def computed(orders):
+        """
+        Aggregate repair orders into rollup rows with one grouped query.
+        :return: Unsaved RepairDailyRollup instances.
+        """
+        unpaid = Q(payment_received=False)
+        zero = Value(Decimal("0.00"))
+        rows = (
+            orders.annotate(day=TruncDate("created_at"))
+            .values("shop_id", "day")
+            .annotate(
+                orders=Count("pk"),
+                price=Coalesce(Sum("total_price"), zero),
+                costs=Coalesce(Sum("expenses"), zero),
+                unpaid=Count("pk", filter=unpaid),
+                unpaid_price=Coalesce(Sum("total_price", filter=unpaid), zero),
+            )
+            .order_by()
+        )
+        return [
+            RepairDailyRollup(
+                shop_id=row["shop_id"],
+                day=row["day"],
+                orders_count=row["orders"],
+                total_price=row["price"],
+                total_expenses=row["costs"],
+                total_profit=row["price"] - row["costs"],
+                unpaid_count=row["unpaid"],
+                unpaid_total=row["unpaid_price"],
+            )
+            for row in rows
+        ]
+
+    @staticmethod
+    def refresh(keys):
+        """Recount the rollups of the given (shop_id, day) pairs from raw orders."""
+        keys = set(keys)
+        if not keys:
+            return
+        days = [day for _, day in keys]
+        start = timezone.make_aware(datetime.combine(min(days), time.min))
+        end = timezone.make_aware(datetime.combine(max(days), time.min))
+        orders = RepairOrder.objects.filter(
+            shop_id__in={shop_id for shop_id, _ in keys},
+            created_at__gte=start,
+            created_at__lt=end + timedelta(days=1),
+        )
+        rollups = [
+            rollup
+            for rollup in RepairRollupService.computed(orders)
+            if (rollup.shop_id, rollup.day) in keys
+        ]
+        with transaction.atomic():
+            stale = Q()
+            for shop_id, day in keys:
+                stale |= Q(shop_id=shop_id, day=day)
+            RepairDailyRollup.objects.filter(stale).delete()
+            RepairDailyRollup.objects.bulk_create(rollups)
+
+    @staticmethod
+    def rebuild():
+        """
+        Replace every rollup with values recomputed from all repair orders.
+        :return: Number of rollup rows written.
+        """
+        rollups = RepairRollupService.computed(RepairOrder.objects.all())
+        with transaction.atomic():
+            RepairDailyRollup.objects.all().delete()
+            RepairDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+        return len(rollups)
+
+    @staticmethod
+    def report(start, end, shop=None):
+        """
+        Repair figures for a date range (inclusive) read from the rollups.
+        :return: Dict of totals plus the owner/worker profit split.
+        """
+        rollups = RepairDailyRollup.objects.filter(day__range=(start, end))
+        if shop:
+            rollups = rollups.filter(shop=shop)
+        zero = Value(Decimal("0.00"))
+        totals = rollups.aggregate(
+            orders=Coalesce(Sum("orders_count"), 0),
+            price=Coalesce(Sum("total_price"), zero),
+            costs=Coalesce(Sum("total_expenses"), zero),
+            profit=Coalesce(Sum("total_profit"), zero),
+            unpaid=Coalesce(Sum("unpaid_count"), 0),
+            unpaid_price=Coalesce(Sum("unpaid_total"), zero),
+        )
+        return {
+            "total_orders": totals["orders"],
+            "total_price": totals["price"],
+            "total_expenses": totals["costs"],
+            "total_profit": totals["profit"],
+            "profit_owner": totals["profit"] / 2,
+            "profit_worker": totals["profit"] / 2,
+            "unpaid_orders_count": totals["unpaid"],
+            "unpaid_total": totals["unpaid_price"],
+        }
+
+
 class OrderService:
     @staticmethod
     def create_order(customer_id, order_data):
@@ -181,8 +310,8 @@ class FulfillmentService:
     def process_order_fulfillment(order_id):
         """Processes order fulfillment by allocating inventory and preparing shipment."""
         order = Order.objects.get(id=order_id)
-        check_inventory_availability(order.items)
-        allocate_inventory(order.items)
+        check_inventory_availability(order.items.all())
+        allocate_inventory(order.items.all(), order)
         ShippingService.create_shipment(order.id, order.shipping_address, "standard")
 
     @staticmethod
@@ -214,11 +343,13 @@ class ReportingService:
     @staticmethod
     def generate_sales_report(start_date, end_date):
         """Generates a sales report for a given date range."""
-        from source.apps.orders.models import Order
-
-        orders = Order.objects.filter(order_date__range=(start_date, end_date))
-        total_sales = sum(order.total_amount for order in orders)
-        return {"total_orders": orders.count(), "total_sales": total_sales}
+        totals = Order.objects.filter(
+            order_date__range=(start_date, end_date)
+        ).aggregate(
+            orders=Count("pk"),
+            sales=Coalesce(Sum("total_amount"), Value(Decimal("0.00"))),
+        )
+        return {"total_orders": totals["orders"], "total_sales": totals["sales"]}
 
 
 class CachingService:
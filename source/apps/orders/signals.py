@@ -1,25 +1,7 @@
-import uuid
-
-from django.db.models.signals import post_delete, post_save
-from django.dispatch import receiver
-
-from .models import OrderItem, RepairOrder
-
-
-@receiver(post_save, sender=OrderItem)
-def update_order_total_on_item_save(sender, instance, **kwargs):
-    """Update order total when an item is added or updated."""
-    order = instance.order
-    order.total_amount = order.calculate_total()
-    order.save()
-
-
-@receiver(post_delete, sender=OrderItem)
-def update_order_total_on_item_delete(sender, instance, **kwargs):
-    """Update order total when an item is deleted."""
-    order = instance.order
-    order.total_amount = order.calculate_total()
-    order.save()
+# Order totals are kept in step by OrderItem.save()/delete() (see
+# Order.apply_total_delta); no receiver re-sums the items.
+# RepairOrder.save() computes the profit and assigns the code before the
+# insert (see orders.codes), so no post_save pass writes the row again.
 
 
 # @receiver(post_save, sender=Order)
@@ -28,16 +10,3 @@ def update_order_total_on_item_delete(sender, instance, **kwargs):
 #     if created or instance.total_amount == Decimal('0.00'):
 #         instance.total_amount = instance.calculate_total()
 #         instance.save()
-
-
-@receiver(post_save, sender=RepairOrder)
-def calculate_profit_on_save(sender, instance, **kwargs):
-    instance.calculate_profit()
-
-
-@receiver(post_save, sender=RepairOrder)
-def generate_order_code(sender, instance, created, **kwargs):
-    if created and not instance.code:
-        # Generate a unique code, e.g., using UUID and limiting it to 8 characters
-        instance.code = str(uuid.uuid4())[:8].upper()
-        instance.save()
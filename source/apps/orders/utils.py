@@ -1,8 +1,12 @@
 import uuid
 from decimal import Decimal
 
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
+from django.utils import timezone
+
+from source.layer.helpers.exports import CSVExport
 
 # def calculate_order_total(order):
 #     total = sum(item.total_price for item in order.items.all())
@@ -59,6 +63,29 @@ def get_order_status(order_id):
         raise ValueError(f"Order {order_id} does not exist.")
 
 
+# Repair report cache utils
+
+# Seconds the repair daily totals stay cached; writes invalidate sooner.
+DAILY_TOTALS_CACHE_TIMEOUT = 60
+
+
+def daily_totals_cache_key(shop_id, day):
+    """Cache key for one shop's (or all shops', shop_id=None) daily totals."""
+    return f"repair_daily_totals_{shop_id or 'all'}_{day.isoformat()}"
+
+
+def invalidate_daily_totals(shop_ids, days=()):
+    """Drops cached daily totals of the given shops for today and `days`."""
+    days = {timezone.localdate(), *days}
+    cache.delete_many(
+        [
+            daily_totals_cache_key(shop_id, day)
+            for shop_id in {None, *shop_ids}
+            for day in days
+        ]
+    )
+
+
 # payment utils
 
 
@@ -85,8 +112,9 @@ def apply_payment_discount(order, discount_code):
     """Applies a discount based on the given discount code."""
     # Example: Apply a fixed or percentage discount to the order's total
     if discount_code == "PROMO10":
-        discount = order.total_amount * Decimal("0.10")  # 10% discount
+        discount = (order.total_amount * Decimal("0.10")).quantize(Decimal("0.01"))
         order.total_amount -= discount
+        order.discount_amount += discount
         order.save()
 
 
@@ -125,27 +153,34 @@ def validate_shipping_address(address_data):
 
 
 def check_inventory_availability(order_items):
-    """Checks if there is enough stock for each item in the order."""
+    """Checks if there is enough available (unreserved) stock for each item."""
+    from source.apps.inventory.services import ReservationService
+
+    order_items = list(order_items)
+    available = ReservationService.available_to_promise(
+        {item.product_id for item in order_items}
+    )
     for item in order_items:
-        if item.product.stock < item.quantity:
+        if available[item.product_id] < item.quantity:
             raise ValidationError(f"Product {item.product.name} is out of stock.")
 
 
-def allocate_inventory(order_items):
-    """Reserves inventory for the order items."""
+def allocate_inventory(order_items, order):
+    """Holds inventory for the order items until the order is processed."""
+    from source.apps.inventory.services import ReservationService
+
+    lines = {}
     for item in order_items:
-        item.product.stock -= item.quantity
-        item.product.save()
+        lines[item.product_id] = lines.get(item.product_id, 0) + item.quantity
+    ReservationService.reserve(lines, order=order)
 
 
 def update_inventory_after_order(order_id):
-    """Updates inventory after the order is processed."""
+    """Converts the order's stock holds into deductions."""
+    from source.apps.inventory.services import ReservationService
     from source.apps.orders.models import Order
 
-    order = Order.objects.get(id=order_id)
-    for item in order.items.all():
-        item.product.stock -= item.quantity
-        item.product.save()
+    ReservationService.convert(order=Order.objects.get(id=order_id))
 
 
 # Notifications and Alerts Utils
@@ -209,3 +244,22 @@ def format_order_summary(order):
         "status": order.status,
     }
     return summary
+
+
+ORDER_EXPORT = CSVExport(
+    "orders.csv",
+    [
+        ("Order", "id"),
+        ("Date", "order_date"),
+        ("Customer Email", "customer__email"),
+        ("Status", "status"),
+        ("Payment Status", "payment_status"),
+        ("Total Amount", "total_amount"),
+        ("Shipping Address", "shipping_address"),
+    ],
+)
+
+
+def export_orders_to_csv(queryset):
+    """Stream orders as a CSV download."""
+    return ORDER_EXPORT.response(queryset)
@@ -0,0 +1,544 @@
+import csv
+import json
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Sum
+from django.utils.text import slugify
+from taggit.models import Tag, TaggedItem
+
+from source.apps.inventory.events import inventory_events
+from source.apps.inventory.ledger import StockLedger
+from source.apps.inventory.models import StockAdjustment, StockReservation, Warehouse
+
+from .models import Brand, Category, Product, ProductVariant
+from .utils import BaseSKUGenerator, format_variant_sku
+
+# Rows per transaction; every stage issues a constant number of queries per chunk.
+IMPORT_CHUNK_SIZE = 2000
+
+# Errors kept with their row number; the rest are only counted.
+MAX_REPORTED_ERRORS = 100
+
+# Product columns overwritten when an imported SKU already exists.
+UPDATED_PRODUCT_FIELDS = [
+    "name",
+    "slug",
+    "subtitle",
+    "description",
+    "category",
+    "brand",
+    "base_price",
+    "flag",
+    "is_active",
+    "updated_at",
+]
+
+# Reason recorded on the StockAdjustment rows of imported stock levels.
+IMPORT_ADJUSTMENT_REASON = "Catalog import"
+
+FLAGS = {flag for flag, _ in Product.FLAG_TYPES}
+
+
+def read_catalog(stream, file_format="csv"):
+    """
+    Stream catalog rows from a CSV (header row) or JSONL file object.
+    Column names are matched case-insensitively.
+    :return: Generator of (line number, row dict).
+    """
+    if file_format == "jsonl":
+        for line_no, line in enumerate(stream, start=1):
+            if line.strip():
+                row = json.loads(line)
+                yield line_no, {
+                    key.strip().lower(): value for key, value in row.items()
+                }
+        return
+    for line_no, row in enumerate(csv.DictReader(stream), start=2):
+        yield line_no, {key.strip().lower(): value for key, value in row.items()}
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.products_created = 0
+        self.products_updated = 0
+        self.variants = 0
+        self.inventory_items = 0
+        self.error_count = 0
+        self.errors = []
+
+    def error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_no, message))
+
+    def __str__(self):
+        return (
+            f"{self.rows} rows: {self.products_created} products created, "
+            f"{self.products_updated} updated, {self.variants} variants, "
+            f"{self.inventory_items} inventory rows, {self.error_count} errors"
+        )
+
+
+class CatalogImporter:
+    """
+    Imports products with their variants, tags and warehouse stock.
+    Rows are consumed in chunks so memory stays flat for large catalogs:
+    categories, brands, warehouses and tags are resolved from in-memory maps,
+    SKUs are reserved per prefix in blocks, and each chunk is written with a
+    fixed number of bulk INSERT ... ON CONFLICT statements inside one
+    transaction. One row describes a product and optionally one variant
+    (color/size) and its stock in one warehouse; rows of the same product
+    share its SKU, or its name when no SKU is given.
+
+    Inventory quantities set the stock level of (product, warehouse): the
+    quantities of all rows for a pair in the import are added up, so a
+    catalog with one row per variant sets the product's total. Levels are
+    written through StockLedger with StockAdjustment audit rows and never
+    below what active reservations hold.
+    """
+
+    def __init__(
+        self, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, update_existing=True
+    ):
+        """
+        :param dry_run: Validate and resolve every row without writing.
+        :param update_existing: Overwrite product fields of SKUs that already
+            exist; when False their rows only add variants, tags and stock.
+        """
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.update_existing = update_existing
+        self.result = ImportResult()
+        self.categories = {
+            name: pk for pk, name in Category.objects.values_list("pk", "name")
+        }
+        self.category_ids = set(Category.objects.values_list("pk", flat=True))
+        self.brands = {name: pk for pk, name in Brand.objects.values_list("pk", "name")}
+        self.warehouses = {
+            name: pk for pk, name in Warehouse.objects.values_list("pk", "name")
+        }
+        self.tags = {}
+        self.product_ids = {}  # sku -> pk of products seen in this import
+        self.name_skus = {}  # name -> sku for rows that identify products by name
+        self.slugs = set()
+        self.levels = defaultdict(int)  # (product_id, warehouse_id) -> level
+
+    def run(self, rows):
+        """
+        Import (line number, row) pairs, e.g. from read_catalog().
+        :return: Generator yielding the running ImportResult after each chunk.
+        """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            self.result.rows += len(chunk)
+            self._import_chunk(chunk)
+            yield self.result
+
+    def _import_chunk(self, chunk):
+        cleaned = []
+        for line_no, raw in chunk:
+            try:
+                cleaned.append(self._clean(line_no, raw))
+            except ValidationError as exc:
+                self.result.error(line_no, "; ".join(exc.messages))
+        groups = self._group_products(cleaned)
+        if self.dry_run:
+            self._count(groups)
+            return
+        with inventory_events.collect(), transaction.atomic():
+            self._ensure_lookups(groups)
+            self._write_products(groups)
+            self._write_tags(groups)
+            self._write_variants(groups)
+            self._write_inventory(groups)
+
+    def _clean(self, line_no, raw):
+        """
+        Parse and validate one row.
+        :raise: ValidationError describing every problem in the row.
+        """
+        errors = []
+
+        def decimal(field):
+            value = raw.get(field)
+            if value in (None, ""):
+                return None
+            try:
+                return Decimal(str(value))
+            except InvalidOperation:
+                errors.append(f"{field} is not a number: {value!r}")
+
+        def integer(field):
+            value = raw.get(field)
+            if value in (None, ""):
+                return None
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                errors.append(f"{field} is not an integer: {value!r}")
+
+        row = {
+            "line_no": line_no,
+            "name": str(raw.get("name") or "").strip(),
+            "sku": str(raw.get("sku") or "").strip() or None,
+            "subtitle": raw.get("subtitle") or "",
+            "description": raw.get("description") or "",
+            "category": str(raw.get("category") or "").strip(),
+            "category_id": integer("category_id"),
+            "brand": str(raw.get("brand") or "").strip(),
+            "flag": raw.get("flag") or "New",
+            "is_active": str(raw.get("is_active", "true")).lower()
+            not in ("0", "false", "no"),
+        }
+        if not row["name"] and not row["sku"]:
+            errors.append("name or sku is required")
+        if (
+            row["category_id"] is not None
+            and row["category_id"] not in self.category_ids
+        ):
+            errors.append(f"unknown category_id {row['category_id']}")
+        if row["flag"] not in FLAGS:
+            errors.append(f"unknown flag {row['flag']!r}")
+        row["base_price"] = decimal("base_price")
+        if row["base_price"] is None:
+            row["base_price"] = decimal("price")
+        tags = raw.get("tags") or []
+        if isinstance(tags, str):
+            tags = tags.replace("|", ",").split(",")
+        row["tags"] = {tag.strip() for tag in tags if tag.strip()}
+
+        color, size = raw.get("color") or "", raw.get("size") or ""
+        variant_price, stock = decimal("variant_price"), integer("stock")
+        row["variant"] = None
+        if color or size or variant_price is not None:
+            row["variant"] = {
+                "color": color,
+                "size": size,
+                "price": variant_price,
+                "stock": stock or 0,
+            }
+
+        warehouse = str(raw.get("warehouse") or "").strip()
+        quantity = integer("quantity")
+        row["stock"] = None
+        if warehouse:
+            level = quantity if quantity is not None else stock or 0
+            if warehouse not in self.warehouses:
+                errors.append(f"unknown warehouse {warehouse!r}")
+            elif level < 0:
+                errors.append("quantity cannot be negative")
+            row["stock"] = (self.warehouses.get(warehouse), level)
+        if errors:
+            raise ValidationError(errors)
+        return row
+
+    @staticmethod
+    def _has_product_fields(data):
+        return bool(
+            data["name"]
+            and data["base_price"] is not None
+            and (data["category"] or data["category_id"])
+        )
+
+    def _group_products(self, rows):
+        """
+        Group rows by product (SKU, or name for rows without one) and drop
+        new products whose first row lacks the fields needed to create them.
+        Existing SKUs are looked up with one query per chunk.
+        :return: Mapping of product key to (first row, rows).
+        """
+        groups = {}
+        for row in rows:
+            key = row["sku"] or self.name_skus.get(row["name"]) or ("name", row["name"])
+            if key in groups:
+                groups[key][1].append(row)
+            else:
+                groups[key] = (row, [row])
+
+        unseen = [
+            key
+            for key in groups
+            if isinstance(key, str) and key not in self.product_ids
+        ]
+        if unseen:
+            self.product_ids.update(
+                Product.objects.filter(sku__in=unseen).values_list("sku", "pk")
+            )
+
+        for key, (data, group_rows) in list(groups.items()):
+            if key not in self.product_ids and not self._has_product_fields(data):
+                del groups[key]
+                for row in group_rows:
+                    self.result.error(
+                        row["line_no"],
+                        f"new product {data['name'] or data['sku']!r} needs "
+                        "name, base_price and category on its first row",
+                    )
+        return groups
+
+    def _count(self, groups):
+        """Dry run: tally what the chunk would write and remember new products."""
+        for key, (data, rows) in groups.items():
+            if key not in self.product_ids:
+                self.product_ids[key] = None
+                if isinstance(key, tuple):
+                    self.name_skus[data["name"]] = key
+                self.result.products_created += 1
+            elif self.update_existing and self._has_product_fields(data):
+                self.result.products_updated += 1
+            self.result.variants += sum(1 for row in rows if row["variant"])
+            self.result.inventory_items += len(
+                {(key, row["stock"][0]) for row in rows if row["stock"]}
+            )
+
+    def _ensure_lookups(self, groups):
+        """Create the categories and brands named by the chunk's products."""
+        for data, _ in groups.values():
+            for name, lookup, model in (
+                (data["category"], self.categories, Category),
+                (data["brand"], self.brands, Brand),
+            ):
+                if name and name not in lookup:
+                    lookup[name] = model.objects.get_or_create(name=name)[0].pk
+
+    def _write_products(self, groups):
+        new, updated = {}, []
+        for key, (data, _) in groups.items():
+            existing = key in self.product_ids
+            if existing and not (
+                self.update_existing and self._has_product_fields(data)
+            ):
+                continue
+            product = Product(
+                name=data["name"],
+                subtitle=data["subtitle"],
+                description=data["description"],
+                category_id=self.categories.get(data["category"])
+                or data["category_id"],
+                brand_id=self.brands.get(data["brand"]),
+                base_price=data["base_price"],
+                flag=data["flag"],
+                # Rows found by name carry the SKU only in the group key.
+                sku=key if isinstance(key, str) else data["sku"],
+                is_active=data["is_active"],
+            )
+            if existing:
+                updated.append(product)
+            else:
+                new[key] = product
+
+        BaseSKUGenerator().generate_bulk(new.values())
+        # Updated products keep their slug unless the import renames them;
+        # renamed ones get a new slug from their name, as Product.save() does.
+        renamed = []
+        if updated:
+            current = {
+                sku: (name, slug)
+                for sku, name, slug in Product.objects.filter(
+                    sku__in=[product.sku for product in updated]
+                ).values_list("sku", "name", "slug")
+            }
+            for product in updated:
+                name, product.slug = current[product.sku]
+                if product.name != name and slugify(product.name) != product.slug:
+                    renamed.append(product)
+        slugged = [*new.values(), *renamed]
+        taken = self.slugs | set(
+            Product.objects.filter(
+                slug__in={slugify(product.name) for product in slugged}
+            ).values_list("slug", flat=True)
+        )
+        for product in slugged:
+            product.slug = slugify(product.name)
+            if product.slug in taken:
+                product.slug = slugify(f"{product.name} {product.sku}")
+            taken.add(product.slug)
+            self.slugs.add(product.slug)
+
+        Product.objects.bulk_create(new.values(), batch_size=500)
+        if updated:
+            Product.objects.bulk_create(
+                updated,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=["sku"],
+                update_fields=UPDATED_PRODUCT_FIELDS,
+            )
+        if any(product.pk is None for product in new.values()):
+            # Backends that do not return primary keys from bulk inserts.
+            ids = dict(
+                Product.objects.filter(
+                    sku__in=[product.sku for product in new.values()]
+                ).values_list("sku", "pk")
+            )
+            for product in new.values():
+                product.pk = ids[product.sku]
+        for key, product in new.items():
+            self.product_ids[product.sku] = product.pk
+            if isinstance(key, tuple):
+                self.name_skus[product.name] = product.sku
+        self.result.products_created += len(new)
+        self.result.products_updated += len(updated)
+
+        for key, (_, rows) in groups.items():
+            sku = new[key].sku if key in new else key
+            for row in rows:
+                row["sku"], row["product_id"] = sku, self.product_ids[sku]
+
+    def _write_tags(self, groups):
+        tagged = {
+            (row["product_id"], name)
+            for _, rows in groups.values()
+            for row in rows
+            for name in row["tags"]
+        }
+        if not tagged:
+            return
+        names = {name for _, name in tagged} - self.tags.keys()
+        self.tags.update(Tag.objects.filter(name__in=names).values_list("name", "pk"))
+        for name in names - self.tags.keys():
+            # Few distinct tags; Tag.save() keeps their slugs unique.
+            self.tags[name] = Tag.objects.create(name=name).pk
+        content_type = ContentType.objects.get_for_model(Product)
+        TaggedItem.objects.bulk_create(
+            [
+                TaggedItem(
+                    content_type=content_type,
+                    object_id=product_id,
+                    tag_id=self.tags[name],
+                )
+                for product_id, name in tagged
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+    def _write_variants(self, groups):
+        variants, lines = {}, {}
+        for data, rows in groups.values():
+            for row in rows:
+                variant = row["variant"]
+                if not variant:
+                    continue
+                key = (row["product_id"], variant["color"], variant["size"])
+                price = variant["price"]
+                for fallback in (row["base_price"], data["base_price"]):
+                    if price is None:
+                        price = fallback
+                variants[key] = ProductVariant(
+                    product_id=row["product_id"],
+                    color=variant["color"],
+                    size=variant["size"],
+                    sku=format_variant_sku(
+                        row["sku"], variant["color"], variant["size"]
+                    ),
+                    price=price,
+                    stock=variant["stock"],
+                )
+                lines[key] = row["line_no"]
+        if not variants:
+            return
+
+        unpriced = {
+            key[0] for key, variant in variants.items() if variant.price is None
+        }
+        if unpriced:
+            base_prices = dict(
+                Product.objects.filter(pk__in=unpriced).values_list("pk", "base_price")
+            )
+            for key, variant in variants.items():
+                if variant.price is None:
+                    variant.price = base_prices[key[0]]
+
+        # Variant SKUs only keep colour and size initials, so two variants of
+        # a product can map to the same SKU; keep the first and report the rest.
+        owners = {
+            sku: key
+            for sku, *key in ProductVariant.objects.filter(
+                sku__in=[variant.sku for variant in variants.values()]
+            ).values_list("sku", "product_id", "color", "size")
+        }
+        accepted = []
+        for key, variant in variants.items():
+            owner = owners.setdefault(variant.sku, list(key))
+            if owner != list(key):
+                self.result.error(
+                    lines[key], f"variant SKU {variant.sku} is already used"
+                )
+                continue
+            accepted.append(variant)
+
+        ProductVariant.objects.bulk_create(
+            accepted,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=["product", "color", "size"],
+            update_fields=["sku", "price", "stock"],
+        )
+        self.result.variants += len(accepted)
+
+    def _write_inventory(self, groups):
+        """
+        Set the chunk's stock levels through StockLedger: each change is
+        applied as a delta with a StockAdjustment audit row and the usual
+        inventory events. Levels below what active reservations already hold
+        are refused and reported.
+        """
+        lines = defaultdict(list)
+        proposed = {}
+        for _, rows in groups.values():
+            for row in rows:
+                if row["stock"]:
+                    warehouse_id, level = row["stock"]
+                    key = (row["product_id"], warehouse_id)
+                    proposed[key] = proposed.get(key, self.levels[key]) + level
+                    lines[key].append(row["line_no"])
+        if not proposed:
+            return
+
+        items = StockLedger.lock_items(proposed, create=proposed)
+        held = dict(
+            StockReservation.objects.active()
+            .filter(inventory_item__in=items.values())
+            .values("inventory_item")
+            .annotate(total=Sum("quantity"))
+            .values_list("inventory_item", "total")
+        )
+        deltas, adjustments = {}, []
+        for key, level in proposed.items():
+            item = items[key]
+            reserved = held.get(item.pk, 0)
+            if level < reserved:
+                for line_no in lines[key]:
+                    self.result.error(
+                        line_no,
+                        f"stock level {level} is below the {reserved} "
+                        "units already reserved",
+                    )
+                continue
+            self.levels[key] = level
+            # Zero deltas still run so new empty rows are marked sold.
+            deltas[item] = level - item.quantity
+            if deltas[item]:
+                adjustments.append(
+                    StockAdjustment(
+                        inventory_item=item,
+                        adjustment_type="add" if deltas[item] > 0 else "remove",
+                        quantity=abs(deltas[item]),
+                        reason=IMPORT_ADJUSTMENT_REASON,
+                    )
+                )
+        StockAdjustment.objects.bulk_create(adjustments, batch_size=1000)
+        StockLedger.apply_many(deltas)
+        for adjustment in adjustments:
+            adjustment.publish_applied()
+        self.result.inventory_items += len(deltas)
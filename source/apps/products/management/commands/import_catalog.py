@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from source.apps.products.importer import (
+    IMPORT_CHUNK_SIZE,
+    CatalogImporter,
+    read_catalog,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import products, variants, tags and warehouse stock from a CSV or "
+        "JSONL catalog in bulk chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Catalog file (.csv or .jsonl).")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format; defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help="Rows written per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the catalog and report what would change without writing.",
+        )
+        parser.add_argument(
+            "--no-update",
+            action="store_true",
+            help="Leave the fields of products whose SKU already exists unchanged.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"] or (
+            "jsonl" if path.endswith(".jsonl") else "csv"
+        )
+        importer = CatalogImporter(
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+            update_existing=not options["no_update"],
+        )
+        started = time.perf_counter()
+        with open(path, newline="", encoding="utf-8") as stream:
+            for result in importer.run(read_catalog(stream, file_format)):
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{result} ({result.rows / elapsed:.0f} rows/s)")
+
+        result = importer.result
+        for line_no, message in result.errors:
+            self.stderr.write(f"line {line_no}: {message}")
+        if result.error_count > len(result.errors):
+            self.stderr.write(
+                f"... {result.error_count - len(result.errors)} more errors"
+            )
+        elapsed = time.perf_counter() - started
+        summary = f"{'Checked' if options['dry_run'] else 'Imported'} {result} in {elapsed:.1f}s."
+        if options["dry_run"] and result.error_count:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
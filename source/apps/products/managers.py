@@ -26,6 +26,9 @@ class ProductManager(models.Manager):
     def in_stock(self):
         return self.get_queryset().in_stock()
 
+    def with_total_stock(self):
+        return self.get_queryset().with_total_stock()
+
     def low_stock(self, threshold=10):
         return self.get_queryset().low_stock(threshold)
 
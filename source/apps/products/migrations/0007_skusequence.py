@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:10
+
+from django.db import migrations, models
+
+
+def seed_sku_sequences(apps, schema_editor):
+    """Start every prefix after the highest number existing SKUs already use."""
+    Product = apps.get_model("products", "Product")
+    SKUSequence = apps.get_model("products", "SKUSequence")
+    last_values = {}
+    for sku in Product.objects.exclude(sku=None).values_list("sku", flat=True):
+        for length in range(1, min(5, len(sku) - 1) + 1):
+            prefix, number = sku[:length], sku[length:]
+            if number.isdigit():
+                last_values[prefix] = max(last_values.get(prefix, 0), int(number))
+    SKUSequence.objects.bulk_create(
+        [
+            SKUSequence(prefix=prefix, last_value=value)
+            for prefix, value in last_values.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_alter_product_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SKUSequence",
+            fields=[
+                (
+                    "prefix",
+                    models.CharField(max_length=15, primary_key=True, serialize=False),
+                ),
+                ("last_value", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "SKU Sequence",
+                "verbose_name_plural": "SKU Sequences",
+            },
+        ),
+        migrations.RunPython(seed_sku_sequences, migrations.RunPython.noop),
+    ]
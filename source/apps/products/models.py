@@ -1,4 +1,7 @@
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Substr, Upper
 from django.forms import ValidationError
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
@@ -103,7 +106,7 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
-    objects = ProductManager
+    objects = ProductManager()
 
     class Meta:
         ordering = ["name"]
@@ -114,10 +117,11 @@ class Product(models.Model):
         return f"{self.name}"
 
     def total_stock(self):
-        """Calculate total stock available for this product."""
-        return (
-            self.inventory_records.aggregate(total=models.Sum("quantity"))["total"] or 0
-        )
+        """Total stock available for this product, read from its stock summary."""
+        try:
+            return self.stock_summary.quantity
+        except ObjectDoesNotExist:
+            return 0
 
     def available_in_warehouses(self):
         # Check stock availability across all warehouses
@@ -133,51 +137,80 @@ class Product(models.Model):
         self.is_active = False
         self.save()
 
-    def save(self, *args, **kwargs):
-        # regenerate_sku = False
-
-        # If the product already exists in the database
-        if self.pk and Product.objects.filter(pk=self.pk).exists():
-            old_product = Product.objects.get(pk=self.pk)
-
-            # Check if the name has changed
-            if old_product.name != self.name:
-                self.slug = slugify(self.name)
-                from .utils import BaseSKUGenerator
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored name and SKU so save() can tell what changed
+        # without reading the row again.
+        instance._loaded_name = instance.__dict__.get("name")
+        instance._loaded_sku = instance.__dict__.get("sku")
+        return instance
 
-                sku_generator = BaseSKUGenerator()
-                self.sku = sku_generator.generate_sku(self)
-                # regenerate_sku = True  # Flag that SKU has been regenerated
+    def save(self, *args, **kwargs):
+        from .utils import BaseSKUGenerator
 
-        else:
+        if self._state.adding:
             # First-time creation, generate slug and SKU if not set
             if not self.slug:
                 self.slug = slugify(self.name)
             if not self.sku:
-                from .utils import BaseSKUGenerator
-
-                sku_generator = BaseSKUGenerator()
-                self.sku = sku_generator.generate_sku(self)
+                self.sku = BaseSKUGenerator().generate_sku(self)
+        else:
+            loaded_name = getattr(self, "_loaded_name", None)
+            if loaded_name is None:
+                # Loaded with the name deferred: fetch just that column.
+                loaded_name = (
+                    Product.objects.filter(pk=self.pk)
+                    .values_list("name", flat=True)
+                    .first()
+                )
+            # Check if the name has changed
+            if loaded_name != self.name:
+                self.slug = slugify(self.name)
+                self.sku = BaseSKUGenerator().generate_sku(self)
 
+        sku_changed = self.sku != getattr(self, "_loaded_sku", None)
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        self._loaded_name, self._loaded_sku = self.name, self.sku
 
-        # Update variant SKUs if product SKU changes or for the first time
-        self.update_variant_skus()
+        # A new product has no variants yet; existing ones follow SKU changes.
+        if sku_changed and not adding:
+            self.update_variant_skus()
 
     def update_variant_skus(self):
         """
-        Check and update all variant SKUs to ensure they match the base product SKU.
-        If a variant SKU doesn't follow the 'PRODUCTSKU-R-M' format, it gets updated.
+        Rewrite variant SKUs that do not follow the 'PRODUCTSKU-R-M' format
+        with one UPDATE; blank and missing colours or sizes become '0', as in
+        format_variant_sku.
+        :return: Number of variants updated.
         """
-        for variant in self.variants.all():
-            expected_variant_sku = (
-                f"{self.sku}-{variant.color[:1].upper()}-{variant.size[:1].upper()}"
-            )
+        expected_sku = Concat(
+            Value(f"{self.sku}-"),
+            Coalesce(NullIf(Upper(Substr("color", 1, 1)), Value("")), Value("0")),
+            Value("-"),
+            Coalesce(NullIf(Upper(Substr("size", 1, 1)), Value("")), Value("0")),
+            output_field=models.CharField(),
+        )
+        return (
+            ProductVariant.objects.filter(product=self)
+            .exclude(sku=expected_sku)
+            .update(sku=expected_sku)
+        )
+
+
+class SKUSequence(models.Model):
+    """Last number handed out for a product SKU prefix; see utils.SKUAllocator."""
 
-            if variant.sku != expected_variant_sku:
-                # Update the variant SKU to match the format
-                variant.sku = expected_variant_sku
-                variant.save()
+    prefix = models.CharField(max_length=15, primary_key=True)
+    last_value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "SKU Sequence"
+        verbose_name_plural = "SKU Sequences"
+
+    def __str__(self):
+        return f"{self.prefix} - {self.last_value}"
 
 
 class ProductImages(models.Model):
@@ -212,13 +245,21 @@ class ProductVariant(models.Model):
     def __str__(self):
         return f"{self.product.name} - {self.color} - {self.size}"
 
-    def reserve_stock(self, quantity):
-        """Reserve stock for an order."""
-        if self.stock >= quantity:
-            self.stock -= quantity
-            self.save()
-            return True
-        return False
+    def reserve_stock(self, quantity, cart=None, order=None):
+        """
+        Hold stock of this variant's product for a cart or an order.
+        The hold expires unless it is converted at checkout.
+        :raise: ValueError unless exactly one of cart and order is given.
+        """
+        from source.apps.inventory.services import ReservationService
+
+        if (cart is None) == (order is None):
+            raise ValueError("Exactly one of cart and order is required.")
+        try:
+            ReservationService.reserve({self.product_id: quantity}, cart, order)
+        except ValidationError:
+            return False
+        return True
 
     def delete(self):
         self.is_active = False
@@ -1,5 +1,5 @@
 from django.db import models
-from django.db.models import Sum
+from django.db.models.functions import Coalesce
 
 
 class BrandQuerySet(models.QuerySet):
@@ -22,10 +22,11 @@ class ProductQuerySet(models.QuerySet):
     def in_stock(self):
         return self.filter(inventory_records__status="in_stock").distinct()
 
+    def with_total_stock(self):
+        return self.annotate(total_quantity=Coalesce("stock_summary__quantity", 0))
+
     def low_stock(self, threshold=10):
-        return self.annotate(total_quantity=Sum("inventory_records__quantity")).filter(
-            total_quantity__lt=threshold
-        )
+        return self.with_total_stock().filter(total_quantity__lt=threshold)
 
     def reserved(self):
         return self.filter(inventory_records__status="reserved")
@@ -1,3 +1,5 @@
+from source.layer.helpers.exports import CSVExport
+
 from .models import Product, ProductVariant
 from .utils import BaseSKUGenerator, ProductValidation, VariantSKUGenerator
 
@@ -85,29 +87,42 @@ class StockService:
         return variant.stock >= requested_quantity
 
 
+PRODUCT_EXPORT = CSVExport(
+    "products.csv",
+    [
+        ("Name", "name"),
+        ("SKU", "sku"),
+        ("Category", "category__name"),
+        ("Price", "base_price"),
+    ],
+)
+
+VARIANT_EXPORT = CSVExport(
+    "variants.csv",
+    [
+        ("Product", "product__name"),
+        ("SKU", "sku"),
+        ("Color", "color"),
+        ("Size", "size"),
+        ("Price", "price"),
+        ("Stock", "stock"),
+    ],
+)
+
+
 class CSVExportService:
     """
     Handles exporting products to CSV. Adheres to SRP by focusing on exporting logic.
+    Exports are streamed, so they can be used on querysets of any size.
     """
 
     @staticmethod
     def export_products_to_csv(queryset):
-        import csv
-
-        from django.http import HttpResponse
-
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="products.csv"'
+        return PRODUCT_EXPORT.response(queryset)
 
-        writer = csv.writer(response)
-        writer.writerow(["Name", "SKU", "Category", "Price"])
-
-        for product in queryset:
-            writer.writerow(
-                [product.name, product.sku, product.category.name, product.price]
-            )
-
-        return response
+    @staticmethod
+    def export_variants_to_csv(queryset):
+        return VARIANT_EXPORT.response(queryset)
 
 
 def create_product_with_variants(data):
@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from .models import Category, Product, ProductVariant
+from .utils import format_variant_sku
+
+
+class UpdateVariantSkusTests(TestCase):
+    def test_blank_color_and_size_match_format_variant_sku(self):
+        category = Category.objects.create(name="Phones", slug="phones")
+        product = Product.objects.create(
+            name="Phone",
+            subtitle="Phone",
+            category=category,
+            base_price=100,
+            flag="New",
+            slug="phone",
+            sku="PHONE0001",
+        )
+        # bulk_create skips ProductVariant.save(), which sets the SKU itself.
+        ProductVariant.objects.bulk_create(
+            [
+                ProductVariant(product=product, color="", size="", price=100),
+                ProductVariant(product=product, color=None, size="large", price=100),
+                ProductVariant(product=product, color="red", size=None, price=100),
+            ]
+        )
+
+        product.sku = "PHONE0002"
+        product.save()
+
+        for variant in ProductVariant.objects.filter(product=product):
+            self.assertEqual(
+                variant.sku,
+                format_variant_sku(product.sku, variant.color, variant.size),
+            )
@@ -1,19 +1,60 @@
-import csv
 import logging
 
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.mail import send_mail
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 from django.utils.text import slugify
 
-from source.apps.inventory.models import Warehouse
+from source.layer.helpers.exports import CSVExport
 
-from .models import Product, ProductVariant
+from .models import Product, ProductVariant, SKUSequence
 
 logger = logging.getLogger(__name__)
 
 
+def sku_prefix(name: str) -> str:
+    """SKU prefix of a product name: the first five slug characters, upper-cased."""
+    return slugify(name)[:5].upper()
+
+
+def format_sku(prefix: str, number: int) -> str:
+    return f"{prefix}{str(number).zfill(3)}"
+
+
+def format_variant_sku(base_sku: str, color, size) -> str:
+    """Variant SKU: base SKU plus colour and size initials ('0' when missing)."""
+    color_code = (color[:1] if color else "0").upper()
+    size_code = (size[:1] if size else "0").upper()
+    return f"{base_sku}-{color_code}-{size_code}"
+
+
+class SKUAllocator:
+    """
+    Hands out SKU numbers from per-prefix counters (SKUSequence).
+    A reservation is a single conditional UPDATE of the counter row, so it
+    costs the same however many SKUs share the prefix, and concurrent
+    callers are serialised by the row lock instead of racing on a scan.
+    """
+
+    @staticmethod
+    def allocate(prefix: str, count: int = 1) -> list:
+        """
+        Reserve the next `count` numbers of a prefix.
+        :return: List of reserved numbers in ascending order.
+        """
+        sequence = SKUSequence.objects.filter(pk=prefix)
+        with transaction.atomic():
+            if not sequence.update(last_value=F("last_value") + count):
+                SKUSequence.objects.bulk_create(
+                    [SKUSequence(prefix=prefix)], ignore_conflicts=True
+                )
+                sequence.update(last_value=F("last_value") + count)
+            last = sequence.values_list("last_value", flat=True).get()
+        return list(range(last - count + 1, last + 1))
+
+
 class SKUBase:
     """
     Interface for SKU-related functionality. Provides methods for SKU generation and validation.
@@ -46,23 +87,31 @@ class BaseSKUGenerator(SKUBase):
 
     def generate_base_sku(self, product: Product) -> str:
         """
-        Generate a base SKU using the product slug and an incremental number.
+        Generate a base SKU using the product slug and the next number of its
+        prefix sequence.
         :param product: The product instance.
         :return: SKU string.
         """
-        slug_part = slugify(product.name)[:5].upper()
-        # Find the latest product with the same base slug
-        last_product = (
-            Product.objects.filter(sku__startswith=slug_part).order_by("sku").last()
-        )
+        slug_part = sku_prefix(product.name)
+        (number,) = SKUAllocator.allocate(slug_part)
+        return format_sku(slug_part, number)
 
-        if last_product and last_product.sku[-3:].isdigit():
-            # Increment the numeric part of the SKU
-            last_number = int(last_product.sku[-3:]) + 1
-        else:
-            last_number = 1
-
-        return f"{slug_part}{str(last_number).zfill(3)}"
+    def generate_bulk(self, products) -> list:
+        """
+        Assign SKUs to unsaved products (e.g. before bulk_create), reserving the
+        numbers of each prefix with a single UPDATE.
+        :param products: Product instances; those that already have a SKU are kept.
+        :return: The products.
+        """
+        by_prefix = {}
+        for product in products:
+            if not product.sku:
+                by_prefix.setdefault(sku_prefix(product.name), []).append(product)
+        for slug_part, group in by_prefix.items():
+            numbers = SKUAllocator.allocate(slug_part, len(group))
+            for product, number in zip(group, numbers):
+                product.sku = format_sku(slug_part, number)
+        return products
 
 
 class VariantSKUGenerator(SKUBase):
@@ -78,10 +127,7 @@ class VariantSKUGenerator(SKUBase):
         :param variant: The product variant.
         :return: SKU string for the variant.
         """
-        base_sku = product.sku
-        color_code = (variant.color[:1] if variant.color else "0").upper()
-        size_code = (variant.size[:1] if variant.size else "0").upper()
-        return f"{base_sku}-{color_code}-{size_code}"
+        return format_variant_sku(product.sku, variant.color, variant.size)
 
 
 class ProductValidation:
@@ -250,19 +296,6 @@ def invalidate_variant_cache(variant_id):
     cache.delete(f"variant_{variant_id}")
 
 
-def send_stock_alert(variant):
-    """
-    Send an email alert when stock falls below a threshold.
-    """
-    if variant.stock < 5:
-        send_mail(
-            "Low Stock Alert",
-            f"The variant {variant.sku} is low in stock!",
-            "from@example.com",
-            ["admin@example.com"],
-        )
-
-
 def send_price_change_alert(variant, old_price, new_price):
     """
     Send an email notification when a product variant's price changes.
@@ -276,28 +309,14 @@ def send_price_change_alert(variant, old_price, new_price):
         )
 
 
-def send_bulk_stock_alert(product):
-    """
-    Send a bulk notification when any of the product variants are low in stock.
-    """
-    low_stock_variants = product.variants.filter(stock__lt=5)
-    if low_stock_variants.exists():
-        send_mail(
-            "Bulk Low Stock Alert",
-            f"The following variants of product {product.name} are low in stock: {[v.sku for v in low_stock_variants]}",
-            "from@example.com",
-            ["admin@example.com"],
-        )
-
-
 def update_variant_stock(variant, new_stock):
     """
-    Update the stock for a product variant and send a notification if the stock is low.
+    Update the stock for a product variant.
+    Low-stock alerts are sent as periodic digests by
+    inventory.services.LowStockService, not per save.
     """
     variant.stock = new_stock
     variant.save()
-    if variant.stock < 5:
-        send_stock_alert(variant)
 
 
 def update_variant_price(variant, new_price):
@@ -339,43 +358,51 @@ def generate_warehouse_stock_report(product_id):
 
 def export_product_variants_to_csv(product_id):
     """
-    Export product variants for a specific product to CSV.
+    Export product variants for a specific product to CSV, in the column
+    layout import_product_variants_from_csv() reads.
     """
     product = Product.objects.get(id=product_id)
-    variants = ProductVariant.objects.filter(product=product)
-
-    with open(f"{product.name}_variants.csv", "w", newline="") as csvfile:
-        fieldnames = ["Color", "Size", "Price", "Stock", "Warehouse"]
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for variant in variants:
-            writer.writerow(
-                {
-                    "Color": variant.color,
-                    "Size": variant.size,
-                    "Price": variant.price,
-                    "Stock": variant.stock,
-                    "Warehouse": variant.warehouse.name,
-                }
-            )
+    export = CSVExport(
+        f"{product.name}_variants.csv",
+        [
+            ("Color", "color"),
+            ("Size", "size"),
+            ("Price", "price"),
+            ("Stock", "stock"),
+        ],
+    )
+    with open(export.filename, "w", newline="") as csvfile:
+        export.write(ProductVariant.objects.filter(product=product), csvfile)
 
 
 def import_product_variants_from_csv(product_id, csv_file):
     """
     Import product variants from CSV for a specific product.
+    Columns: Color, Size, Price, Stock and optionally Warehouse, whose stock
+    is added up into the product's inventory level there.
+    :return: ImportResult of the bulk catalog importer.
     """
+    from .importer import CatalogImporter, read_catalog
+
     product = Product.objects.get(id=product_id)
-    reader = csv.DictReader(csv_file)
-    for row in reader:
-        warehouse = Warehouse.objects.get(name=row["Warehouse"])
-        ProductVariant.objects.create(
-            product=product,
-            color=row["Color"],
-            size=row["Size"],
-            price=row["Price"],
-            stock=row["Stock"],
-            warehouse=warehouse,
+    rows = (
+        (
+            line_no,
+            {
+                "sku": product.sku,
+                "color": row.get("color"),
+                "size": row.get("size"),
+                "variant_price": row.get("price"),
+                "stock": row.get("stock"),
+                "warehouse": row.get("warehouse"),
+            },
         )
+        for line_no, row in read_catalog(csv_file)
+    )
+    importer = CatalogImporter(update_existing=False)
+    for _ in importer.run(rows):
+        pass
+    return importer.result
 
 
 def search_variants_by_attributes(product, color=None, size=None, price_range=None):
@@ -1,9 +1,13 @@
 from rest_framework import viewsets
 
+from source.layer.helpers.views import EagerLoadingMixin
+
 from .models import Product
 from .serializers import ProductSerializer
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    select_related = ("category", "brand")
+    prefetch_related = ("tags",)
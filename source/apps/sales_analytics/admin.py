@@ -1,7 +1,11 @@
+from datetime import timedelta
+
 from django.contrib import admin
 from django.db.models import Sum
+from django.utils import timezone
 
 from .models import SalesByCustomerSegment, SalesByProduct, SalesReport
+from .services import SalesReportService
 
 
 class SalesByProductInline(admin.TabularInline):
@@ -42,7 +46,14 @@ class SalesReportAdmin(admin.ModelAdmin):
     actions = ["generate_monthly_report", "export_sales_data"]
 
     def generate_monthly_report(self, request, queryset):
-        self.message_user(request, "Monthly report generation is in progress.")
+        """Rebuild the daily reports of each selected report's month."""
+        today = timezone.localdate()
+        months = {report.report_date.replace(day=1) for report in queryset}
+        built = 0
+        for start in sorted(months):
+            end = (start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            built += len(SalesReportService.build_range(start, min(end, today)))
+        self.message_user(request, f"Rebuilt {built} daily sales reports.")
 
     generate_monthly_report.short_description = "Generate Monthly Sales Report"
 
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from .models import OrderFact
+
+# Orders synced per round of queries.
+FACT_SYNC_CHUNK_SIZE = 2000
+
+
+class OrderFactStream:
+    """
+    Keeps the append-only OrderFact stream in step with orders.
+    sync() compares what the facts of some orders add up to with what those
+    orders currently contribute to sales (their items, less any payment
+    discount, if the order is paid and not canceled, nothing otherwise) and
+    appends the difference. Paying
+    an order appends its items; refunding or canceling it appends the
+    negated rows; syncing an unchanged order appends nothing.
+    """
+
+    @staticmethod
+    def sync(order_ids):
+        """
+        Append the fact rows needed to bring the given orders up to date,
+        with two reads and one bulk insert per chunk.
+        :return: Number of fact rows appended.
+        """
+        order_ids = sorted(set(order_ids))
+        appended = 0
+        for start in range(0, len(order_ids), FACT_SYNC_CHUNK_SIZE):
+            end = start + FACT_SYNC_CHUNK_SIZE
+            chunk = order_ids[start:end]
+            facts = OrderFactStream._diff(
+                OrderFactStream._current(chunk), OrderFactStream._recorded(chunk)
+            )
+            appended += len(OrderFact.objects.bulk_create(facts, batch_size=1000))
+        return appended
+
+    @staticmethod
+    def backfill():
+        """Sync every order; only orders whose facts are missing or stale append rows."""
+        from source.apps.orders.models import Order
+
+        return OrderFactStream.sync(
+            Order.objects.order_by().values_list("pk", flat=True).iterator()
+        )
+
+    @staticmethod
+    def _current(order_ids):
+        """What the orders contribute now, keyed like _recorded()."""
+        from source.apps.orders.models import Order
+
+        from .services import customer_segment, sale_filter
+
+        totals = defaultdict(lambda: [0, Decimal("0.00"), 0])
+        orders = (
+            Order.objects.filter(sale_filter(), pk__in=order_ids)
+            .annotate(day=TruncDate("order_date"), segment=customer_segment())
+            .values(
+                "pk",
+                "day",
+                "customer_id",
+                "segment",
+                "discount_amount",
+                "items__product_id",
+            )
+            .annotate(quantity=Sum("items__quantity"), amount=Sum("items__total_price"))
+            .order_by("pk", "items__product_id")
+        )
+        counted = set()
+        for row in orders:
+            key = (
+                row["pk"],
+                row["items__product_id"],
+                row["day"],
+                row["customer_id"],
+                row["segment"],
+            )
+            totals[key][0] += row["quantity"] or 0
+            totals[key][1] += Decimal(row["amount"] or 0)
+            # The order itself is counted once, on its first product, and its
+            # payment discount is an order-level row without a product.
+            if row["pk"] not in counted:
+                counted.add(row["pk"])
+                totals[key][2] = 1
+                if row["discount_amount"]:
+                    totals[(row["pk"], None, *key[2:])][1] -= row["discount_amount"]
+        return totals
+
+    @staticmethod
+    def _recorded(order_ids):
+        """Net quantity, amount and order count of the facts per order line."""
+        rows = (
+            OrderFact.objects.filter(order_id__in=order_ids)
+            .values("order_id", "product_id", "day", "customer_id", "segment")
+            .annotate(
+                net_quantity=Sum("quantity"),
+                net_amount=Sum("amount"),
+                net_orders=Sum("order_count"),
+            )
+            .order_by()
+        )
+        return {
+            (
+                row["order_id"],
+                row["product_id"],
+                row["day"],
+                row["customer_id"],
+                row["segment"],
+            ): [row["net_quantity"], Decimal(row["net_amount"]), row["net_orders"]]
+            for row in rows
+        }
+
+    @staticmethod
+    def _diff(current, recorded):
+        facts = []
+        cent = Decimal("0.01")
+        for key in current.keys() | recorded.keys():
+            now = current.get(key, (0, Decimal("0.00"), 0))
+            before = recorded.get(key, (0, Decimal("0.00"), 0))
+            quantity = now[0] - before[0]
+            amount = (now[1] - before[1]).quantize(cent)
+            orders = now[2] - before[2]
+            if not (quantity or amount or orders):
+                continue
+            order_id, product_id, day, customer_id, segment = key
+            facts.append(
+                OrderFact(
+                    order_id=order_id,
+                    product_id=product_id,
+                    day=day,
+                    customer_id=customer_id,
+                    segment=segment,
+                    quantity=quantity,
+                    amount=amount,
+                    order_count=orders,
+                )
+            )
+        return facts
+
+
+def fact_totals(days):
+    """
+    Net sales per day, product and segment from the facts of the given days.
+    :return: (totals, by_product, segments) as taken by SalesReportService.store().
+    """
+    facts = OrderFact.objects.filter(day__in=days).order_by()
+    totals = {
+        row["day"]: row
+        for row in facts.values("day").annotate(
+            sales=Sum("amount"), orders=Sum("order_count")
+        )
+    }
+    customers = defaultdict(int)
+    for row in (
+        facts.values("day", "customer_id")
+        .annotate(net_orders=Sum("order_count"))
+        .filter(net_orders__gt=0)
+    ):
+        customers[row["day"]] += 1
+    for day, row in totals.items():
+        row["customers"] = customers[day]
+    by_product = defaultdict(list)
+    for row in (
+        facts.filter(product__isnull=False)
+        .values("day", "product_id")
+        .annotate(units=Sum("quantity"), revenue=Sum("amount"))
+        .filter(units__gt=0)
+    ):
+        by_product[row["day"]].append(row)
+    segments = (
+        facts.values("day", "segment")
+        .annotate(sales=Sum("amount"), orders=Sum("order_count"))
+        .filter(orders__gt=0)
+    )
+    return totals, by_product, list(segments)
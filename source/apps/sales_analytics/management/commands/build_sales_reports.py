@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from source.apps.sales_analytics.services import SalesReportService
+
+
+class Command(BaseCommand):
+    help = (
+        "Build the daily sales reports for a day (default yesterday) or "
+        "backfill a date range, replacing reports already stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="Day to build (YYYY-MM-DD).")
+        parser.add_argument("--start", help="First day of a backfill (YYYY-MM-DD).")
+        parser.add_argument(
+            "--end", help="Last day of a backfill (YYYY-MM-DD); defaults to yesterday."
+        )
+
+    def handle(self, *args, **options):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        start = self.parse(options["date"] or options["start"]) or yesterday
+        end = self.parse(options["date"] or options["end"]) or yesterday
+        if start > end:
+            raise CommandError("The start date must not be after the end date.")
+        reports = SalesReportService.build_range(start, end)
+        total = sum(report.total_sales for report in reports)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Built {len(reports)} sales reports from {start} to {end} "
+                f"({total} total sales)."
+            )
+        )
+
+    def parse(self, value):
+        if value is None:
+            return None
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date {value!r}; use YYYY-MM-DD.")
+        return day
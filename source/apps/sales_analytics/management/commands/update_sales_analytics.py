@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from source.apps.sales_analytics.facts import OrderFactStream
+from source.apps.sales_analytics.services import (
+    FACT_COMMIT_LAG,
+    WATERMARK,
+    SalesAggregator,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the order facts appended since the last run into the daily "
+        "sales reports, rebuilding only the days they touch."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backfill",
+            action="store_true",
+            help="Sync the facts of every order first (after imports or on first use).",
+        )
+        parser.add_argument(
+            "--lag",
+            type=int,
+            default=int(FACT_COMMIT_LAG.total_seconds()),
+            help="Seconds before the watermark to look again for facts whose "
+            "transaction committed late.",
+        )
+        parser.add_argument("--watermark", default=WATERMARK)
+
+    def handle(self, *args, **options):
+        if options["backfill"]:
+            appended = OrderFactStream.backfill()
+            self.stdout.write(f"Backfill appended {appended} order facts.")
+        reports = SalesAggregator.advance(
+            options["watermark"], timedelta(seconds=options["lag"])
+        )
+        days = ", ".join(str(report.report_date) for report in reports)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {len(reports)} sales reports"
+                + (f": {days}." if days else ".")
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:29
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales_analytics", "0002_alter_salesbyproduct_product_and_more"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="salesreport",
+            name="report_date",
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+    ]
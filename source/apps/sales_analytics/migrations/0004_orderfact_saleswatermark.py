@@ -0,0 +1,88 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("orders", "0010_query_indexes"),
+        ("products", "0007_skusequence"),
+        ("sales_analytics", "0003_salesreport_report_date"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SalesWatermark",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("last_fact_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Sales Watermark",
+                "verbose_name_plural": "Sales Watermarks",
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderFact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("segment", models.CharField(max_length=100)),
+                ("quantity", models.IntegerField()),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("order_count", models.SmallIntegerField(default=0)),
+                ("recorded_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="customers.customer",
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="orders.order",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Order Fact",
+                "verbose_name_plural": "Order Facts",
+                "indexes": [
+                    models.Index(fields=["day"], name="order_fact_day_idx"),
+                    models.Index(fields=["order"], name="order_fact_order_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("orders", "0010_query_indexes"),
+        ("products", "0007_skusequence"),
+        ("sales_analytics", "0004_orderfact_saleswatermark"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="saleswatermark",
+            name="last_fact_id",
+        ),
+        migrations.AddField(
+            model_name="saleswatermark",
+            name="folded_until",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="orderfact",
+            index=models.Index(fields=["recorded_at"], name="order_fact_recorded_idx"),
+        ),
+    ]
@@ -1,10 +1,12 @@
 from django.db import models
+from django.utils import timezone
 
 from source.apps.products.models import Product
 
 
 class SalesReport(models.Model):
-    report_date = models.DateField(auto_now_add=True)
+    # One report per day, written by SalesReportService.
+    report_date = models.DateField(default=timezone.localdate)
     total_sales = models.DecimalField(max_digits=10, decimal_places=2)
     total_orders = models.PositiveIntegerField()
     total_customers = models.PositiveIntegerField()
@@ -94,3 +96,70 @@ class SalesByCustomerSegment(models.Model):
 
     def __str__(self):
         return f"{self.segment} Segment Sales"
+
+
+class OrderFact(models.Model):
+    """
+    Append-only sales fact: one row per order item, plus a product-less row
+    for a payment discount, each time its order's sales figures change (see
+    sales_analytics.facts). Corrections are appended as negated rows, so
+    summing the facts of a day gives its current sales.
+    """
+
+    day = models.DateField()
+    order = models.ForeignKey(
+        "orders.Order",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    # Null for an order without items, which still counts as one order, and
+    # for the row carrying an order's payment discount.
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name="+",
+    )
+    customer = models.ForeignKey(
+        "customers.Customer",
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+",
+    )
+    segment = models.CharField(max_length=100)
+    quantity = models.IntegerField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    order_count = models.SmallIntegerField(default=0)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Order Fact"
+        verbose_name_plural = "Order Facts"
+        indexes = [
+            models.Index(fields=["day"], name="order_fact_day_idx"),
+            models.Index(fields=["order"], name="order_fact_order_idx"),
+            models.Index(fields=["recorded_at"], name="order_fact_recorded_idx"),
+        ]
+
+    def __str__(self):
+        return (
+            f"Order {self.order_id} on {self.day}: {self.quantity} x {self.product_id}"
+        )
+
+
+class SalesWatermark(models.Model):
+    """How far SalesAggregator has folded the OrderFact stream (by recorded_at)."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    # Start of the last run; facts recorded since (minus the lag) are unfolded.
+    folded_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sales Watermark"
+        verbose_name_plural = "Sales Watermarks"
+
+    def __str__(self):
+        return f"{self.name}: {self.folded_until}"
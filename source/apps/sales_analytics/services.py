@@ -0,0 +1,203 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, CharField, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from source.apps.orders.models import Order
+
+from .facts import OrderFactStream, fact_totals
+from .models import (
+    OrderFact,
+    SalesByCustomerSegment,
+    SalesByProduct,
+    SalesReport,
+    SalesWatermark,
+)
+
+CENT = Decimal("0.01")
+
+# Watermark of the nightly SalesAggregator run.
+WATERMARK = "sales_reports"
+
+# Longest a transaction appending facts may stay open; each aggregator run
+# looks this far back past its watermark again.
+FACT_COMMIT_LAG = timedelta(minutes=10)
+
+
+def money(value):
+    # SQLite sums decimals as floats; round back to cents.
+    return Decimal(value or 0).quantize(CENT)
+
+
+def sale_filter(prefix=""):
+    """Orders that count as sales: paid and not canceled."""
+    return Q(**{f"{prefix}payment_status": "paid"}) & ~Q(
+        **{f"{prefix}status": "canceled"}
+    )
+
+
+def customer_segment(prefix=""):
+    """
+    Expression naming the customer's sales segment: the loyalty tier, else
+    "member" for loyalty members without a program, else "regular".
+    """
+    return Coalesce(
+        f"{prefix}customer__loyalty_program__tier",
+        Case(
+            When(
+                **{f"{prefix}customer__is_loyalty_member": True}, then=Value("member")
+            ),
+            default=Value("regular"),
+        ),
+        output_field=CharField(),
+    )
+
+
+def day_bounds(start, end):
+    """Aware datetimes spanning the local days start..end (inclusive)."""
+    lower = timezone.make_aware(datetime.combine(start, time.min))
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return lower, upper
+
+
+class SalesReportService:
+    @staticmethod
+    def build(day):
+        """
+        Compute and store the sales report of one day.
+        :return: The SalesReport, or None if the day has no order facts.
+        """
+        reports = SalesReportService.build_range(day, day)
+        return reports[0] if reports else None
+
+    @staticmethod
+    def build_range(start, end):
+        """
+        Compute the sales reports of every day from start to end (inclusive)
+        from the order facts of those days, as SalesAggregator does, and
+        replace the stored reports of those days with bulk inserts. The facts
+        of the range's orders are synced first, so the reports follow the
+        orders even where the stream is missing or stale.
+        Days without facts get no report, as with SalesAggregator.
+        :return: The new SalesReport instances, oldest first.
+        """
+        lower, upper = day_bounds(start, end)
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        # Orders placed in the range, and those whose facts are still there.
+        order_ids = set(
+            Order.objects.filter(order_date__gte=lower, order_date__lt=upper)
+            .order_by()
+            .values_list("pk", flat=True)
+        )
+        order_ids.update(
+            OrderFact.objects.filter(day__in=days)
+            .order_by()
+            .values_list("order_id", flat=True)
+            .distinct()
+        )
+        with transaction.atomic():
+            OrderFactStream.sync(order_ids)
+            return SalesReportService.store(days, *fact_totals(days))
+
+    @staticmethod
+    def store(days, totals, by_product, segments):
+        """
+        Replace the reports of the given days with new ones, written with bulk
+        inserts in one transaction. Days missing from totals only lose their
+        stored report.
+        :param totals: Day -> dict with sales, orders and customers.
+        :param by_product: Day -> list of dicts with product_id, units, revenue.
+        :param segments: Dicts with day, segment, sales and orders.
+        :return: The new SalesReport instances in the order of days.
+        """
+        reports = []
+        for day in days:
+            total = totals.get(day)
+            if total is None:
+                continue
+            best = max(
+                by_product.get(day, []),
+                key=lambda row: (row["units"], row["revenue"], -row["product_id"]),
+                default=None,
+            )
+            report = SalesReport(
+                report_date=day,
+                total_sales=money(total["sales"]),
+                total_orders=total["orders"],
+                total_customers=total["customers"],
+                average_order_value=money(
+                    total["sales"] / total["orders"] if total["orders"] else 0
+                ),
+                highest_selling_product_id=best and best["product_id"],
+            )
+            reports.append(report)
+
+        with transaction.atomic():
+            SalesReport.objects.filter(report_date__in=days).delete()
+            reports = SalesReport.objects.bulk_create(reports)
+            report_for = {report.report_date: report for report in reports}
+            SalesByProduct.objects.bulk_create(
+                [
+                    SalesByProduct(
+                        report=report_for[day],
+                        product_id=row["product_id"],
+                        total_units_sold=row["units"],
+                        total_revenue=money(row["revenue"]),
+                    )
+                    for day, rows in by_product.items()
+                    for row in rows
+                ],
+                batch_size=1000,
+            )
+            SalesByCustomerSegment.objects.bulk_create(
+                [
+                    SalesByCustomerSegment(
+                        report=report_for[row["day"]],
+                        segment=row["segment"],
+                        total_sales=money(row["sales"]),
+                        total_orders=row["orders"],
+                    )
+                    for row in segments
+                ]
+            )
+        return reports
+
+
+class SalesAggregator:
+    @staticmethod
+    def advance(name=WATERMARK, lag=FACT_COMMIT_LAG):
+        """
+        Fold the order facts recorded since the last run into the sales
+        reports: only the days those facts belong to are recomputed, from
+        the facts of those days, and the watermark moves to the start of
+        this run in the same transaction. Cost follows the volume of the
+        affected days, not the size of the order history.
+        :param lag: How far before the watermark to look again. recorded_at
+            is stamped at insert, not at commit, so a fact whose transaction
+            commits within `lag` of the insert is folded by the next run even
+            if later facts were folded first. Days are rebuilt from all their
+            facts, so folding a fact twice is harmless.
+        :return: The rebuilt SalesReport instances.
+        """
+        started = timezone.now()
+        with transaction.atomic():
+            watermark = SalesAggregator.watermark(name)
+            facts = OrderFact.objects.order_by()
+            if watermark.folded_until is not None:
+                facts = facts.filter(recorded_at__gte=watermark.folded_until - lag)
+            days = sorted(facts.values_list("day", flat=True).distinct())
+            reports = SalesReportService.store(days, *fact_totals(days)) if days else []
+            watermark.folded_until = started
+            watermark.save(update_fields=["folded_until", "updated_at"])
+        return reports
+
+    @staticmethod
+    def watermark(name=WATERMARK):
+        """Lock and return the watermark row, creating it on first use."""
+        SalesWatermark.objects.bulk_create(
+            [SalesWatermark(name=name)], ignore_conflicts=True
+        )
+        return SalesWatermark.objects.select_for_update().get(name=name)
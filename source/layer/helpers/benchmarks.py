@@ -0,0 +1,277 @@
+import platform
+import statistics
+import subprocess
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework.test import APIRequestFactory
+
+from .profiling import percentile, profile_queries
+from .testing import allow_test_host
+
+# Lines per cart, adjustment batch and transfer batch.
+BENCHMARK_BATCH = 20
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Register a benchmark. The function receives the BenchmarkData, prepares
+    what it needs and returns the zero-argument callable that is timed.
+    """
+
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+class _Rollback(Exception):
+    pass
+
+
+class BenchmarkData:
+    """Rows of the current database the benchmarks operate on."""
+
+    def __init__(self):
+        from source.apps.customers.models import Customer
+        from source.apps.inventory.models import InventoryItem, Warehouse
+        from source.apps.orders.models import RepairOrder
+
+        self.customer = Customer.objects.order_by("pk").first()
+        shops = RepairOrder.objects.values("shop")
+        warehouses = list(Warehouse.objects.exclude(pk__in=shops).order_by("pk")[:2])
+        if self.customer is None or len(warehouses) < 2:
+            raise ValueError("No dataset to benchmark; run generate_dataset first.")
+        self.source, self.target = warehouses
+        # Well-stocked products held by both transfer warehouses.
+        self.items = list(
+            InventoryItem.objects.filter(location=self.source, quantity__gte=100)
+            .filter(product__inventory_records__location=self.target)
+            .select_related("product")
+            .order_by("pk")[:BENCHMARK_BATCH]
+        )
+        self.user = self.source.manager
+
+    @property
+    def products(self):
+        return [item.product for item in self.items]
+
+
+@benchmark("checkout")
+def checkout(data):
+    from source.apps.carts.models import Cart, CartItem
+
+    cart = Cart.objects.create(customer=data.customer)
+    CartItem.objects.bulk_create(
+        CartItem(
+            cart=cart,
+            product=product,
+            quantity=1,
+            price_per_item=product.base_price,
+            total_price=product.base_price,
+        )
+        for product in data.products
+    )
+    cart.calculate_totals()
+    return lambda: cart.checkout("Benchmark Street 1")
+
+
+@benchmark("stock_adjustment")
+def stock_adjustment(data):
+    from source.apps.inventory.services import StockAdjustmentService
+
+    rows = [
+        {
+            "product_id": item.product_id,
+            "warehouse_id": item.location_id,
+            "adjustment_type": "remove",
+            "quantity": 1,
+            "reason": "Benchmark",
+        }
+        for item in data.items
+    ]
+    return lambda: StockAdjustmentService.bulk_adjust(rows, user=data.user)
+
+
+@benchmark("transfer")
+def transfer(data):
+    from source.apps.inventory.services import TransferService
+
+    lines = [(product, 1) for product in data.products]
+    return lambda: TransferService.transfer_batch(
+        data.source, data.target, lines, user=data.user
+    )
+
+
+@benchmark("daily_repair_report")
+def daily_repair_report(data):
+    from source.apps.orders.services import RepairCalculationService
+    from source.apps.orders.utils import daily_totals_cache_key
+
+    # Measure the computation, not the cached result.
+    cache.delete(daily_totals_cache_key(None, timezone.localdate()))
+    return RepairCalculationService.calculate_daily_totals
+
+
+@benchmark("repair_report_30d")
+def repair_report_30d(data):
+    from source.apps.orders.services import RepairRollupService
+
+    end = timezone.localdate()
+    return lambda: RepairRollupService.report(end - timedelta(days=29), end)
+
+
+@benchmark("sales_report_30d")
+def sales_report_30d(data):
+    from source.apps.orders.services import ReportingService
+
+    end = timezone.now()
+    return lambda: ReportingService.generate_sales_report(end - timedelta(days=30), end)
+
+
+@benchmark("build_sales_reports_30d")
+def build_sales_reports_30d(data):
+    from source.apps.sales_analytics.services import SalesReportService
+
+    end = timezone.localdate()
+    return lambda: SalesReportService.build_range(end - timedelta(days=29), end)
+
+
+@benchmark("advance_sales_reports")
+def advance_sales_reports(data):
+    from source.apps.orders.models import Order
+    from source.apps.sales_analytics.services import SalesAggregator
+
+    # Catch up, then pay a batch of orders: the run folds only their facts.
+    SalesAggregator.advance(lag=timedelta(0))
+    pending = Order.objects.exclude(payment_status="paid").order_by("pk")
+    Order.objects.filter(
+        pk__in=list(pending.values_list("pk", flat=True)[:BENCHMARK_BATCH])
+    ).update(payment_status="paid")
+    return lambda: SalesAggregator.advance(lag=timedelta(0))
+
+
+def list_endpoint(name, viewset_path):
+    """Register a benchmark rendering the first page of a viewset's list action."""
+
+    @benchmark(name)
+    def run(data):
+        view = import_string(viewset_path).as_view({"get": "list"})
+        request = APIRequestFactory().get("/")
+
+        def render():
+            # Pagination links resolve the factory's "testserver" host.
+            with allow_test_host():
+                return view(request).render()
+
+        return render
+
+    return run
+
+
+list_endpoint("api_products", "source.apps.products.views.ProductViewSet")
+list_endpoint("api_inventory_items", "source.apps.inventory.views.InventoryItemViewSet")
+list_endpoint(
+    "api_stock_adjustments", "source.apps.inventory.views.StockAdjustmentViewSet"
+)
+list_endpoint("api_transfers", "source.apps.inventory.views.InventoryTransferViewSet")
+
+
+def run_benchmark(name, data, repeat):
+    """
+    Time one benchmark `repeat` times, each in its own rolled-back transaction
+    so runs see the same data.
+    :return: Dict of run count, timing statistics in ms and query count.
+    """
+    timings, queries = [], []
+    for _ in range(repeat):
+        try:
+            with transaction.atomic():
+                action = BENCHMARKS[name](data)
+                with profile_queries() as profile:
+                    action()
+                raise _Rollback
+        except _Rollback:
+            pass
+        timings.append(profile.wall_ms)
+        queries.append(profile.query_count)
+    return {
+        "runs": repeat,
+        "ms_min": round(min(timings), 2),
+        "ms_median": round(statistics.median(timings), 2),
+        "ms_p95": round(percentile(timings, 95), 2),
+        "ms_mean": round(statistics.fmean(timings), 2),
+        "queries": max(queries),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_size():
+    from source.apps.inventory.models import InventoryItem
+    from source.apps.orders.models import Order, OrderItem, RepairOrder
+    from source.apps.products.models import Product
+
+    return {
+        model._meta.label: model.objects.count()
+        for model in (Order, OrderItem, RepairOrder, Product, InventoryItem)
+    }
+
+
+def run_benchmarks(names=None, repeat=10, warmup=1):
+    """
+    Run the registered benchmarks against the current database. A benchmark
+    that raises is reported with an "error" entry; the others still run.
+    :return: JSON-serialisable results with environment and dataset details.
+    """
+    data = BenchmarkData()
+    results = {}
+    for name in names or BENCHMARKS:
+        try:
+            if warmup:
+                run_benchmark(name, data, warmup)
+            results[name] = run_benchmark(name, data, repeat)
+        except Exception as exc:
+            results[name] = {"error": f"{type(exc).__name__}: {exc}"}
+    return {
+        "revision": git_revision(),
+        "created_at": timezone.now().isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "dataset": dataset_size(),
+        "results": results,
+    }
+
+
+def compare(baseline, current):
+    """
+    :return: List of (name, baseline median, current median, change in %)
+        for benchmarks that succeeded in both result sets.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before and "error" not in before and "error" not in result:
+            change = (result["ms_median"] / before["ms_median"] - 1) * 100
+            rows.append((name, before["ms_median"], result["ms_median"], change))
+    return rows
@@ -0,0 +1,33 @@
+from .profiling import (
+    check_budget,
+    profile_queries,
+    profiling_settings,
+    request_profiles,
+    route_name,
+)
+
+
+class QueryProfilingMiddleware:
+    """
+    Record query count, repeated statements, DB time and wall time of each
+    request into the per-route rolling summary, and check the route's budget.
+    Configured by settings.REQUEST_PROFILING; place it first so the queries
+    of the other middleware are counted too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        conf = profiling_settings()
+        if not conf["ENABLED"]:
+            return self.get_response(request)
+        with profile_queries() as profile:
+            response = self.get_response(request)
+            # Render lazy responses inside the profile; their templates query too.
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+        profile.route = route_name(request)
+        request_profiles.add(profile, conf["WINDOW"], conf["DUPLICATE_THRESHOLD"])
+        check_budget(profile, conf)
+        return response
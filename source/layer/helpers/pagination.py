@@ -0,0 +1,137 @@
+import json
+from base64 import b64decode, b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset pagination over an indexed ordering.
+    The cursor holds every ordering field of the row it points at, so each
+    page is read with WHERE (field, id) > (value, last id) ... LIMIT instead
+    of OFFSET: page 1000 costs the same as page 1, and rows sharing a
+    timestamp (bulk writes stamp whole batches with one) are neither
+    skipped nor repeated. Views pick the key with `cursor_ordering`; it
+    should match a (field, id) index, its fields must be non-null model
+    columns, and an id is appended when missing so the key is unique.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    ordering = "-id"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "cursor_ordering", self.ordering)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering += ("-id" if ordering[0].startswith("-") else "id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        ordering = [self._flip(field) for field in self.ordering] if reverse else []
+        queryset = queryset.order_by(*(ordering or self.ordering))
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(
+                    self._after(ordering or self.ordering, self.cursor.position)
+                )
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        # One extra row tells whether another page follows.
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # An empty page before the cursor: the next page is the first one.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=False, position=self._position(self.page[-1]))
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(
+            Cursor(offset=0, reverse=True, position=self._position(self.page[0]))
+        )
+
+    def decode_cursor(self, request):
+        """
+        :return: Cursor whose position lists a value per ordering field, or None.
+        :raise NotFound: If the cursor is malformed.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            data = json.loads(b64decode(encoded.encode("ascii")).decode("utf-8"))
+            reverse, position = bool(data["r"]), list(data["p"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        # Datetimes are written in full (str keeps microseconds) so equal
+        # timestamps compare equal when the cursor is read back.
+        data = json.dumps(
+            {"r": int(cursor.reverse), "p": cursor.position},
+            default=str,
+            separators=(",", ":"),
+        )
+        encoded = b64encode(data.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _position(self, instance):
+        return [getattr(instance, field.lstrip("-")) for field in self.ordering]
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    @staticmethod
+    def _after(ordering, position):
+        """
+        Filter for the rows strictly after `position` in `ordering`, written
+        as `a >= x AND (a > x OR (a = x AND ...))` so the leading range can
+        use the index.
+        """
+        (field, *fields), (value, *values) = ordering, position
+        name = field.lstrip("-")
+        beyond = "lt" if field.startswith("-") else "gt"
+        if not fields:
+            return Q(**{f"{name}__{beyond}": value})
+        return Q(**{f"{name}__{beyond}e": value}) & (
+            Q(**{f"{name}__{beyond}": value})
+            | (Q(**{name: value}) & KeysetPagination._after(fields, values))
+        )
@@ -0,0 +1,218 @@
+import logging
+import math
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Record every request through QueryProfilingMiddleware.
+    "ENABLED": False,
+    # Requests kept per route for the rolling percentiles.
+    "WINDOW": 500,
+    # The same SQL this many times in one request is reported as an N+1.
+    "DUPLICATE_THRESHOLD": 3,
+    # Route name -> limits, e.g. {"order_detail": {"queries": 12}}; the key
+    # "*" applies to routes without their own entry. See BUDGET_METRICS.
+    "BUDGETS": {},
+    # Raise BudgetExceeded instead of logging a warning (for tests).
+    "ENFORCE_BUDGETS": False,
+}
+
+# Budget keys and the RequestProfile attribute each one limits.
+BUDGET_METRICS = {
+    "queries": "query_count",
+    "duplicates": "duplicate_count",
+    "db_ms": "db_ms",
+    "wall_ms": "wall_ms",
+}
+
+PERCENTILES = (50, 95, 99)
+
+# Route recorded for requests that matched no URL pattern.
+UNRESOLVED_ROUTE = "<unresolved>"
+
+
+def profiling_settings():
+    return {**DEFAULTS, **getattr(settings, "REQUEST_PROFILING", {})}
+
+
+class BudgetExceeded(AssertionError):
+    pass
+
+
+class RequestProfile:
+    """SQL statements and timings of one request (or any profiled block)."""
+
+    def __init__(self, route=None):
+        self.route = route
+        self.queries = []
+        self.wall_ms = 0.0
+
+    def record(self, sql, duration):
+        self.queries.append((sql, duration))
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def db_ms(self):
+        return sum(duration for _, duration in self.queries) * 1000
+
+    def duplicates(self, threshold=2):
+        """
+        Statements repeated at least `threshold` times. Parameters are not part
+        of the SQL text, so one query per row of a list shows up here.
+        :return: List of (sql, count), most repeated first.
+        """
+        counts = Counter(sql for sql, _ in self.queries)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+    @property
+    def duplicate_count(self):
+        """Executions that repeated an earlier statement of the same request."""
+        return self.query_count - len({sql for sql, _ in self.queries})
+
+    def over_budget(self, budget):
+        """
+        Compare against limits keyed like BUDGET_METRICS.
+        :return: List of violation messages, empty when within budget.
+        """
+        violations = []
+        for key, limit in budget.items():
+            value = getattr(self, BUDGET_METRICS[key])
+            if value > limit:
+                violations.append(f"{key} {value:.0f} > {limit}")
+        return violations
+
+    def __str__(self):
+        return (
+            f"{self.route or 'block'}: {self.query_count} queries "
+            f"({self.duplicate_count} repeated), {self.db_ms:.1f}ms db, "
+            f"{self.wall_ms:.1f}ms total"
+        )
+
+
+@contextmanager
+def profile_queries(route=None):
+    """
+    Record the SQL run on every database connection inside the block.
+    Works with DEBUG off; statements are timed by an execute wrapper.
+    :return: RequestProfile, complete once the block exits.
+    """
+    profile = RequestProfile(route)
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile.record(sql, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        try:
+            yield profile
+        finally:
+            profile.wall_ms = (time.perf_counter() - started) * 1000
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+class RequestProfileStore:
+    """
+    Rolling per-route samples of this process's profiled requests.
+    Each route keeps its last `window` requests plus a tally of the repeated
+    statements seen, so summary() can report p50/p95/p99 and N+1 suspects.
+    """
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def add(self, profile, window, threshold):
+        sample = tuple(getattr(profile, attr) for attr in BUDGET_METRICS.values())
+        with self._lock:
+            samples, repeated = self._routes.setdefault(
+                profile.route, (deque(maxlen=window), Counter())
+            )
+            samples.append(sample)
+            for sql, count in profile.duplicates(threshold):
+                repeated[sql] = max(repeated[sql], count)
+
+    def summary(self):
+        """
+        :return: List of dicts per route, busiest first, with `requests`,
+            `<metric>_p50/_p95/_p99` for each BUDGET_METRICS key, and
+            `n_plus_one` as (sql, most repeats in one request) pairs.
+        """
+        with self._lock:
+            routes = {
+                route: (list(samples), repeated.most_common(5))
+                for route, (samples, repeated) in self._routes.items()
+            }
+        rows = []
+        for route, (samples, repeated) in routes.items():
+            row = {"route": route, "requests": len(samples)}
+            for index, metric in enumerate(BUDGET_METRICS):
+                values = [sample[index] for sample in samples]
+                for pct in PERCENTILES:
+                    row[f"{metric}_p{pct}"] = round(percentile(values, pct), 1)
+            row["n_plus_one"] = repeated
+            rows.append(row)
+        return sorted(rows, key=lambda row: -row["requests"])
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+request_profiles = RequestProfileStore()
+
+
+def route_name(request):
+    """
+    URL name of the resolved view (e.g. "admin:orders_repairorder_changelist").
+    Unresolved requests (404s, scanners) share UNRESOLVED_ROUTE so arbitrary
+    paths cannot grow the store.
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return UNRESOLVED_ROUTE
+    return match.view_name or match.route
+
+
+def check_budget(profile, conf=None):
+    """
+    Apply the configured budget for the profile's route: log a warning, or
+    raise when ENFORCE_BUDGETS is set.
+    :raise BudgetExceeded: Over budget with enforcement on.
+    """
+    conf = conf or profiling_settings()
+    budgets = conf["BUDGETS"]
+    budget = budgets.get(profile.route, budgets.get("*"))
+    if not budget:
+        return
+    violations = profile.over_budget(budget)
+    if not violations:
+        return
+    message = f"{profile} over budget: {', '.join(violations)}"
+    repeated = profile.duplicates(conf["DUPLICATE_THRESHOLD"])
+    if repeated:
+        sql, count = repeated[0]
+        message += f"; repeated {count}x: {sql}"
+    if conf["ENFORCE_BUDGETS"]:
+        raise BudgetExceeded(message)
+    logger.warning(message)
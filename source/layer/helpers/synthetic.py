@@ -0,0 +1,533 @@
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+# Named dataset sizes, in orders.
+SCALES = {"small": 10_000, "medium": 100_000, "large": 1_000_000}
+
+# Rows built in memory and inserted per bulk_create.
+DATASET_BATCH_SIZE = 5000
+
+ORDER_STATUSES = ["pending", "processed", "shipped", "delivered", "canceled"]
+PAYMENT_METHODS = ["credit_card", "paypal", "cash_on_delivery"]
+REPAIR_STATUSES = ["pending", "in_progress", "completed", "customer_pickup", "paid"]
+DEVICE_NAMES = {
+    "phone": ["iPhone 13", "Galaxy S22", "Pixel 7"],
+    "tablet": ["iPad Air", "Galaxy Tab S8"],
+    "laptop": ["MacBook Air", "ThinkPad X1"],
+    "other": ["Apple Watch", "Switch"],
+}
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """
+    Let bulk_create keep the values given for auto_now/auto_now_add fields of
+    the models, so generated rows can be spread over the past. Not thread-safe.
+    """
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def chunked(count, size):
+    """Yield (start, stop) ranges covering range(count) in steps of size."""
+    for start in range(0, count, size):
+        yield start, min(start + size, count)
+
+
+class SyntheticDataset:
+    """
+    Seeded generator for a realistic shop dataset, written with bulk inserts.
+    Every other table is sized from the number of orders: customers, products,
+    warehouse stock, repair orders at the shops, stock adjustments, transfers,
+    shipments and carts. The same seed, size and end date always produce the
+    same rows. Orders are generated in batches so memory stays flat at any
+    scale; stock and repair rollups are rebuilt once at the end.
+    """
+
+    def __init__(
+        self,
+        orders=SCALES["small"],
+        seed=0,
+        warehouses=4,
+        shops=3,
+        days=365,
+        end_date=None,
+        batch_size=DATASET_BATCH_SIZE,
+    ):
+        self.orders = orders
+        self.seed = seed
+        self.warehouse_count = warehouses
+        self.shop_count = shops
+        self.days = days
+        self.end_date = end_date or timezone.localdate()
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.counts = {}
+
+    @property
+    def customer_count(self):
+        return max(self.orders // 10, 50)
+
+    @property
+    def product_count(self):
+        return min(max(self.orders // 50, 200), 20_000)
+
+    def exists(self):
+        """
+        Whether this seed's dataset, or one sharing its product SKUs (seeds
+        equal modulo 1000), is already in the database.
+        """
+        from source.apps.products.models import Category, Product
+
+        return (
+            Category.objects.filter(slug=f"synthetic-{self.seed}-category-0").exists()
+            or Product.objects.filter(sku__startswith=self.sku_prefix).exists()
+        )
+
+    @property
+    def sku_prefix(self):
+        return f"SYN{self.seed % 1000:03d}"
+
+    def generate(self, log=None):
+        """
+        Write the dataset next to existing rows, which are left alone. Each
+        seed can be generated once per database, since its keys (slugs,
+        SKUs, usernames) only depend on the seed.
+        :param log: Optional callable(message) for progress output.
+        :return: Mapping of table name to rows written.
+        :raise ValueError: If the seed's dataset already exists.
+        """
+        from source.apps.carts.models import Cart, CartItem
+        from source.apps.customers.models import Customer
+        from source.apps.inventory.models import InventoryTransfer, StockAdjustment
+        from source.apps.inventory.summary import StockSummary
+        from source.apps.logistics.models import Shipment
+        from source.apps.orders.models import Order, RepairOrder
+        from source.apps.orders.services import RepairRollupService
+        from source.apps.products.models import Product
+        from source.apps.sales_analytics.facts import OrderFactStream
+
+        if self.exists():
+            raise ValueError(
+                f"A dataset for seed {self.seed} (or one sharing its SKUs) already "
+                "exists; use another seed."
+            )
+        log = log or (lambda message: None)
+        steps = [
+            self.create_catalog,
+            self.create_locations,
+            self.create_stock,
+            self.create_customers,
+            self.create_orders,
+            self.create_repair_orders,
+            self.create_stock_history,
+            self.create_shipments,
+            self.create_carts,
+        ]
+        with explicit_timestamps(
+            Product,
+            Customer,
+            Order,
+            RepairOrder,
+            StockAdjustment,
+            InventoryTransfer,
+            Shipment,
+            Cart,
+            CartItem,
+        ):
+            for step in steps:
+                with transaction.atomic():
+                    step()
+                log(f"{step.__name__}: {sum(self.counts.values())} rows")
+        StockSummary.rebuild()
+        RepairRollupService.rebuild()
+        # Orders were bulk-inserted past the model hooks; record their sales.
+        OrderFactStream.backfill()
+        return self.counts
+
+    def moment(self):
+        """A random timestamp within the dataset's days, business hours only."""
+        day = self.end_date - timedelta(days=self.rng.randrange(self.days))
+        at = time(self.rng.randrange(8, 20), self.rng.randrange(60))
+        return timezone.make_aware(datetime.combine(day, at))
+
+    def price(self, low, high):
+        return Decimal(self.rng.randrange(low * 100, high * 100)).scaleb(-2)
+
+    def _count(self, name, rows):
+        self.counts[name] = self.counts.get(name, 0) + len(rows)
+        return rows
+
+    def create_catalog(self):
+        from source.apps.products.models import Brand, Category, Product
+
+        tag = f"synthetic-{self.seed}"
+        self.categories = self._count(
+            "categories",
+            Category.objects.bulk_create(
+                Category(name=f"Category {index}", slug=f"{tag}-category-{index}")
+                for index in range(20)
+            ),
+        )
+        self.brands = self._count(
+            "brands",
+            Brand.objects.bulk_create(
+                Brand(name=f"Brand {index}", slug=f"{tag}-brand-{index}")
+                for index in range(30)
+            ),
+        )
+        flags = [flag for flag, _ in Product.FLAG_TYPES]
+        products = []
+        for start, stop in chunked(self.product_count, self.batch_size):
+            products += Product.objects.bulk_create(
+                Product(
+                    name=f"Product {index}",
+                    subtitle=f"Synthetic product {index}",
+                    category=self.rng.choice(self.categories),
+                    brand=self.rng.choice(self.brands),
+                    base_price=self.price(5, 1500),
+                    flag=self.rng.choice(flags),
+                    slug=f"{tag}-product-{index}",
+                    sku=f"{self.sku_prefix}{index:07d}",
+                    created_at=self.moment(),
+                    updated_at=timezone.now(),
+                )
+                for index in range(start, stop)
+            )
+        self.products = [(product.pk, product.base_price) for product in products]
+        self._count("products", products)
+
+    def create_locations(self):
+        from source.apps.inventory.models import Warehouse
+
+        self.staff = self._count(
+            "users",
+            User.objects.bulk_create(
+                User(
+                    username=f"synthetic-{self.seed}-staff-{index}",
+                    password="!",
+                    is_staff=True,
+                )
+                for index in range(5)
+            ),
+        )
+        self.warehouses = self._count(
+            "warehouses",
+            Warehouse.objects.bulk_create(
+                Warehouse(
+                    name=f"Warehouse {index}",
+                    location=f"Synthetic {self.seed}",
+                    manager=self.rng.choice(self.staff),
+                )
+                for index in range(self.warehouse_count)
+            ),
+        )
+        # Repair shops are warehouses with their own stock.
+        self.shops = self._count(
+            "warehouses",
+            Warehouse.objects.bulk_create(
+                Warehouse(
+                    name=f"Shop {index}",
+                    location=f"Synthetic {self.seed}",
+                    manager=self.rng.choice(self.staff),
+                    capacity=1000,
+                )
+                for index in range(self.shop_count)
+            ),
+        )
+
+    def create_stock(self):
+        from source.apps.inventory.models import InventoryItem
+
+        now = timezone.now()
+        pairs = [
+            (product_id, warehouse.pk)
+            for product_id, _ in self.products
+            for warehouse in self.warehouses + self.shops
+        ]
+        for start, stop in chunked(len(pairs), self.batch_size):
+            rows = []
+            for product_id, warehouse_id in pairs[start:stop]:
+                quantity = self.rng.randrange(0, 500)
+                rows.append(
+                    InventoryItem(
+                        product_id=product_id,
+                        location_id=warehouse_id,
+                        quantity=quantity,
+                        status="in_stock" if quantity else "sold",
+                        low_stock_since=now if quantity < 10 else None,
+                    )
+                )
+            self._count("inventory items", InventoryItem.objects.bulk_create(rows))
+
+    def create_customers(self):
+        from source.apps.customers.models import Customer
+
+        self.customers = []
+        tag = f"synthetic-{self.seed}"
+        for start, stop in chunked(self.customer_count, self.batch_size):
+            users = User.objects.bulk_create(
+                User(
+                    username=f"{tag}-customer-{index}",
+                    email=f"customer{index}@{tag}.example.com",
+                    password="!",
+                )
+                for index in range(start, stop)
+            )
+            customers = Customer.objects.bulk_create(
+                Customer(
+                    user=user,
+                    first_name="Customer",
+                    last_name=str(index),
+                    email=user.email,
+                    phone_number=f"+{self.seed % 100:02d}{index:010d}",
+                    date_joined=self.moment(),
+                    loyalty_tier_updated=timezone.now(),
+                    is_loyalty_member=self.rng.random() < 0.3,
+                    loyalty_points=self.rng.randrange(0, 1000),
+                )
+                for index, user in zip(range(start, stop), users)
+            )
+            self.customers += [customer.pk for customer in customers]
+            self._count("users", users)
+            self._count("customers", customers)
+
+    def create_orders(self):
+        from source.apps.orders.models import Order, OrderItem, Payment
+
+        for start, stop in chunked(self.orders, self.batch_size):
+            orders, lines = [], []
+            for _ in range(start, stop):
+                status = self.rng.choices(ORDER_STATUSES, weights=[1, 2, 2, 8, 1])[0]
+                if status == "canceled":
+                    payment_status = self.rng.choice(["unpaid", "refunded"])
+                elif status == "pending":
+                    payment_status = "unpaid"
+                else:
+                    payment_status = "paid"
+                items = [
+                    (product_id, price, self.rng.randrange(1, 4))
+                    for product_id, price in self.rng.sample(
+                        self.products, self.rng.randrange(1, 5)
+                    )
+                ]
+                orders.append(
+                    Order(
+                        customer_id=self.rng.choice(self.customers),
+                        order_date=self.moment(),
+                        status=status,
+                        payment_status=payment_status,
+                        shipping_address="Synthetic Street 1",
+                        total_amount=sum(
+                            price * quantity for _, price, quantity in items
+                        ),
+                    )
+                )
+                lines.append(items)
+            orders = Order.objects.bulk_create(orders)
+            items = OrderItem.objects.bulk_create(
+                OrderItem(
+                    order=order,
+                    product_id=product_id,
+                    quantity=quantity,
+                    price_per_item=price,
+                    total_price=price * quantity,
+                )
+                for order, items in zip(orders, lines)
+                for product_id, price, quantity in items
+            )
+            payments = Payment.objects.bulk_create(
+                Payment(
+                    order=order,
+                    payment_method=self.rng.choice(PAYMENT_METHODS),
+                    payment_status=(
+                        "paid" if order.payment_status == "paid" else "pending"
+                    ),
+                    payment_date=(
+                        order.order_date if order.payment_status == "paid" else None
+                    ),
+                )
+                for order in orders
+            )
+            self._count("orders", orders)
+            self._count("order items", items)
+            self._count("payments", payments)
+
+    def create_repair_orders(self):
+        from source.apps.orders.codes import repair_codes
+        from source.apps.orders.models import RepairOrder
+
+        for start, stop in chunked(self.orders // 5, self.batch_size):
+            rows = []
+            for _ in range(start, stop):
+                device_type = self.rng.choice(list(DEVICE_NAMES))
+                status = self.rng.choice(REPAIR_STATUSES)
+                total_price = self.price(20, 400)
+                expenses = (
+                    (total_price * Decimal(self.rng.randrange(10, 60)))
+                    .scaleb(-2)
+                    .quantize(Decimal("0.01"))
+                )
+                created_at = self.moment()
+                rows.append(
+                    RepairOrder(
+                        shop=self.rng.choice(self.shops),
+                        device_type=device_type,
+                        device_name=self.rng.choice(DEVICE_NAMES[device_type]),
+                        issue="Synthetic repair",
+                        total_price=total_price,
+                        expenses=expenses,
+                        profit=total_price - expenses,
+                        created_at=created_at,
+                        completion_time=(
+                            created_at + timedelta(hours=self.rng.randrange(1, 72))
+                            if status in ("completed", "customer_pickup", "paid")
+                            else None
+                        ),
+                        status=status,
+                        payment_received=status == "paid",
+                        payment_pending_reason=(
+                            "Awaiting Customer Pickup"
+                            if status == "customer_pickup"
+                            else None
+                        ),
+                    )
+                )
+            by_shop = {}
+            for row in rows:
+                by_shop.setdefault(row.shop.pk, []).append(row)
+            for shop_id, shop_rows in by_shop.items():
+                for row, code in zip(
+                    shop_rows, repair_codes.allocate(shop_id, len(shop_rows))
+                ):
+                    row.code = code
+            self._count("repair orders", RepairOrder.objects.bulk_create(rows))
+
+    def create_stock_history(self):
+        from source.apps.inventory.models import (
+            InventoryItem,
+            InventoryTransfer,
+            StockAdjustment,
+        )
+
+        items = list(InventoryItem.objects.values_list("pk", flat=True))
+        for start, stop in chunked(self.orders // 10, self.batch_size):
+            self._count(
+                "stock adjustments",
+                StockAdjustment.objects.bulk_create(
+                    StockAdjustment(
+                        inventory_item_id=self.rng.choice(items),
+                        adjustment_type=self.rng.choice(["add", "remove"]),
+                        quantity=self.rng.randrange(1, 50),
+                        reason="Synthetic count",
+                        performed_by=self.rng.choice(self.staff),
+                        created_at=self.moment(),
+                    )
+                    for _ in range(start, stop)
+                ),
+            )
+        # Transfers are history only; the generated stock levels already
+        # reflect them, so bypass the status transition that moves stock.
+        for start, stop in chunked(self.orders // 50, self.batch_size):
+            rows = []
+            for _ in range(start, stop):
+                source, target = self.rng.sample(self.warehouses + self.shops, 2)
+                rows.append(
+                    InventoryTransfer(
+                        product_id=self.rng.choice(self.products)[0],
+                        from_location=source,
+                        to_location=target,
+                        quantity=self.rng.randrange(1, 20),
+                        status=self.rng.choice(["completed", "completed", "failed"]),
+                        initiated_by=self.rng.choice(self.staff),
+                        created_at=self.moment(),
+                    )
+                )
+            self._count("transfers", InventoryTransfer.objects.bulk_create(rows))
+
+    def create_shipments(self):
+        from source.apps.logistics.models import Shipment
+
+        statuses = ["pending", "in_transit", "delivered", "delivered", "returned"]
+        for start, stop in chunked(self.orders // 10, self.batch_size):
+            rows = []
+            for index in range(start, stop):
+                shipped = self.moment()
+                rows.append(
+                    Shipment(
+                        product_id=self.rng.choice(self.products)[0],
+                        quantity=self.rng.randrange(1, 20),
+                        origin=self.rng.choice(self.warehouses),
+                        destination="Synthetic Street 1",
+                        shipped_date=shipped,
+                        estimated_arrival=shipped
+                        + timedelta(days=self.rng.randrange(1, 6)),
+                        tracking_number=f"SYN-{self.seed}-{index:08d}",
+                        shipping_company=self.rng.choice(["DHL", "UPS", "DPD"]),
+                        status=self.rng.choice(statuses),
+                        created_at=shipped,
+                    )
+                )
+            self._count("shipments", Shipment.objects.bulk_create(rows))
+
+    def create_carts(self):
+        from source.apps.carts.models import Cart, CartItem
+
+        for start, stop in chunked(self.orders // 20, self.batch_size):
+            carts, lines = [], []
+            for _ in range(start, stop):
+                items = [
+                    (product_id, price, self.rng.randrange(1, 3))
+                    for product_id, price in self.rng.sample(
+                        self.products, self.rng.randrange(1, 4)
+                    )
+                ]
+                updated = self.moment()
+                carts.append(
+                    Cart(
+                        customer_id=self.rng.choice(self.customers),
+                        created_at=updated,
+                        updated_at=updated,
+                        is_active=self.rng.random() < 0.5,
+                        total_price=sum(
+                            price * quantity for _, price, quantity in items
+                        ),
+                        total_quantity=sum(quantity for _, _, quantity in items),
+                    )
+                )
+                lines.append(items)
+            carts = Cart.objects.bulk_create(carts)
+            self._count(
+                "cart items",
+                CartItem.objects.bulk_create(
+                    CartItem(
+                        cart=cart,
+                        product_id=product_id,
+                        quantity=quantity,
+                        price_per_item=price,
+                        total_price=price * quantity,
+                        added_at=cart.created_at,
+                    )
+                    for cart, items in zip(carts, lines)
+                    for product_id, price, quantity in items
+                ),
+            )
+            self._count("carts", carts)
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .profiling import BudgetExceeded, profile_queries, profiling_settings
+
+
+def allow_test_host():
+    """
+    Settings override accepting the "testserver" host that APIRequestFactory
+    sends, as the test client does; pagination links call get_host().
+    """
+    return override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"])
+
+
+def list_query_count(viewset, params=None, user=None):
+    """
+    Render a viewset's list action and count the queries it ran.
+    :param params: Query parameters, e.g. {"limit": 50}.
+    :return: Number of queries.
+    """
+    request = APIRequestFactory().get("/", params or {})
+    if user is not None:
+        force_authenticate(request, user=user)
+    view = viewset.as_view({"get": "list"})
+    # The capture is a window on connection.queries, which holds at most 9000.
+    reset_queries()
+    with allow_test_host(), CaptureQueriesContext(connection) as context:
+        response = view(request)
+        response.render()
+    if response.status_code != 200:
+        raise AssertionError(
+            f"{viewset.__name__} list returned {response.status_code}: {response.data}"
+        )
+    return len(context.captured_queries)
+
+
+def assert_constant_list_queries(viewset, create_rows, sizes=(10, 1000), **kwargs):
+    """
+    Assert that listing a viewset runs the same number of queries for every
+    table size, i.e. that its serializer triggers no per-row queries.
+    :param create_rows: Callable(size) filling the table with `size` rows
+        (called once per size, in order).
+    :raise: AssertionError naming the query count per size on a mismatch.
+    :return: Mapping of size to query count.
+    """
+    counts = {}
+    for size in sizes:
+        create_rows(size)
+        counts[size] = list_query_count(viewset, **kwargs)
+    if len(set(counts.values())) > 1:
+        raise AssertionError(
+            f"{viewset.__name__} list queries grow with rows: {counts}"
+        )
+    return counts
+
+
+@contextmanager
+def query_budget(**budget):
+    """
+    Assert that the block stays within a budget, e.g.
+    `with query_budget(queries=5, duplicates=0): ...`.
+    :param budget: Limits keyed like profiling.BUDGET_METRICS.
+    :raise BudgetExceeded: Naming each exceeded limit.
+    """
+    with profile_queries() as profile:
+        yield profile
+    violations = profile.over_budget(budget)
+    if violations:
+        raise BudgetExceeded(f"{profile} over budget: {', '.join(violations)}")
+
+
+def enforce_request_budgets(**budgets):
+    """
+    Settings override making QueryProfilingMiddleware raise BudgetExceeded for
+    requests over budget; use as a decorator or context manager, e.g.
+    `@enforce_request_budgets(order_detail={"queries": 12})`.
+    :param budgets: Route name -> limits, merged over REQUEST_PROFILING.
+    """
+    conf = profiling_settings()
+    return override_settings(
+        REQUEST_PROFILING=dict(
+            conf,
+            ENABLED=True,
+            ENFORCE_BUDGETS=True,
+            BUDGETS={**conf["BUDGETS"], **budgets},
+        )
+    )
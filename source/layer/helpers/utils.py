@@ -2,6 +2,8 @@ import re
 
 from source.apps.customers.models import Customer
 
+from .exports import CSVExport
+
 
 def format_phone_number(phone_number):
     """Format phone number to international format."""
@@ -71,28 +73,17 @@ def bulk_import_customers(customer_data):
     return customers
 
 
-def export_customers_to_csv(queryset):
-    import csv
-
-    from django.http import HttpResponse
-
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = 'attachment; filename="customers.csv"'
-
-    writer = csv.writer(response)
-    writer.writerow(
-        ["First Name", "Last Name", "Email", "Phone Number", "Loyalty Points"]
-    )
-
-    for customer in queryset:
-        writer.writerow(
-            [
-                customer.first_name,
-                customer.last_name,
-                customer.email,
-                customer.phone_number,
-                customer.loyalty_program.points,
-            ]
-        )
+CUSTOMER_EXPORT = CSVExport(
+    "customers.csv",
+    [
+        ("First Name", "first_name"),
+        ("Last Name", "last_name"),
+        ("Email", "email"),
+        ("Phone Number", "phone_number"),
+        ("Loyalty Points", "loyalty_program__points"),
+    ],
+)
 
-    return response
+
+def export_customers_to_csv(queryset):
+    return CUSTOMER_EXPORT.response(queryset)
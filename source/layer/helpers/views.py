@@ -0,0 +1,28 @@
+from django.http import JsonResponse
+
+from .profiling import request_profiles
+
+
+class EagerLoadingMixin:
+    """
+    Viewset mixin applying a declared eager-loading plan to get_queryset().
+    List the relations the serializer reads in `select_related` (foreign
+    keys, joined) and `prefetch_related` (many-valued, one query each), so a
+    page costs the same number of queries whatever its size.
+    """
+
+    select_related = ()
+    prefetch_related = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        return queryset
+
+
+def request_profiles_view(request):
+    """Staff JSON view of this process's per-route request profiles."""
+    return JsonResponse({"routes": request_profiles.summary()})
@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from source.apps.inventory.models import (
+    InventoryItem,
+    InventoryTransfer,
+    StockAdjustment,
+    Warehouse,
+)
+from source.apps.inventory.views import (
+    InventoryItemViewSet,
+    InventoryTransferViewSet,
+    StockAdjustmentViewSet,
+)
+from source.apps.products.models import Brand, Category, Product
+from source.apps.products.views import ProductViewSet
+from source.layer.helpers.testing import assert_constant_list_queries
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the product and inventory list endpoints run a constant "
+        "number of queries as tables grow. All generated data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10, 1000],
+            help="Row counts to compare.",
+        )
+
+    def handle(self, *args, **options):
+        viewsets = [
+            ProductViewSet,
+            InventoryItemViewSet,
+            StockAdjustmentViewSet,
+            InventoryTransferViewSet,
+        ]
+        failures = []
+        for viewset in viewsets:
+            try:
+                counts = self.check_viewset(viewset, sorted(options["sizes"]))
+            except AssertionError as exc:
+                failures.append(str(exc))
+                self.stdout.write(self.style.ERROR(str(exc)))
+            else:
+                self.stdout.write(f"{viewset.__name__}: {counts}")
+        if failures:
+            raise CommandError(f"{len(failures)} list endpoints have per-row queries.")
+        self.stdout.write(self.style.SUCCESS("All list endpoints are N+1 free."))
+
+    def check_viewset(self, viewset, sizes):
+        """Compare query counts on fresh, rolled-back data for one viewset."""
+        try:
+            with transaction.atomic():
+                self.setup()
+                counts = assert_constant_list_queries(viewset, self.fill, sizes)
+                raise _Rollback
+        except _Rollback:
+            pass
+        return counts
+
+    def setup(self):
+        self.user = User.objects.create(username="api-query-check")
+        self.category = Category.objects.create(name="Query check", slug="query-check")
+        self.brand = Brand.objects.create(name="Query check", slug="query-check")
+        self.source, self.target = Warehouse.objects.bulk_create(
+            [
+                Warehouse(name="Query check A", location="A"),
+                Warehouse(name="Query check B", location="B"),
+            ]
+        )
+        self.size = 0
+
+    def fill(self, size):
+        """Grow every listed table to at least `size` rows."""
+        start, self.size = self.size, max(self.size, size)
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    name=f"Query check {index}",
+                    subtitle="Query check",
+                    category=self.category,
+                    brand=self.brand,
+                    base_price=10,
+                    flag="New",
+                    slug=f"query-check-{index}",
+                    sku=f"QCHK{index:06d}",
+                )
+                for index in range(start, size)
+            ]
+        )
+        for product in products:
+            product.tags.add("query-check", f"query-check-{product.pk % 3}")
+        items = InventoryItem.objects.bulk_create(
+            [
+                InventoryItem(
+                    product=product,
+                    location=self.source,
+                    quantity=100,
+                    status="in_stock",
+                )
+                for product in products
+            ]
+        )
+        StockAdjustment.objects.bulk_create(
+            [
+                StockAdjustment(
+                    inventory_item=item,
+                    adjustment_type="add",
+                    quantity=1,
+                    performed_by=self.user,
+                )
+                for item in items
+            ]
+        )
+        InventoryTransfer.objects.bulk_create(
+            [
+                InventoryTransfer(
+                    product=product,
+                    from_location=self.source,
+                    to_location=self.target,
+                    quantity=1,
+                    status="pending",
+                    initiated_by=self.user,
+                )
+                for product in products
+            ]
+        )
@@ -0,0 +1,132 @@
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from source.apps.carts.models import Cart
+from source.apps.inventory.models import InventoryItem
+from source.apps.logistics.models import Shipment
+from source.apps.logistics.querysets import ShipmentQuerySet
+from source.apps.orders.models import Order, RepairOrder
+
+# Named access paths and the index expected to serve each one.
+QUERYSETS = [
+    ("Order.pending", lambda: Order.objects.pending()),
+    ("Order.paid", lambda: Order.objects.all().paid()),
+    ("Order.shipped", lambda: Order.objects.shipped()),
+    ("Order.by_customer", lambda: Order.objects.by_customer(1)),
+    ("Order.recent", lambda: Order.objects.all().recent(7)),
+    ("RepairOrder.completed", lambda: RepairOrder.objects.all().completed()),
+    ("RepairOrder.paid", lambda: RepairOrder.objects.all().paid()),
+    ("RepairOrder.by_shop", lambda: RepairOrder.objects.all().by_shop(1)),
+    ("RepairOrder.created_today", lambda: RepairOrder.objects.created_today()),
+    ("RepairOrder.unpaid", lambda: RepairOrder.objects.all().unpaid()),
+    (
+        "RepairOrder.unpaid_customer_orders",
+        lambda: RepairOrder.objects.unpaid_customer_orders(),
+    ),
+    (
+        "Shipment.pending_shipments",
+        lambda: ShipmentQuerySet(Shipment).pending_shipments(),
+    ),
+    ("Shipment.in_transit", lambda: ShipmentQuerySet(Shipment).in_transit()),
+    (
+        "Shipment.shipments_by_company",
+        lambda: ShipmentQuerySet(Shipment).shipments_by_company("DHL"),
+    ),
+    (
+        "Shipment.shipments_between_dates",
+        lambda: ShipmentQuerySet(Shipment).shipments_between_dates(
+            timezone.now() - timedelta(days=7), timezone.now()
+        ),
+    ),
+    ("Cart.abandoned", lambda: Cart.objects.abandoned()),
+    ("InventoryItem.in_warehouse", lambda: InventoryItem.objects.in_warehouse(1)),
+    (
+        "InventoryItem.in_warehouse.in_stock",
+        lambda: InventoryItem.objects.in_warehouse(1).in_stock(),
+    ),
+    ("InventoryItem.low_stock", lambda: InventoryItem.objects.low_stock()),
+]
+
+# Plan lines that visit every row: SQLite "SCAN <table>" (optionally walking an
+# index for ORDER BY) and PostgreSQL "Seq Scan on <table>".
+FULL_SCAN = re.compile(
+    r"\bSCAN \w+(?: USING (?:COVERING )?INDEX (?P<index>\w+))?|Seq Scan"
+)
+
+
+def partial_indexes():
+    """Names of conditional indexes; scanning one only visits matching rows."""
+    return {
+        index.name
+        for model in apps.get_models()
+        for index in model._meta.indexes
+        if index.condition is not None
+    }
+
+
+def full_scans(plan, partial):
+    """Return the lines of an EXPLAIN plan that read a whole table or index."""
+    return [
+        line
+        for line, match in (
+            (line, FULL_SCAN.search(line)) for line in plan.splitlines()
+        )
+        if match and match.group("index") not in partial
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the hot queryset methods and flag plans that scan a "
+        "whole table instead of using an index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Only explain these querysets (e.g. Order.pending).",
+        )
+        parser.add_argument(
+            "--plans",
+            action="store_true",
+            help="Print every query plan, not only the flagged ones.",
+        )
+
+    def handle(self, *args, **options):
+        selected = [
+            (name, build)
+            for name, build in QUERYSETS
+            if not options["names"] or name in options["names"]
+        ]
+        if not selected:
+            raise CommandError("No matching querysets.")
+
+        partial = partial_indexes()
+        flagged = []
+        for name, build in selected:
+            plan = build().explain()
+            scans = full_scans(plan, partial)
+            if scans:
+                flagged.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN {name}"))
+            else:
+                self.stdout.write(f"ok        {name}")
+            if scans or options["plans"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"          {line}")
+
+        # Note: on small or un-analyzed tables PostgreSQL may prefer a
+        # sequential scan even when a usable index exists.
+        if flagged:
+            raise CommandError(
+                f"{len(flagged)} of {len(selected)} querysets scan whole tables: "
+                + ", ".join(flagged)
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"All {len(selected)} querysets use indexes.")
+        )
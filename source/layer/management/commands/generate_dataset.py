@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from source.layer.helpers.synthetic import (
+    DATASET_BATCH_SIZE,
+    SCALES,
+    SyntheticDataset,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-insert a seeded synthetic dataset (orders, repair orders, stock, "
+        "customers, shipments, carts) for benchmarks and local testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            choices=list(SCALES),
+            default="small",
+            help="Dataset size: " + ", ".join(f"{k}={v}" for k, v in SCALES.items()),
+        )
+        parser.add_argument(
+            "--orders", type=int, help="Number of orders; overrides --scale."
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--warehouses", type=int, default=4)
+        parser.add_argument("--shops", type=int, default=3)
+        parser.add_argument(
+            "--days", type=int, default=365, help="Days of history to spread over."
+        )
+        parser.add_argument(
+            "--end-date",
+            help="Last day of history (YYYY-MM-DD); defaults to today. Fix it "
+            "for datasets that must be identical across days.",
+        )
+        parser.add_argument("--batch-size", type=int, default=DATASET_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        end_date = None
+        if options["end_date"]:
+            end_date = parse_date(options["end_date"])
+            if end_date is None:
+                raise CommandError("--end-date must be YYYY-MM-DD.")
+        dataset = SyntheticDataset(
+            orders=options["orders"] or SCALES[options["scale"]],
+            seed=options["seed"],
+            warehouses=options["warehouses"],
+            shops=options["shops"],
+            days=options["days"],
+            end_date=end_date,
+            batch_size=options["batch_size"],
+        )
+        started = time.perf_counter()
+        try:
+            counts = dataset.generate(log=self.stdout.write)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)."
+            )
+        )
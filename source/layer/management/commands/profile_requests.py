@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from source.layer.helpers.profiling import (
+    BUDGET_METRICS,
+    PERCENTILES,
+    BudgetExceeded,
+    profiling_settings,
+    request_profiles,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Request URLs in-process through QueryProfilingMiddleware and print "
+        "per-route query counts, repeated statements and p50/p95/p99 timings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="URLs to GET, e.g. /api/items/.")
+        parser.add_argument("--repeat", type=int, default=20, help="Requests per URL.")
+        parser.add_argument(
+            "--user", help="Log in as this user (e.g. a staff user for admin pages)."
+        )
+        parser.add_argument(
+            "--enforce",
+            action="store_true",
+            help="Fail on the first request over its REQUEST_PROFILING budget.",
+        )
+
+    def handle(self, *args, **options):
+        if "source.layer.helpers.middleware.QueryProfilingMiddleware" not in (
+            settings.MIDDLEWARE
+        ):
+            raise CommandError("QueryProfilingMiddleware is not in MIDDLEWARE.")
+        client = Client()
+        if options["user"]:
+            try:
+                client.force_login(User.objects.get(username=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}.")
+
+        conf = dict(
+            profiling_settings(), ENABLED=True, ENFORCE_BUDGETS=options["enforce"]
+        )
+        request_profiles.reset()
+        with override_settings(
+            REQUEST_PROFILING=conf,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        ):
+            for path in options["paths"]:
+                for _ in range(options["repeat"]):
+                    try:
+                        response = client.get(path)
+                    except BudgetExceeded as exc:
+                        raise CommandError(str(exc))
+                if response.status_code >= 400:
+                    self.stderr.write(f"{path} returned {response.status_code}")
+
+        for row in request_profiles.summary():
+            self.stdout.write(self.style.MIGRATE_HEADING(row["route"]))
+            self.stdout.write(f"  requests     {row['requests']}")
+            for metric in BUDGET_METRICS:
+                values = "  ".join(
+                    f"p{pct} {row[f'{metric}_p{pct}']:>8}" for pct in PERCENTILES
+                )
+                self.stdout.write(f"  {metric:<12} {values}")
+            for sql, count in row["n_plus_one"]:
+                self.stdout.write(self.style.WARNING(f"  {count}x {sql[:160]}"))
@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from source.layer.helpers.benchmarks import BENCHMARKS, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Time checkout, stock adjustment, transfer, report and list API "
+        "benchmarks against the current database and write the results as "
+        "JSON. Every run is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Benchmarks to run (default all): " + ", ".join(BENCHMARKS),
+        )
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--output", help="Write the JSON results to this file.")
+        parser.add_argument(
+            "--compare", help="Earlier JSON results to compare the medians with."
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - set(BENCHMARKS)
+        if unknown:
+            raise CommandError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+        try:
+            report = run_benchmarks(
+                options["names"], options["repeat"], options["warmup"]
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            f"{'benchmark':<24} {'median ms':>10} {'p95 ms':>10} {'queries':>8}"
+        )
+        failed = []
+        for name, result in report["results"].items():
+            if "error" in result:
+                failed.append(name)
+                self.stdout.write(self.style.ERROR(f"{name:<24} {result['error']}"))
+                continue
+            self.stdout.write(
+                f"{name:<24} {result['ms_median']:>10} {result['ms_p95']:>10} "
+                f"{result['queries']:>8}"
+            )
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as stream:
+                baseline = json.load(stream)
+            self.stdout.write(f"\nvs {baseline.get('revision') or options['compare']}")
+            for name, before, after, change in compare(baseline, report):
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS
+                self.stdout.write(
+                    style(f"{name:<24} {before:>10} -> {after:>10} ({change:+.1f}%)")
+                )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+        if failed:
+            raise CommandError(f"Benchmarks failed: {', '.join(failed)}")